@@ -2,8 +2,8 @@
 
 import random
 import typing
-import time
 import py_trees
+from pytree_stuff import demo
 from pathlib import Path
 
 # Foo is a skeleton behaviour in py_trees that demonstrates the basic structure of a custom behaviour. It randomly returns RUNNING, SUCCESS, or FAILURE to illustrate the lifecycle methods.
@@ -78,6 +78,8 @@ class Foo(py_trees.behaviour.Behaviour):
 
         What to do here?
           - Triggering, checking, monitoring. Anything...but do not block!
+            (long work belongs in pytree_stuff.offload.Offload or
+            pytree_stuff.aio.AsyncBehaviour, which poll it from here)
           - Set a feedback message
           - return a py_trees.common.Status.[RUNNING, SUCCESS, FAILURE]
         """
@@ -122,26 +124,6 @@ def build_tree() -> py_trees.behaviour.Behaviour:
 if __name__ == "__main__":
     tree = py_trees.trees.BehaviourTree(root=build_tree())
     path = Path() / "Behaviour" / "render"
-    path.mkdir(parents=True, exist_ok=True)
-    py_trees.display.render_dot_tree(tree.root, name="condition_demo_tree", target_directory=path)
+    demo.render(tree.root, name="condition_demo_tree", target_directory=path)
     tree.setup(timeout=1.0)
-    count = 0
-    while True:
-        count += 1
-        RATE_HZ = 1.0
-        period = 1.0 / RATE_HZ
-
-        now = time.perf_counter()
-        if not hasattr(tree, "_next_tick_time"):
-            tree._next_tick_time = now
-
-        if now < tree._next_tick_time:
-            time.sleep(tree._next_tick_time - now)
-        print(f"--- Tick {count} ---")
-        tree.tick()
-        tree._next_tick_time += period
-        child_states = ", ".join(f"{c.name}:{c.status.name}" for c in tree.root.children)
-        print(py_trees.display.ascii_tree(tree.root, show_status=True))
-        print("\n")
-        if tree.root.status != py_trees.common.Status.RUNNING:
-            break
\ No newline at end of file
+    demo.run(tree, rate_hz=1.0)
@@ -1,33 +1,10 @@
 import py_trees
-import time
+from pytree_stuff import demo
+from pytree_stuff.behaviours import AlwaysRunning, DelayedSuccess
 from pathlib import Path
 
 # Parallel is a composite in py_trees that enables a kind of spooky at-a-distance concurrency. Parallels tick every child every time the parallel is itself ticked. The parallelism however, is merely conceptual. The children have actually been sequentially ticked, but from both the tree and the parallel’s purview, all children have been ticked at once.
 
-class AlwaysRunning(py_trees.behaviour.Behaviour):
-    def __init__(self, name="Background"):
-        super().__init__(name)
-
-    def update(self):
-        return py_trees.common.Status.RUNNING
-
-
-class DelayedSuccess(py_trees.behaviour.Behaviour):
-    def __init__(self, name="Task", ticks=3):
-        super().__init__(name)
-        self.ticks = ticks
-        self.count = 0
-
-    def initialise(self):
-        self.count = 0
-
-    def update(self):
-        self.count += 1
-        if self.count < self.ticks:
-            return py_trees.common.Status.RUNNING
-        return py_trees.common.Status.SUCCESS
-
-
 def build_tree():
     root = py_trees.composites.Parallel(
         name="ParallelDemo",
@@ -45,30 +22,7 @@ def build_tree():
 if __name__ == "__main__":
     tree = py_trees.trees.BehaviourTree(root=build_tree())
     tree.setup(timeout=1.0)
-    count = 0
     # render the tree to png
     path = Path() / "Composites" / "render"
-    path.mkdir(parents=True, exist_ok=True)
-    py_trees.display.render_dot_tree(tree.root, name="parallel_demo_tree", target_directory=path)
-    while True:
-        count += 1
-        RATE_HZ = 1.0
-        period = 1.0 / RATE_HZ
-
-        now = time.perf_counter()
-        if not hasattr(tree, "_next_tick_time"):
-            tree._next_tick_time = now
-
-        if now < tree._next_tick_time:
-            time.sleep(tree._next_tick_time - now)
-
-        print(f"--- Tick {count} ---")
-        tree.tick()
-        tree._next_tick_time += period
-        child_states = ", ".join(f"{c.name}:{c.status.name}" for c in tree.root.children)
-        # print(f"tick {i+1} -> root:{tree.root.status.name} | {child_states}")
-        # render the tree to the console
-        print(py_trees.display.ascii_tree(tree.root,show_status=True))
-        print("\n")
-        if tree.root.status != py_trees.common.Status.RUNNING:
-            break
+    demo.render(tree.root, name="parallel_demo_tree", target_directory=path)
+    demo.run(tree, rate_hz=1.0)
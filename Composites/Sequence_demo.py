@@ -1,33 +1,10 @@
 import py_trees
-import time
+from pytree_stuff import demo
+from pytree_stuff.behaviours import AlwaysRunning, DelayedSuccess
 from pathlib import Path
 
 # Sequence is a composite in py_trees that executes children sequentially. It will progressively tick over each of its children so long as each child returns SUCCESS. If any child returns FAILURE or RUNNING the sequence will halt and the parent will adopt the result of this child. If it reaches the last child, it returns with that result regardless.
 
-class AlwaysRunning(py_trees.behaviour.Behaviour):
-    def __init__(self, name="Background"):
-        super().__init__(name)
-
-    def update(self):
-        return py_trees.common.Status.RUNNING
-
-
-class DelayedSuccess(py_trees.behaviour.Behaviour):
-    def __init__(self, name="Task", ticks=3):
-        super().__init__(name)
-        self.ticks = ticks
-        self.count = 0
-
-    def initialise(self):
-        self.count = 0
-
-    def update(self):
-        self.count += 1
-        if self.count < self.ticks:
-            return py_trees.common.Status.RUNNING
-        return py_trees.common.Status.SUCCESS
-
-
 def build_tree():
     root = py_trees.composites.Sequence(
         name="SequenceDemo",
@@ -44,26 +21,6 @@ def build_tree():
 if __name__ == "__main__":
     tree = py_trees.trees.BehaviourTree(root=build_tree())
     path = Path() / "Composites" / "render"
-    path.mkdir(parents=True, exist_ok=True)
-    py_trees.display.render_dot_tree(tree.root, name="sequence_demo_tree", target_directory=path)
+    demo.render(tree.root, name="sequence_demo_tree", target_directory=path)
     tree.setup(timeout=1.0)
-    count = 0
-    while True:
-        count += 1
-        RATE_HZ = 1.0
-        period = 1.0 / RATE_HZ
-
-        now = time.perf_counter()
-        if not hasattr(tree, "_next_tick_time"):
-            tree._next_tick_time = now
-
-        if now < tree._next_tick_time:
-            time.sleep(tree._next_tick_time - now)
-        print(f"--- Tick {count} ---")
-        tree.tick()
-        tree._next_tick_time += period
-        child_states = ", ".join(f"{c.name}:{c.status.name}" for c in tree.root.children)
-        print(py_trees.display.ascii_tree(tree.root, show_status=True))
-        print("\n")
-        if tree.root.status != py_trees.common.Status.RUNNING:
-            break
+    demo.run(tree, rate_hz=1.0)
@@ -0,0 +1,43 @@
+import argparse
+import py_trees
+from pytree_stuff import demo
+from pytree_stuff.behaviours import DelayedSuccess
+from pytree_stuff.decorators import PersistentOneShot, ResultStore
+from pathlib import Path
+
+# PersistentOneShot is a OneShot (see OneShot_Demo.py) that also saves the child's final status to a ResultStore, so a restarted process skips the child from the first tick.
+# Results are only kept in memory unless a file is given with --results; run the demo twice with the same file to see the child skipped.
+
+
+def build_tree(results=None):
+    root = py_trees.composites.Sequence(name="PersistentOneShotDemo", memory=True)
+
+    # Task that succeeds after delay, standing in for an expensive calibration
+    succeeding_task = DelayedSuccess("Succeed After 2 Ticks", ticks=2)
+
+    # PersistentOneShot decorator executes once, across restarts
+    one_shot_decorator = PersistentOneShot(
+        name="Persistent One Shot",
+        child=succeeding_task,
+        key="demos/persistent_one_shot",
+        version="1",
+        results=results if results is not None else ResultStore(),
+        policy=py_trees.common.OneShotPolicy.ON_SUCCESSFUL_COMPLETION
+    )
+
+    # Final task to show sequence continues
+    final_task = DelayedSuccess("Done", ticks=1)
+
+    root.add_children([one_shot_decorator, final_task])
+    return root
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--results", metavar="FILE", help="save the one shot's result to FILE")
+    arguments, _ = parser.parse_known_args()
+    tree = py_trees.trees.BehaviourTree(root=build_tree(ResultStore(arguments.results)))
+    path = Path() / "Decorators" / "render"
+    demo.render(tree.root, name="persistent_one_shot_demo_tree", target_directory=path)
+    tree.setup(timeout=1.0)
+    demo.run(tree, rate_hz=1.0)
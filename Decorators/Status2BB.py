@@ -1,6 +1,6 @@
 # Demo for py_trees.decorators.StatusToBlackboard
-import time
 import py_trees
+from pytree_stuff import ticking
 
 # StatusToBlackboard is a decorator in py_trees that writes the status of its child to a specified variable on the blackboard.
 
@@ -46,9 +46,7 @@ def main():
     reader.register_key(key=key, access=py_trees.common.Access.READ)
 
     # Tick several times and show: child status, decorator status, blackboard value
-    for i in range(1, 10):
-        tree.tick()
-
+    def show(tree):
         bb_value = getattr(reader, key, None)
         if isinstance(bb_value, py_trees.common.Status):
             bb_display = bb_value.name
@@ -56,9 +54,11 @@ def main():
             bb_display = repr(bb_value)
 
         print(
-            f"Tick {i:02d} | child={child.status.name} | decorator={decorated.status.name} | blackboard[{key}]={bb_display}"
+            f"Tick {tree.count + 1:02d} | child={child.status.name} | decorator={decorated.status.name} | blackboard[{key}]={bb_display}"
         )
-        time.sleep(0.2)
+
+    runner = ticking.TickRunner(tree, rate_hz=5.0)
+    runner.run(number_of_ticks=9, stop_on_terminal_state=False, post_tick_handler=show)
 
 
 if __name__ == "__main__":
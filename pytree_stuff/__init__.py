@@ -0,0 +1,4 @@
+"""Shared runtime helpers for the behaviour tree demos."""
+
+from . import ticking  # noqa: F401
+from . import demo  # noqa: F401
@@ -0,0 +1,265 @@
+"""
+Asyncio tick loop and coroutine-backed leaves.
+
+``update()`` must not block, but the demos give a leaf no way to wait on a
+socket or a timer other than blocking, and their loops block the whole
+process in ``time.sleep``. Here :class:`AsyncTickRunner` ticks a tree on the
+same drift-free schedule as :class:`~pytree_stuff.ticking.TickRunner` while
+waiting with ``await asyncio.sleep``, and :class:`AsyncBehaviour` runs its work
+as an asyncio task on that loop: the leaf is RUNNING while the task is pending
+and SUCCESS / FAILURE once it finishes. One event loop can then drive hundreds
+of trees that wait on I/O, without threads.
+
+.. code-block:: python
+
+   class Fetch(aio.AsyncBehaviour):
+       async def work(self) -> bool:
+           reader, writer = await asyncio.open_connection("example.com", 80)
+           ...
+           return True
+
+   asyncio.run(aio.run_trees(trees, rate_hz=10.0))
+"""
+
+import asyncio
+import typing
+
+import py_trees
+
+from . import clock as clock_module
+from . import ticking
+
+
+class AsyncBehaviour(py_trees.behaviour.Behaviour):
+    """
+    A leaf whose work is a coroutine.
+
+    :meth:`work` is started as a task on the running event loop when the
+    behaviour initialises, and cancelled if the behaviour is interrupted. The
+    result decides the status: a :class:`~py_trees.common.Status` is used as
+    is, ``False`` means FAILURE and anything else SUCCESS. An exception also
+    means FAILURE, with the exception as the feedback message.
+
+    The tree must be ticked from a coroutine, e.g. by :class:`AsyncTickRunner`.
+
+    Args:
+        name: the behaviour name
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.task: typing.Optional["asyncio.Task[typing.Any]"] = None
+
+    async def work(self) -> typing.Any:
+        """The coroutine to run, override this."""
+        raise NotImplementedError("AsyncBehaviour subclasses must implement work()")
+
+    def initialise(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError as e:
+            raise RuntimeError(
+                f"{self.name} needs a running event loop, tick the tree with AsyncTickRunner"
+            ) from e
+        self.task = loop.create_task(self.work(), name=self.name)
+        self.feedback_message = "waiting"
+
+    def update(self) -> py_trees.common.Status:
+        if self.task is None:
+            return py_trees.common.Status.INVALID
+        if not self.task.done():
+            return py_trees.common.Status.RUNNING
+        if self.task.cancelled():
+            self.feedback_message = "cancelled"
+            return py_trees.common.Status.FAILURE
+        error = self.task.exception()
+        if error is not None:
+            self.feedback_message = f"{type(error).__name__}: {error}"
+            return py_trees.common.Status.FAILURE
+        result = self.task.result()
+        self.feedback_message = "done"
+        if isinstance(result, py_trees.common.Status):
+            return result
+        if result is False:
+            return py_trees.common.Status.FAILURE
+        return py_trees.common.Status.SUCCESS
+
+    def terminate(self, new_status: py_trees.common.Status) -> None:
+        if new_status == py_trees.common.Status.INVALID and self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+
+class AsyncCall(AsyncBehaviour):
+    """
+    Await a coroutine function, see :class:`AsyncBehaviour` for the statuses.
+
+    Args:
+        name: the behaviour name
+        function: called with ``args`` on every initialise, returns an awaitable
+        args: positional arguments for ``function``
+    """
+
+    def __init__(
+        self,
+        name: str,
+        function: typing.Callable[..., typing.Awaitable[typing.Any]],
+        *args: typing.Any,
+    ) -> None:
+        super().__init__(name)
+        self.function = function
+        self.args = args
+
+    async def work(self) -> typing.Any:
+        return await self.function(*self.args)
+
+
+class Sleep(AsyncBehaviour):
+    """
+    RUNNING for ``seconds``, then SUCCESS, without blocking the loop.
+
+    Args:
+        name: the behaviour name
+        seconds: how long to wait
+    """
+
+    def __init__(self, name: str = "Sleep", seconds: float = 1.0) -> None:
+        super().__init__(name)
+        self.seconds = seconds
+
+    async def work(self) -> None:
+        await asyncio.sleep(self.seconds)
+
+
+class AsyncTickRunner(ticking.TickRunner):
+    """
+    :class:`~pytree_stuff.ticking.TickRunner` for an asyncio event loop.
+
+    Ticks on the same schedule and records the same statistics, but waits for
+    the next slot with ``await asyncio.sleep`` so other trees and tasks on the
+    loop make progress in between. The tick itself still runs synchronously
+    on the loop.
+
+    Args:
+        tree: the behaviour tree to tick
+        rate_hz: ticks per second
+        policy: how to treat slots missed after an overrun
+        budget: allowed tick latency in seconds, defaults to one period
+        history: number of samples kept for the latency/jitter percentiles
+        clock: see :class:`~pytree_stuff.ticking.TickRunner`; with a
+            :class:`~pytree_stuff.clock.VirtualClock` the runner advances it
+            instead of waiting, yielding to the loop without sleeping
+
+    Raises:
+        ValueError: if the rate is not positive
+    """
+
+    def __init__(
+        self,
+        tree: py_trees.trees.BehaviourTree,
+        rate_hz: float = 1.0,
+        policy: ticking.OverrunPolicy = ticking.OverrunPolicy.SKIP,
+        budget: typing.Optional[float] = None,
+        history: int = 4096,
+        clock: typing.Union[clock_module.Clock, typing.Callable[[], float], None] = None,
+    ) -> None:
+        super().__init__(
+            tree, rate_hz=rate_hz, policy=policy, budget=budget, history=history, clock=clock
+        )
+
+    async def tick_once(  # type: ignore[override]
+        self,
+        pre_tick_handler: typing.Optional[
+            typing.Callable[[py_trees.trees.BehaviourTree], None]
+        ] = None,
+        post_tick_handler: typing.Optional[
+            typing.Callable[[py_trees.trees.BehaviourTree], None]
+        ] = None,
+    ) -> None:
+        """Wait for the next slot, tick the tree and advance the schedule."""
+        scheduled, delay = self._schedule()
+        if self.virtual:
+            self.sleep(delay)
+            delay = 0.0
+        # always yield to the loop, even when behind schedule
+        await asyncio.sleep(max(0.0, delay))
+        started = self.clock()
+        self.timers.advance()
+        self.tree.tick(pre_tick_handler, post_tick_handler)
+        self._advance(scheduled, started, self.clock())
+
+    async def run(  # type: ignore[override]
+        self,
+        number_of_ticks: typing.Optional[int] = None,
+        stop_on_terminal_state: bool = True,
+        pre_tick_handler: typing.Optional[
+            typing.Callable[[py_trees.trees.BehaviourTree], None]
+        ] = None,
+        post_tick_handler: typing.Optional[
+            typing.Callable[[py_trees.trees.BehaviourTree], None]
+        ] = None,
+    ) -> ticking.TickStatistics:
+        """
+        Tick repeatedly on the fixed-rate schedule.
+
+        Cancelling the task running this coroutine stops the tree and cancels
+        any pending :class:`AsyncBehaviour` work.
+
+        Args:
+            number_of_ticks: stop after this many ticks, run forever if None
+            stop_on_terminal_state: stop once the root is no longer RUNNING
+            pre_tick_handler: function to execute before each tick
+            post_tick_handler: function to execute after each tick
+
+        Returns:
+            the runner's accumulated statistics
+        """
+        self._interrupted = False
+        ticks = 0
+        try:
+            while not self._interrupted and (
+                number_of_ticks is None or ticks < number_of_ticks
+            ):
+                await self.tick_once(pre_tick_handler, post_tick_handler)
+                ticks += 1
+                if (
+                    stop_on_terminal_state
+                    and self.tree.root.status != py_trees.common.Status.RUNNING
+                ):
+                    break
+        except asyncio.CancelledError:
+            self.tree.root.stop(py_trees.common.Status.INVALID)
+            raise
+        return self.statistics
+
+
+async def run_trees(
+    trees: typing.Sequence[py_trees.trees.BehaviourTree],
+    rate_hz: float = 1.0,
+    number_of_ticks: typing.Optional[int] = None,
+    stop_on_terminal_state: bool = True,
+) -> typing.List[ticking.TickStatistics]:
+    """
+    Tick several trees concurrently on the running event loop.
+
+    Args:
+        trees: trees that have already been set up
+        rate_hz: ticks per second, for every tree
+        number_of_ticks: stop each tree after this many ticks, never if None
+        stop_on_terminal_state: stop each tree once its root is no longer RUNNING
+
+    Returns:
+        the statistics of each tree, in order
+    """
+    runners = [AsyncTickRunner(tree, rate_hz=rate_hz) for tree in trees]
+    return list(
+        await asyncio.gather(
+            *(
+                runner.run(
+                    number_of_ticks=number_of_ticks,
+                    stop_on_terminal_state=stop_on_terminal_state,
+                )
+                for runner in runners
+            )
+        )
+    )
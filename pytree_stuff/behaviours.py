@@ -0,0 +1,99 @@
+"""
+Memory-compact versions of the leaf behaviours used throughout the demos.
+
+These replace the ``AlwaysRunning`` / ``DelayedSuccess`` / ``DelayedFailure``
+classes that used to be copied into every demo, and are small enough to be
+instantiated by the hundred thousand for load testing. Per-behaviour state
+lives in ``__slots__``, and two attributes :class:`py_trees.behaviour.Behaviour`
+stores on every instance are served from the class instead:
+
+* ``iterator`` - a generator created in ``__init__`` and on every ``stop()``
+  that py_trees never consumes
+* ``qualified_name`` - derived from the class and behaviour name
+
+Compare against the original per-file classes with
+``python -m pytree_stuff.benchmark --footprint``.
+"""
+
+import typing
+
+import py_trees
+
+
+class CompactBehaviour(py_trees.behaviour.Behaviour):
+    """Base for behaviours that don't keep a per-instance iterator or qualified name."""
+
+    __slots__ = ()
+
+    @property
+    def iterator(self) -> typing.Iterator[py_trees.behaviour.Behaviour]:
+        return self.tick()
+
+    @iterator.setter
+    def iterator(self, value: typing.Any) -> None:
+        # discard the generator py_trees creates on construction and on stop()
+        pass
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{type(self).__qualname__}/{self.name}"
+
+    @qualified_name.setter
+    def qualified_name(self, value: str) -> None:
+        pass
+
+
+class AlwaysRunning(CompactBehaviour):
+    """Never finishes, useful for keeping a parent RUNNING."""
+
+    __slots__ = ()
+
+    def __init__(self, name: str = "Background") -> None:
+        super().__init__(name)
+
+    def update(self) -> py_trees.common.Status:
+        return py_trees.common.Status.RUNNING
+
+
+class Delayed(CompactBehaviour):
+    """
+    RUNNING for ``ticks - 1`` ticks, then finishes with ``outcome``.
+
+    Args:
+        name: the behaviour name
+        ticks: number of ticks, including the finishing one
+    """
+
+    __slots__ = ("ticks", "count")
+
+    outcome = py_trees.common.Status.SUCCESS
+
+    def __init__(self, name: str = "Task", ticks: int = 3) -> None:
+        super().__init__(name)
+        self.ticks = ticks
+        self.count = 0
+
+    def initialise(self) -> None:
+        self.count = 0
+
+    def update(self) -> py_trees.common.Status:
+        self.count += 1
+        if self.count < self.ticks:
+            return py_trees.common.Status.RUNNING
+        return self.outcome
+
+
+class DelayedSuccess(Delayed):
+    """RUNNING for ``ticks - 1`` ticks, then SUCCESS."""
+
+    __slots__ = ()
+
+    outcome = py_trees.common.Status.SUCCESS
+
+
+class DelayedFailure(Delayed):
+    """RUNNING for ``ticks - 1`` ticks, then FAILURE."""
+
+    __slots__ = ()
+
+    outcome = py_trees.common.Status.FAILURE
@@ -0,0 +1,1130 @@
+"""
+Headless throughput benchmark for every demo tree.
+
+Discovers each ``build_tree()`` in the demo directories, ticks it back to back
+with no sleeping and no console output, and reports ticks/sec, a per-tick
+latency histogram and memory allocated per tick. Results can be saved as a
+JSON baseline and later compared against, failing when a tree regresses.
+
+.. code-block:: bash
+
+   uv run python -m pytree_stuff.benchmark --save-baseline benchmark.json
+   uv run python -m pytree_stuff.benchmark --compare benchmark.json
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+import typing
+from pathlib import Path
+
+import py_trees
+
+from . import behaviours, ticking
+
+DEMO_DIRECTORIES = ("Behaviour", "Composites", "Decorators")
+
+TreeFactory = typing.Callable[[], py_trees.behaviour.Behaviour]
+
+
+def load(path: Path) -> typing.Optional[TreeFactory]:
+    """
+    Import a single demo script and return its ``build_tree``.
+
+    Args:
+        path: the demo script
+
+    Returns:
+        the factory, or None if the script doesn't define one
+    """
+    spec = importlib.util.spec_from_file_location("_benchmark_" + path.stem, path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    build_tree = getattr(module, "build_tree", None)
+    return build_tree if callable(build_tree) else None
+
+
+def discover(
+    root: Path, directories: typing.Sequence[str] = DEMO_DIRECTORIES
+) -> typing.Dict[str, TreeFactory]:
+    """
+    Import every demo script under ``root`` and collect its ``build_tree``.
+
+    Scripts without a ``build_tree`` function are skipped. Importing is safe
+    because the demos keep their ticking loops under ``__main__``.
+
+    Args:
+        root: the repository root
+        directories: demo directories, relative to the root
+
+    Returns:
+        factories keyed by the script path relative to the root
+    """
+    factories: typing.Dict[str, TreeFactory] = {}
+    for directory in directories:
+        for path in sorted((root / directory).glob("*.py")):
+            build_tree = load(path)
+            if build_tree is not None:
+                factories[path.relative_to(root).as_posix()] = build_tree
+    return factories
+
+
+def histogram(latencies_ns: typing.Sequence[int]) -> typing.Dict[str, int]:
+    """Bucket latencies into power-of-two microsecond bins, e.g. ``"<8us"``."""
+    bins: typing.Dict[int, int] = {}
+    for latency in latencies_ns:
+        upper = 1 << max(0, math.ceil(math.log2(max(latency, 1) / 1000.0)))
+        bins[upper] = bins.get(upper, 0) + 1
+    return {f"<{upper}us": bins[upper] for upper in sorted(bins)}
+
+
+def _tree(factory: TreeFactory, compiled: bool) -> typing.Any:
+    tree = py_trees.trees.BehaviourTree(root=factory())
+    tree.setup(timeout=1.0)
+    if compiled:
+        from . import compiler
+
+        return compiler.CompiledTree(tree)
+    return tree
+
+
+def measure(
+    factory: TreeFactory, ticks: int = 10000, warmup: int = 100, compiled: bool = False
+) -> typing.Dict[str, typing.Any]:
+    """
+    Benchmark a single tree.
+
+    Timing and allocation tracking are separate passes over fresh trees, so
+    tracemalloc overhead never leaks into the latency numbers.
+
+    Args:
+        factory: builds the root of the tree to benchmark
+        ticks: number of measured ticks
+        warmup: number of unmeasured ticks before timing starts
+        compiled: tick through :class:`~pytree_stuff.compiler.CompiledTree`
+
+    Returns:
+        a JSON serialisable dictionary of results
+    """
+    random.seed(0)
+    tree = _tree(factory, compiled)
+    for _ in range(warmup):
+        tree.tick()
+    latencies = [0] * ticks
+    clock = time.perf_counter_ns
+    started = clock()
+    for index in range(ticks):
+        before = clock()
+        tree.tick()
+        latencies[index] = clock() - before
+    elapsed = (clock() - started) / 1e9
+
+    random.seed(0)
+    tree = _tree(factory, compiled)
+    for _ in range(warmup):
+        tree.tick()
+    tracemalloc.start()
+    try:
+        peak_total = 0
+        first, _ = tracemalloc.get_traced_memory()
+        for _ in range(ticks):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            tree.tick()
+            _, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - current
+        last, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ticks": ticks,
+        "ticks_per_second": ticks / elapsed if elapsed > 0 else float("inf"),
+        "latency_p50_us": ticking.TickStatistics.percentile(latencies, 50) / 1e3,
+        "latency_p99_us": ticking.TickStatistics.percentile(latencies, 99) / 1e3,
+        "latency_histogram": histogram(latencies),
+        "allocated_bytes_per_tick": peak_total / ticks,
+        "retained_bytes_per_tick": (last - first) / ticks,
+    }
+
+
+class _DemoDelayedSuccess(py_trees.behaviour.Behaviour):
+    """The DelayedSuccess that used to be copied into each demo, for reference."""
+
+    def __init__(self, name="Task", ticks=3):
+        super().__init__(name)
+        self.ticks = ticks
+        self.count = 0
+
+    def initialise(self):
+        self.count = 0
+
+    def update(self):
+        self.count += 1
+        if self.count < self.ticks:
+            return py_trees.common.Status.RUNNING
+        return py_trees.common.Status.SUCCESS
+
+
+class _DemoAlwaysRunning(py_trees.behaviour.Behaviour):
+    """The AlwaysRunning that used to be copied into each demo, for reference."""
+
+    def __init__(self, name="Background"):
+        super().__init__(name)
+
+    def update(self):
+        return py_trees.common.Status.RUNNING
+
+
+def footprint(
+    factory: typing.Callable[[], py_trees.behaviour.Behaviour], instances: int = 100000
+) -> typing.Dict[str, float]:
+    """
+    Per-instance memory and construction time of a behaviour.
+
+    Args:
+        factory: creates one behaviour
+        instances: how many to create
+
+    Returns:
+        bytes per instance and microseconds per construction
+    """
+    population: typing.List[py_trees.behaviour.Behaviour] = []
+    started = time.perf_counter()
+    for _ in range(instances):
+        population.append(factory())
+    elapsed = time.perf_counter() - started
+    population.clear()
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        population = [factory() for _ in range(instances)]
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "bytes_per_instance": (after - before) / instances,
+        "construction_us": elapsed / instances * 1e6,
+    }
+
+
+def measure_simulation(
+    factory: TreeFactory, agents: int = 10000, ticks: int = 20
+) -> typing.Dict[str, float]:
+    """
+    Agent-ticks per second of one object tree per agent against :class:`~pytree_stuff.simulation.MassSimulation`.
+
+    Args:
+        factory: builds the tree every agent runs
+        agents: number of agents
+        ticks: number of ticks of every agent
+
+    Returns:
+        agent-ticks per second for both, and the number of status mismatches
+        found by :func:`~pytree_stuff.simulation.compare_with_objects`
+    """
+    from . import simulation
+
+    engine = simulation.MassSimulation(factory(), agents)
+    started = time.perf_counter()
+    for _ in range(ticks):
+        engine.tick()
+    vectorised = time.perf_counter() - started
+
+    trees = [py_trees.trees.BehaviourTree(root=factory()) for _ in range(agents)]
+    started = time.perf_counter()
+    for _ in range(ticks):
+        for tree in trees:
+            tree.tick()
+    objects = time.perf_counter() - started
+
+    return {
+        "objects_agent_ticks_per_second": agents * ticks / objects,
+        "simulation_agent_ticks_per_second": agents * ticks / vectorised,
+        "mismatches": simulation.compare_with_objects(factory),
+    }
+
+
+def measure_compiled(factory: TreeFactory, ticks: int = 10000) -> typing.Dict[str, float]:
+    """
+    Ticks per second of a tree ticked normally and through :mod:`~pytree_stuff.compiler`.
+
+    Args:
+        factory: builds the tree to benchmark
+        ticks: number of measured ticks of each
+
+    Returns:
+        ticks per second of both, the speedup, and the number of status
+        mismatches found by :func:`~pytree_stuff.compiler.compare_with_objects`
+    """
+    from . import compiler
+
+    regular = measure(factory, ticks=ticks)["ticks_per_second"]
+    compiled = measure(factory, ticks=ticks, compiled=True)["ticks_per_second"]
+    return {
+        "regular_ticks_per_second": regular,
+        "compiled_ticks_per_second": compiled,
+        "speedup": compiled / regular,
+        "mismatches": compiler.compare_with_objects(factory),
+    }
+
+
+def measure_fleet(
+    factory: TreeFactory, trees: int = 64, ticks: int = 1000, processes: typing.Optional[int] = None
+) -> typing.Dict[str, float]:
+    """
+    Tree-ticks per second of a fleet ticked in one process against :class:`~pytree_stuff.fleet.Fleet`.
+
+    Trees keep ticking after they finish, so every tree does the same amount
+    of work in both runs.
+
+    Args:
+        factory: builds every tree of the fleet
+        trees: number of trees
+        ticks: number of ticks of every tree
+        processes: worker processes, defaults to the CPU count
+
+    Returns:
+        tree-ticks per second of both, for free-running and lockstep fleets
+    """
+    from . import fleet
+
+    random.seed(0)
+    forest = [_tree(factory, compiled=False) for _ in range(trees)]
+    started = time.perf_counter()
+    for _ in range(ticks):
+        for tree in forest:
+            tree.tick()
+    single = time.perf_counter() - started
+
+    results = {"single_process_tree_ticks_per_second": trees * ticks / single}
+    for lockstep in (False, True):
+        pool = fleet.Fleet([factory] * trees, processes=processes, lockstep=lockstep, seed=0)
+        started = time.perf_counter()
+        for _ in pool.run(number_of_ticks=ticks, stop_on_terminal_state=False):
+            pass
+        elapsed = time.perf_counter() - started
+        mode = "lockstep" if lockstep else "free_running"
+        results[f"{mode}_tree_ticks_per_second"] = trees * ticks / elapsed
+    return results
+
+
+def measure_blackboard(keys: int = 10000, ticks: int = 20) -> typing.Dict[str, float]:
+    """
+    The ``Decorators/Status2BB.py`` scenario scaled up to many keys.
+
+    Every tick one writer client per key (as each ``StatusToBlackboard``
+    decorator has) publishes a status, then an observer reads every key back.
+    Measured for the stock py_trees client, the slot-based client of
+    :mod:`pytree_stuff.blackboard` and a trusted slot-based client moving all
+    keys with one bulk call each way.
+
+    Args:
+        keys: number of keys
+        ticks: number of simulated ticks
+
+    Returns:
+        key updates (one write plus one read) per second for each variant,
+        plus keys observed per second when only 1% of them change each tick,
+        rescanning every key against draining a
+        :class:`~pytree_stuff.blackboard.Subscription`, and how often a
+        consistent view can be published, copying every key against a
+        :class:`~pytree_stuff.blackboard.Snapshots` snapshot; and for sharing
+        across processes, :mod:`~pytree_stuff.shared_blackboard` against a
+        :class:`multiprocessing.Manager` dict
+    """
+    from . import blackboard
+
+    Status = py_trees.common.Status
+    cycle = (Status.RUNNING, Status.SUCCESS, Status.FAILURE)
+    names = [f"status_{index}" for index in range(keys)]
+    results = {}
+
+    py_trees.blackboard.Blackboard.clear()
+    writers = []
+    for name in names:
+        writer = py_trees.blackboard.Client(name=f"Status->BB {name}")
+        writer.register_key(key=name, access=py_trees.common.Access.WRITE)
+        writers.append(writer)
+    reader = py_trees.blackboard.Client(name="Observer")
+    for name in names:
+        reader.register_key(key=name, access=py_trees.common.Access.READ)
+    started = time.perf_counter()
+    for tick in range(ticks):
+        status = cycle[tick % 3]
+        for name, writer in zip(names, writers):
+            writer.set(name, status, overwrite=True)
+        observed = [getattr(reader, name, None) for name in names]
+    results["py_trees_updates_per_second"] = keys * ticks / (time.perf_counter() - started)
+    py_trees.blackboard.Blackboard.clear()
+
+    store = blackboard.Store()
+    slot_writers = [blackboard.Client(f"Status->BB {name}", store=store) for name in names]
+    slots = [writer.register_key(name, py_trees.common.Access.WRITE) for writer, name in zip(slot_writers, names)]
+    slot_reader = blackboard.Client("Observer", store=store)
+    for name in names:
+        slot_reader.register_key(name, py_trees.common.Access.READ)
+    started = time.perf_counter()
+    for tick in range(ticks):
+        status = cycle[tick % 3]
+        for slot, writer in zip(slots, slot_writers):
+            writer.write(slot, status)
+        observed = [slot_reader.read(slot) for slot in slots]
+    results["slots_updates_per_second"] = keys * ticks / (time.perf_counter() - started)
+
+    trusted = blackboard.Client("Trusted", store=store, trusted=True)
+    started = time.perf_counter()
+    for tick in range(ticks):
+        trusted.write_many(slots, [cycle[tick % 3]] * keys)
+        observed = trusted.read_many(slots)
+    results["trusted_bulk_updates_per_second"] = keys * ticks / (time.perf_counter() - started)
+    assert observed[-1] is cycle[(ticks - 1) % 3]
+
+    # only 1% of the keys change per tick: rescan every key, or drain a subscription
+    changing = slots[:: 100]
+    subscription = store.subscribe(names)
+    for label, drained in (("rescan", False), ("subscription", True)):
+        started = time.perf_counter()
+        for tick in range(ticks):
+            trusted.write_many(changing, [cycle[tick % 3]] * len(changing))
+            store.notify()
+            observed = subscription.drain() if drained else trusted.read_many(slots)
+        rate = keys * ticks / (time.perf_counter() - started)
+        results[f"sparse_{label}_keys_per_second"] = rate
+    subscription.close()
+
+    # publishing a consistent view for other threads after every tick
+    snapshots = blackboard.Snapshots(store)
+    for label in ("full_copy", "snapshot"):
+        started = time.perf_counter()
+        for tick in range(ticks):
+            trusted.write_many(changing, [cycle[tick % 3]] * len(changing))
+            if label == "snapshot":
+                store.notify()
+            else:
+                view = dict(store.items())
+        results[f"sparse_{label}_publishes_per_second"] = ticks / (time.perf_counter() - started)
+    snapshots.close()
+
+    # across processes: a shared memory blackboard against a manager dict
+    import multiprocessing
+
+    from . import shared_blackboard
+
+    board = shared_blackboard.SharedBlackboard.create(capacity=keys)
+    try:
+        shared_slots = [board.register(name, py_trees.common.Status) for name in names]
+        started = time.perf_counter()
+        for tick in range(ticks):
+            board.write_many(shared_slots, [cycle[tick % 3]] * keys)
+            observed = board.read_many(shared_slots)
+        results["shared_memory_updates_per_second"] = keys * ticks / (time.perf_counter() - started)
+    finally:
+        board.close()
+    with multiprocessing.Manager() as manager:
+        shared = manager.dict()
+        started = time.perf_counter()
+        for name in names:
+            shared[name] = cycle[0]
+            observed = shared[name]
+        results["manager_dict_updates_per_second"] = keys / (time.perf_counter() - started)
+    return results
+
+
+def measure_events(branches: int = 1000, ticks: int = 200) -> typing.Dict[str, float]:
+    """
+    A large, mostly idle tree ticked normally and through :mod:`pytree_stuff.events`.
+
+    The tree is a parallel of ``branches`` monitors - each a sequence of a
+    :class:`~pytree_stuff.events.CheckKey` and an inverted ``Failure`` - next
+    to one long running task. Every tick 1% of the checked keys are written.
+
+    Args:
+        branches: number of monitors
+        ticks: number of measured ticks
+
+    Returns:
+        ticks per second for both, the speedup and how many ticks ended with a
+        different root status
+    """
+    from . import blackboard, events
+
+    results: typing.Dict[str, float] = {}
+    statuses = {}
+    for mode in ("regular", "event_driven"):
+        store = blackboard.Store()
+        writer = blackboard.Client("Sensors", store=store, trusted=True)
+        slots = [store.intern(f"/sensor_{index}") for index in range(branches)]
+        writer.write_many(slots, [1.0] * branches)
+        root = py_trees.composites.Parallel(
+            "Monitors", policy=py_trees.common.ParallelPolicy.SuccessOnAll(synchronise=False)
+        )
+        root.add_child(behaviours.AlwaysRunning("Task"))
+        for index in range(branches):
+            monitor = py_trees.composites.Sequence(f"Monitor {index}", memory=False)
+            monitor.add_children(
+                [
+                    events.CheckKey(f"Sensor {index} OK?", f"sensor_{index}", lambda value: value > 0.0, store=store),
+                    py_trees.decorators.Inverter(f"Inverter {index}", py_trees.behaviours.Failure(f"Failure {index}")),
+                ]
+            )
+            root.add_child(monitor)
+        tree: typing.Any = py_trees.trees.BehaviourTree(root)
+        if mode == "event_driven":
+            tree = events.EventDrivenTree(tree, store=store)
+        changing = slots[:: 100]
+        statuses[mode] = []
+        started = time.perf_counter()
+        for tick in range(ticks):
+            # the last 1% change from valid to invalid and back
+            writer.write_many(changing, [1.0 + tick] * len(changing))
+            if tick % 50 == 49:
+                writer.write(slots[-1], -1.0)
+            elif tick % 50 == 0:
+                writer.write(slots[-1], 1.0)
+            tree.tick()
+            statuses[mode].append(root.status)
+        results[f"{mode}_ticks_per_second"] = ticks / (time.perf_counter() - started)
+    results["speedup"] = results["event_driven_ticks_per_second"] / results["regular_ticks_per_second"]
+    results["mismatches"] = sum(a != b for a, b in zip(statuses["regular"], statuses["event_driven"]))
+    return results
+
+
+def measure_guards(guards: int = 1000, ticks: int = 100, cost: int = 2000) -> typing.Dict[str, float]:
+    """
+    ``Decorators/EternalGuard_Demo.py`` scaled up, with plain and memoized conditions.
+
+    A parallel of ``guards`` eternal guards, each over a long running task
+    and checking one blackboard key with a condition that costs ``cost``
+    loop iterations. Every tick 1% of the keys are written.
+
+    Returns:
+        ticks per second for :class:`~py_trees.decorators.EternalGuard` and
+        :class:`~pytree_stuff.guards.MemoizedEternalGuard`, the speedup and the
+        shared cache's hit rate
+    """
+    from . import blackboard
+    from . import guards as memo
+
+    def expensive(value: float) -> bool:
+        total = 0.0
+        for _ in range(cost):
+            total += value
+        return total >= 0.0
+
+    def check(store: typing.Any, slot: int) -> typing.Callable[[], bool]:
+        return lambda: expensive(store.values[slot])
+
+    results: typing.Dict[str, float] = {}
+    for mode in ("plain", "memoized"):
+        store = blackboard.Store()
+        writer = blackboard.Client("Sensors", store=store, trusted=True)
+        slots = [store.intern(f"/sensor_{index}") for index in range(guards)]
+        writer.write_many(slots, [1.0] * guards)
+        cache = memo.ConditionCache(capacity=2 * guards)
+        root = py_trees.composites.Parallel(
+            "Guards", policy=py_trees.common.ParallelPolicy.SuccessOnAll(synchronise=False)
+        )
+        for index, slot in enumerate(slots):
+            task = behaviours.AlwaysRunning(f"Task {index}")
+            if mode == "plain":
+                root.add_child(py_trees.decorators.EternalGuard(f"Guard {index}", task, check(store, slot)))
+            else:
+                root.add_child(
+                    memo.MemoizedEternalGuard(
+                        f"Guard {index}",
+                        task,
+                        check(store, slot),
+                        keys=[f"sensor_{index}"],
+                        store=store,
+                        cache=cache,
+                    )
+                )
+        tree = py_trees.trees.BehaviourTree(root)
+        changing = slots[:: 100]
+        started = time.perf_counter()
+        for tick in range(ticks):
+            writer.write_many(changing, [1.0 + tick] * len(changing))
+            tree.tick()
+        results[f"{mode}_ticks_per_second"] = ticks / (time.perf_counter() - started)
+    results["speedup"] = results["memoized_ticks_per_second"] / results["plain_ticks_per_second"]
+    results["hit_rate"] = cache.summary()["hit_rate"]
+    return results
+
+
+def measure_timeouts(timeouts: int = 1000, ticks: int = 200) -> typing.Dict[str, float]:
+    """
+    ``Decorators/Timeout_Demo.py`` scaled up: many armed timeouts at once.
+
+    A parallel of ``timeouts`` timeouts, each over a long running task, ticked
+    with :class:`py_trees.decorators.Timeout` and with
+    :class:`~pytree_stuff.timers.Timeout` on a wheel advanced every tick.
+
+    Returns:
+        ticks per second for both and the speedup
+    """
+    from . import timers
+
+    results: typing.Dict[str, float] = {}
+    for mode in ("py_trees", "wheel"):
+        wheel = timers.TimerWheel()
+        root = py_trees.composites.Parallel(
+            "Timeouts", policy=py_trees.common.ParallelPolicy.SuccessOnAll(synchronise=False)
+        )
+        for index in range(timeouts):
+            task = behaviours.AlwaysRunning(f"Task {index}")
+            if mode == "py_trees":
+                root.add_child(py_trees.decorators.Timeout(f"Timeout {index}", task, duration=3600.0))
+            else:
+                root.add_child(timers.Timeout(f"Timeout {index}", task, duration=3600.0, wheel=wheel))
+        tree = py_trees.trees.BehaviourTree(root)
+        tree.add_pre_tick_handler(wheel)
+        started = time.perf_counter()
+        for _ in range(ticks):
+            tree.tick()
+        results[f"{mode}_ticks_per_second"] = ticks / (time.perf_counter() - started)
+    results["speedup"] = results["wheel_ticks_per_second"] / results["py_trees_ticks_per_second"]
+    return results
+
+
+def measure_concurrent(children: int = 8, ticks: int = 20, work: float = 0.01) -> typing.Dict[str, float]:
+    """
+    ``Composites/Parallel_demo.py`` with children that block, e.g. on I/O.
+
+    Each of ``children`` leaves sleeps for ``work`` seconds per tick under a
+    :class:`~py_trees.composites.Parallel` and under a
+    :class:`~pytree_stuff.composites.ConcurrentParallel`.
+
+    Returns:
+        mean tick latency in milliseconds for both, and the speedup
+    """
+    from . import composites
+
+    class Blocking(py_trees.behaviour.Behaviour):
+        def update(self) -> py_trees.common.Status:
+            time.sleep(work)
+            return py_trees.common.Status.RUNNING
+
+    results: typing.Dict[str, float] = {}
+    for mode, parallel in (("sequential", py_trees.composites.Parallel), ("concurrent", composites.ConcurrentParallel)):
+        root = parallel(
+            name="Parallel",
+            policy=py_trees.common.ParallelPolicy.SuccessOnAll(),
+            children=[Blocking(f"Read {index}") for index in range(children)],
+        )
+        tree = py_trees.trees.BehaviourTree(root)
+        started = time.perf_counter()
+        for _ in range(ticks):
+            tree.tick()
+        results[f"{mode}_tick_ms"] = 1e3 * (time.perf_counter() - started) / ticks
+        tree.shutdown()
+    results["speedup"] = results["sequential_tick_ms"] / results["concurrent_tick_ms"]
+    return results
+
+
+def measure_wide(children: int = 500, ticks: int = 1000) -> typing.Dict[str, float]:
+    """
+    A wide ``Composites/Parallel_demo.py``: most children finish early, a few never do.
+
+    ``children`` tasks succeeding after 1-10 ticks plus five background tasks
+    that keep running, under a synchronised
+    :class:`~py_trees.composites.Parallel` and a
+    :class:`~pytree_stuff.composites.ShortCircuitParallel`.
+
+    Returns:
+        ticks per second for both, the speedup and how many ticks ended with a
+        different root status
+    """
+    from . import composites
+
+    results: typing.Dict[str, float] = {}
+    statuses = {}
+    for mode, parallel in (("parallel", py_trees.composites.Parallel), ("short_circuit", composites.ShortCircuitParallel)):
+        tasks = [behaviours.DelayedSuccess(f"Task {index}", ticks=1 + index % 10) for index in range(children)]
+        background = [behaviours.AlwaysRunning(f"Background {index}") for index in range(5)]
+        root = parallel(
+            name="Wide",
+            policy=py_trees.common.ParallelPolicy.SuccessOnAll(synchronise=True),
+            children=tasks + background,
+        )
+        statuses[mode] = []
+        started = time.perf_counter()
+        for _ in range(ticks):
+            # the root alone: BehaviourTree.tick walks every node after each tick anyway
+            for _ in root.tick():
+                pass
+            statuses[mode].append(root.status)
+        results[f"{mode}_ticks_per_second"] = ticks / (time.perf_counter() - started)
+    results["speedup"] = results["short_circuit_ticks_per_second"] / results["parallel_ticks_per_second"]
+    results["mismatches"] = sum(a != b for a, b in zip(statuses["parallel"], statuses["short_circuit"]))
+    return results
+
+
+def measure_preemption(priorities: int = 200, ticks: int = 500, cost: int = 200) -> typing.Dict[str, float]:
+    """
+    A deep fallback chain: ``Composites/Selector_Demo.py`` without memory, scaled up.
+
+    ``priorities`` higher priority branches, each failing on a
+    :class:`~pytree_stuff.events.CheckKey` whose predicate costs ``cost`` loop
+    iterations, in front of a long running task, under a
+    :class:`~py_trees.composites.Selector` without memory and a
+    :class:`~pytree_stuff.composites.PreemptiveSelector`. Each tick one key
+    changes; every 100 ticks one branch takes over for a tick.
+
+    Returns:
+        ticks per second for both, the speedup and how many ticks ended with a
+        different running child
+    """
+    from . import blackboard, composites, events
+
+    def expensive(value: float) -> bool:
+        total = 0.0
+        for _ in range(cost):
+            total += value
+        return total > 0.0
+
+    results: typing.Dict[str, float] = {}
+    chosen = {}
+    for mode in ("selector", "preemptive"):
+        store = blackboard.Store()
+        writer = blackboard.Client("Sensors", store=store, trusted=True)
+        slots = [store.intern(f"/trigger_{index}") for index in range(priorities)]
+        writer.write_many(slots, [-1.0] * priorities)
+        children: typing.List[py_trees.behaviour.Behaviour] = [
+            events.CheckKey(f"Trigger {index}?", f"trigger_{index}", expensive, store=store)
+            for index in range(priorities)
+        ]
+        children.append(behaviours.AlwaysRunning("Patrol"))
+        if mode == "selector":
+            root: py_trees.composites.Selector = py_trees.composites.Selector("Fallbacks", memory=False, children=children)
+        else:
+            root = composites.PreemptiveSelector("Fallbacks", children=children, store=store)
+        chosen[mode] = []
+        started = time.perf_counter()
+        for tick in range(ticks):
+            writer.write(slots[tick % priorities], 1.0 if tick % 100 == 50 else -1.0 - tick)
+            if tick % 100 == 51:
+                writer.write(slots[(tick - 1) % priorities], -1.0)
+            for _ in root.tick():
+                pass
+            chosen[mode].append(root.current_child.name if root.current_child else None)
+        results[f"{mode}_ticks_per_second"] = ticks / (time.perf_counter() - started)
+    results["speedup"] = results["preemptive_ticks_per_second"] / results["selector_ticks_per_second"]
+    results["mismatches"] = sum(a != b for a, b in zip(chosen["selector"], chosen["preemptive"]))
+    return results
+
+
+def measure_backoff(clients: int = 100, ticks: int = 1000, rate_hz: float = 100.0) -> typing.Dict[str, float]:
+    """
+    ``Decorators/Retry_Demo.py`` against a resource that keeps failing, scaled up.
+
+    ``clients`` retrying requests under a parallel, each a
+    :class:`~py_trees.decorators.Retry` or a
+    :class:`~pytree_stuff.decorators.BackoffRetry` (0.1s doubling to 2s,
+    20% jitter) around a leaf that always fails, ticked ``ticks`` times at
+    ``rate_hz`` on a :class:`~pytree_stuff.clock.VirtualClock`.
+
+    Returns:
+        ticks per second and attempts on the resource for both, and the
+        reduction in attempts
+    """
+    from . import clock as clock_module
+    from . import decorators
+
+    attempts = [0]
+
+    class Request(py_trees.behaviour.Behaviour):
+        def update(self) -> py_trees.common.Status:
+            attempts[0] += 1
+            return py_trees.common.Status.FAILURE
+
+    results: typing.Dict[str, float] = {}
+    for mode in ("retry", "backoff"):
+        virtual = clock_module.VirtualClock()
+        attempts[0] = 0
+        children: typing.List[py_trees.behaviour.Behaviour] = []
+        for index in range(clients):
+            leaf = Request(f"Request {index}")
+            if mode == "retry":
+                children.append(py_trees.decorators.Retry(f"Retry {index}", leaf, num_failures=ticks))
+            else:
+                backoff = decorators.Backoff(initial=0.1, factor=2.0, maximum=2.0, jitter=0.2, seed=index)
+                children.append(
+                    decorators.BackoffRetry(f"Retry {index}", leaf, num_failures=ticks, backoff=backoff, clock=virtual)
+                )
+        root = py_trees.composites.Parallel(
+            "Clients", policy=py_trees.common.ParallelPolicy.SuccessOnAll(synchronise=False), children=children
+        )
+        started = time.perf_counter()
+        for _ in range(ticks):
+            for _ in root.tick():
+                pass
+            virtual.advance(1.0 / rate_hz)
+        results[f"{mode}_ticks_per_second"] = ticks / (time.perf_counter() - started)
+        results[f"{mode}_attempts"] = attempts[0]
+    results["reduction"] = results["retry_attempts"] / max(1, results["backoff_attempts"])
+    return results
+
+
+def measure_restart(work: int = 100_000, ticks: int = 10) -> typing.Dict[str, float]:
+    """
+    ``Decorators/OneShot_Demo.py`` with an expensive calibration child, started twice.
+
+    The child spins ``work`` loop iterations per tick for ``ticks`` ticks and
+    writes its result to the blackboard, under a
+    :class:`~pytree_stuff.decorators.PersistentOneShot` saving to a temporary
+    :class:`~pytree_stuff.decorators.ResultStore`. The second, fresh tree
+    stands in for a restarted process.
+
+    Returns:
+        milliseconds until the tree first succeeds, cold and warm, the ticks
+        each took and the speedup
+    """
+    import tempfile
+
+    from . import blackboard, decorators
+
+    class Calibrate(py_trees.behaviour.Behaviour):
+        def __init__(self, store: blackboard.Store) -> None:
+            super().__init__("Calibrate")
+            self.client = blackboard.Client(self.name, store=store)
+            self.slot = self.client.register_key("offset", py_trees.common.Access.WRITE)
+            self.count = 0
+
+        def update(self) -> py_trees.common.Status:
+            total = 0.0
+            for index in range(work):
+                total += index
+            self.count += 1
+            if self.count < ticks:
+                return py_trees.common.Status.RUNNING
+            self.client.write(self.slot, total)
+            return py_trees.common.Status.SUCCESS
+
+    results: typing.Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "oneshot.json"
+        for run in ("cold", "warm"):
+            store = blackboard.Store()
+            root = decorators.PersistentOneShot(
+                "Calibrate Once",
+                Calibrate(store),
+                key="benchmark/calibration",
+                version=str(work),
+                results=decorators.ResultStore(path),
+                outputs=["offset"],
+                store=store,
+            )
+            started = time.perf_counter()
+            count = 0
+            while root.status != py_trees.common.Status.SUCCESS:
+                for _ in root.tick():
+                    pass
+                count += 1
+            results[f"{run}_ms"] = (time.perf_counter() - started) * 1000.0
+            results[f"{run}_ticks"] = count
+    results["speedup"] = results["cold_ms"] / results["warm_ms"]
+    return results
+
+
+def compare(
+    results: typing.Dict[str, typing.Dict[str, typing.Any]],
+    baseline: typing.Dict[str, typing.Dict[str, typing.Any]],
+    tolerance: float = 0.2,
+) -> typing.List[str]:
+    """
+    Compare results against a baseline.
+
+    Args:
+        results: output of :func:`measure` keyed by tree
+        baseline: previously saved results
+        tolerance: allowed relative slowdown / allocation growth
+
+    Returns:
+        a description of each regression, empty if there were none
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result["ticks_per_second"] < reference["ticks_per_second"] * (1.0 - tolerance):
+            regressions.append(
+                f"{name}: {result['ticks_per_second']:.0f} ticks/s, "
+                f"baseline {reference['ticks_per_second']:.0f} ticks/s"
+            )
+        # a few bytes of slack so that allocation-free trees don't flap
+        allowed = reference["allocated_bytes_per_tick"] * (1.0 + tolerance) + 64
+        if result["allocated_bytes_per_tick"] > allowed:
+            regressions.append(
+                f"{name}: {result['allocated_bytes_per_tick']:.0f} B/tick allocated, "
+                f"baseline {reference['allocated_bytes_per_tick']:.0f} B/tick"
+            )
+    return regressions
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--root", type=Path, default=Path.cwd(), help="repository root")
+    parser.add_argument("--ticks", type=int, default=10000, help="measured ticks per tree")
+    parser.add_argument("--filter", default="", help="only benchmark trees whose path contains this")
+    parser.add_argument("--histogram", action="store_true", help="print latency histograms")
+    parser.add_argument("--save-baseline", type=Path, help="write results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="fail if slower than this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument(
+        "--footprint",
+        action="store_true",
+        help="compare memory and construction time of pytree_stuff.behaviours with the old demo classes",
+    )
+    parser.add_argument(
+        "--simulate",
+        type=int,
+        metavar="AGENTS",
+        help="compare pytree_stuff.simulation against object trees for this many agents",
+    )
+    parser.add_argument(
+        "--compiled",
+        action="store_true",
+        help="compare ticking through pytree_stuff.compiler against the regular tree",
+    )
+    parser.add_argument(
+        "--fleet",
+        type=int,
+        metavar="TREES",
+        help="compare ticking this many trees in one process against pytree_stuff.fleet",
+    )
+    parser.add_argument(
+        "--blackboard",
+        type=int,
+        metavar="KEYS",
+        help="compare pytree_stuff.blackboard against the stock client with this many keys",
+    )
+    parser.add_argument(
+        "--events",
+        type=int,
+        metavar="BRANCHES",
+        help="compare event-driven ticking (pytree_stuff.events) on a mostly idle tree of this many monitors",
+    )
+    parser.add_argument(
+        "--guards",
+        type=int,
+        metavar="GUARDS",
+        help="compare EternalGuard against pytree_stuff.guards.MemoizedEternalGuard with this many guards",
+    )
+    parser.add_argument(
+        "--timeouts",
+        type=int,
+        metavar="TIMEOUTS",
+        help="compare py_trees Timeout against pytree_stuff.timers with this many armed timeouts",
+    )
+    parser.add_argument(
+        "--concurrent",
+        type=int,
+        metavar="CHILDREN",
+        help="compare Parallel against pytree_stuff.composites.ConcurrentParallel with this many blocking children",
+    )
+    parser.add_argument(
+        "--wide",
+        type=int,
+        metavar="CHILDREN",
+        help="compare Parallel against pytree_stuff.composites.ShortCircuitParallel with this many children",
+    )
+    parser.add_argument(
+        "--preemption",
+        type=int,
+        metavar="PRIORITIES",
+        help="compare a Selector without memory against pytree_stuff.composites.PreemptiveSelector",
+    )
+    parser.add_argument(
+        "--backoff",
+        type=int,
+        metavar="CLIENTS",
+        help="compare Retry against pytree_stuff.decorators.BackoffRetry on a failing resource",
+    )
+    parser.add_argument(
+        "--restart",
+        type=int,
+        metavar="WORK",
+        help="time an expensive pytree_stuff.decorators.PersistentOneShot child before and after a restart",
+    )
+    args = parser.parse_args(argv)
+
+    if args.restart:
+        result = measure_restart(work=args.restart)
+        print(
+            f"cold {result['cold_ms']:>9.2f} ms ({result['cold_ticks']:.0f} ticks)"
+            f"  warm {result['warm_ms']:>9.2f} ms ({result['warm_ticks']:.0f} ticks)"
+            f"  x{result['speedup']:.1f}"
+        )
+        return 0
+
+    if args.backoff:
+        result = measure_backoff(clients=args.backoff)
+        print(
+            f"retry {result['retry_ticks_per_second']:>9.0f} ticks/s {result['retry_attempts']:>8.0f} attempts"
+            f"  backoff {result['backoff_ticks_per_second']:>9.0f} ticks/s {result['backoff_attempts']:>8.0f} attempts"
+            f"  x{result['reduction']:.1f} fewer"
+        )
+        return 0
+
+    if args.preemption:
+        result = measure_preemption(priorities=args.preemption)
+        print(
+            f"selector {result['selector_ticks_per_second']:>9.0f}"
+            f"  preemptive {result['preemptive_ticks_per_second']:>9.0f} ticks/s"
+            f"  x{result['speedup']:.2f}  mismatches {result['mismatches']}"
+        )
+        return 0
+
+    if args.wide:
+        result = measure_wide(children=args.wide)
+        print(
+            f"parallel {result['parallel_ticks_per_second']:>9.0f}"
+            f"  short-circuit {result['short_circuit_ticks_per_second']:>9.0f} ticks/s"
+            f"  x{result['speedup']:.2f}  mismatches {result['mismatches']}"
+        )
+        return 0
+
+    if args.concurrent:
+        result = measure_concurrent(children=args.concurrent)
+        print(
+            f"sequential {result['sequential_tick_ms']:>8.2f} ms/tick"
+            f"  concurrent {result['concurrent_tick_ms']:>8.2f} ms/tick  x{result['speedup']:.2f}"
+        )
+        return 0
+
+    if args.timeouts:
+        result = measure_timeouts(timeouts=args.timeouts)
+        print(
+            f"py_trees {result['py_trees_ticks_per_second']:>9.0f}"
+            f"  wheel {result['wheel_ticks_per_second']:>9.0f} ticks/s  x{result['speedup']:.2f}"
+        )
+        return 0
+
+    if args.guards:
+        result = measure_guards(guards=args.guards)
+        print(
+            f"plain {result['plain_ticks_per_second']:>9.0f}"
+            f"  memoized {result['memoized_ticks_per_second']:>9.0f} ticks/s"
+            f"  x{result['speedup']:.2f}  hit rate {result['hit_rate']:.1%}"
+        )
+        return 0
+
+    if args.events:
+        result = measure_events(branches=args.events)
+        print(
+            f"regular {result['regular_ticks_per_second']:>9.0f}"
+            f"  event-driven {result['event_driven_ticks_per_second']:>9.0f} ticks/s"
+            f"  x{result['speedup']:.2f}  mismatches {result['mismatches']}"
+        )
+        return 0
+
+    if args.blackboard:
+        result = measure_blackboard(keys=args.blackboard)
+        for variant, rate in result.items():
+            print(f"{variant:<40} {rate:>12.0f}")
+        return 0
+
+    if args.fleet:
+        for name, factory in discover(args.root).items():
+            if args.filter not in name:
+                continue
+            try:
+                result = measure_fleet(factory, trees=args.fleet, ticks=min(args.ticks, 1000))
+            except Exception as e:
+                print(f"{name:<40} skipped [{type(e).__name__}: {e}]")
+                continue
+            print(
+                f"{name:<40} single {result['single_process_tree_ticks_per_second']:>9.0f}"
+                f"  free-running {result['free_running_tree_ticks_per_second']:>9.0f}"
+                f"  lockstep {result['lockstep_tree_ticks_per_second']:>9.0f} tree-ticks/s"
+            )
+        return 0
+
+    if args.compiled:
+        for name, factory in discover(args.root).items():
+            if args.filter not in name:
+                continue
+            try:
+                result = measure_compiled(factory, ticks=args.ticks)
+            except Exception as e:
+                print(f"{name:<40} skipped [{type(e).__name__}: {e}]")
+                continue
+            print(
+                f"{name:<40} regular {result['regular_ticks_per_second']:>9.0f}"
+                f"  compiled {result['compiled_ticks_per_second']:>9.0f} ticks/s"
+                f"  x{result['speedup']:.2f}  mismatches {result['mismatches']}"
+            )
+        return 0
+
+    if args.simulate:
+        for name, factory in discover(args.root).items():
+            if args.filter not in name:
+                continue
+            try:
+                result = measure_simulation(factory, agents=args.simulate)
+            except Exception as e:
+                print(f"{name:<40} skipped [{type(e).__name__}: {e}]")
+                continue
+            print(
+                f"{name:<40} objects {result['objects_agent_ticks_per_second']:>10.0f}"
+                f"  simulation {result['simulation_agent_ticks_per_second']:>12.0f} agent-ticks/s"
+                f"  mismatches {result['mismatches']}"
+            )
+        return 0
+
+    if args.footprint:
+        candidates = {
+            "demo DelayedSuccess": lambda: _DemoDelayedSuccess("Task", ticks=3),
+            "pytree_stuff DelayedSuccess": lambda: behaviours.DelayedSuccess("Task", ticks=3),
+            "demo AlwaysRunning": lambda: _DemoAlwaysRunning("Background"),
+            "pytree_stuff AlwaysRunning": lambda: behaviours.AlwaysRunning("Background"),
+        }
+        for name, factory in candidates.items():
+            result = footprint(factory)
+            print(
+                f"{name:<30} {result['bytes_per_instance']:>7.0f} B/instance"
+                f"  {result['construction_us']:>6.2f} us/construction"
+            )
+        return 0
+
+    results = {}
+    for name, factory in discover(args.root).items():
+        if args.filter not in name:
+            continue
+        try:
+            result = measure(factory, ticks=args.ticks)
+        except Exception as e:
+            print(f"{name:<40} skipped [{type(e).__name__}: {e}]")
+            continue
+        results[name] = result
+        print(
+            f"{name:<40} {result['ticks_per_second']:>10.0f} ticks/s"
+            f"  p50 {result['latency_p50_us']:>7.1f}us  p99 {result['latency_p99_us']:>7.1f}us"
+            f"  {result['allocated_bytes_per_tick']:>8.0f} B/tick"
+        )
+        if args.histogram:
+            for bucket, count in result["latency_histogram"].items():
+                print(f"    {bucket:>8} {count}")
+
+    if args.save_baseline is not None:
+        args.save_baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"baseline saved to {args.save_baseline}")
+    if args.compare is not None:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,556 @@
+"""
+A slot-based blackboard for high key counts and bulk access.
+
+Every read through a :class:`py_trees.blackboard.Client` resolves the key's
+absolute name, checks it against the client's read / write / exclusive sets,
+looks up its remapping and only then indexes the global storage dict. Here
+keys are interned once, when they are registered, to an integer slot in a
+:class:`Store`; afterwards a client reads and writes by slot - a list index
+plus, unless the client is trusted, a set membership check - and can move many
+keys in a single call with :meth:`Client.read_many` / :meth:`Client.write_many`.
+
+.. code-block:: python
+
+   client = blackboard.Client("Observer")
+   slot = client.register_key("cyclist_status", py_trees.common.Access.READ)
+   status = client.read(slot)
+
+Every slot carries a version counter that increases whenever a write changes
+its value, and the store tracks which slots changed since it last notified its
+subscribers. Consumers subscribe to the keys they care about and, after each
+tick, drain the keys that changed instead of polling every key:
+
+.. code-block:: python
+
+   subscription = store.subscribe(["cyclist_status"])
+   tree.add_post_tick_handler(store.notify)
+   ...
+   for key in subscription.drain():
+       ...
+
+Readers on other threads (telemetry, UIs) shouldn't touch the live values.
+:class:`Snapshots` publishes an immutable, versioned :class:`Snapshot` of the
+store every time it notifies, i.e. at the end of each tick. Snapshots share
+every chunk of slots that didn't change with their predecessor, so publishing
+costs time proportional to the changes, and readers pick up the latest one
+with a single attribute read - they never block the tick loop and never see a
+half-written tick:
+
+.. code-block:: python
+
+   snapshots = blackboard.Snapshots(store)
+   tree.add_post_tick_handler(store.notify)
+   ...
+   view = snapshots.latest  # from any thread
+   print(view.tick, view["cyclist_status"])
+
+Compare against the stock client with
+``python -m pytree_stuff.benchmark --blackboard 10000``.
+"""
+
+import collections
+import typing
+
+import py_trees
+
+Access = py_trees.common.Access
+
+
+class _Unset:
+    def __repr__(self) -> str:
+        return "<unset>"
+
+
+UNSET: typing.Any = _Unset()
+"""Value of a slot that hasn't been written yet."""
+
+
+def _unchanged(old: typing.Any, value: typing.Any) -> bool:
+    """Whether writing ``value`` over ``old`` leaves the slot as it was."""
+    if old is value:
+        return True
+    # 1 == 1.0 == True, but a reader would see a different value
+    if type(old) is not type(value):
+        return False
+    try:
+        # nan != nan, but rewriting it isn't a change either
+        return bool(old == value) or (old != old and value != value)
+    except Exception:
+        # e.g. arrays, which don't compare to a single bool
+        return False
+
+
+class Store:
+    """
+    Key to slot registry plus the slot values.
+
+    Args:
+        name: a label, for error messages
+    """
+
+    def __init__(self, name: str = "blackboard") -> None:
+        self.name = name
+        self.slots: typing.Dict[str, int] = {}
+        self.keys: typing.List[str] = []
+        self.values: typing.List[typing.Any] = []
+        self.versions: typing.List[int] = []
+        self.exclusive: typing.Dict[int, str] = {}
+        self.dirty: typing.Set[int] = set()
+        self.subscribers: typing.Dict[int, typing.List["Subscription"]] = {}
+        self.snapshots: typing.List["Snapshots"] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def intern(self, key: str) -> int:
+        """Slot of ``key``, allocating one if it's new."""
+        key = py_trees.blackboard.Blackboard.absolute_name("/", key)
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = len(self.keys)
+            self.slots[key] = slot
+            self.keys.append(key)
+            self.values.append(UNSET)
+            self.versions.append(0)
+        return slot
+
+    def slot(self, key: str) -> int:
+        """
+        Slot of an already interned key.
+
+        Raises:
+            KeyError: if the key was never registered
+        """
+        return self.slots[py_trees.blackboard.Blackboard.absolute_name("/", key)]
+
+    def set(self, slot: int, value: typing.Any) -> bool:
+        """
+        Write a slot, bumping its version if the value changed.
+
+        Returns:
+            whether the value changed
+        """
+        if _unchanged(self.values[slot], value):
+            return False
+        self.values[slot] = value
+        self.versions[slot] += 1
+        self.dirty.add(slot)
+        return True
+
+    def subscribe(
+        self,
+        keys: typing.Iterable[str],
+        callback: typing.Optional[typing.Callable[[typing.List[str]], None]] = None,
+    ) -> "Subscription":
+        """
+        Get told which of ``keys`` changed, see :class:`Subscription`.
+
+        Args:
+            keys: the keys of interest, interned if they are new
+            callback: called by :meth:`notify` with the changed keys
+        """
+        subscription = Subscription(self, [self.intern(key) for key in keys], callback)
+        for slot in subscription.slots:
+            self.subscribers.setdefault(slot, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: "Subscription") -> None:
+        """Stop notifying a subscription."""
+        for slot in subscription.slots:
+            subscribers = self.subscribers.get(slot, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+
+    def notify(self, tree: typing.Any = None) -> None:
+        """
+        Hand the slots changed since the last call to their subscribers.
+
+        Also publishes a new snapshot to every :class:`Snapshots` of the
+        store. Costs time proportional to the number of changed slots, not
+        the number of keys.
+
+        Args:
+            tree: the tree that just ticked, when used as a post tick handler
+        """
+        tick = None if tree is None else tree.count + 1
+        for snapshots in self.snapshots:
+            snapshots.publish(self.dirty, tick)
+        if not self.dirty:
+            return
+        dirty, self.dirty = self.dirty, set()
+        touched: typing.Dict[int, Subscription] = {}
+        for slot in dirty:
+            for subscription in self.subscribers.get(slot, ()):
+                subscription.pending.add(slot)
+                touched[id(subscription)] = subscription
+        for subscription in touched.values():
+            if subscription.callback is not None:
+                subscription.callback(subscription.drain())
+
+    def items(self) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+        """Every key that has been set, with its value."""
+        for key, value in zip(self.keys, self.values):
+            if value is not UNSET:
+                yield key, value
+
+    def clear(self) -> None:
+        """Forget every key, invalidating all slots."""
+        # new objects rather than emptied ones, snapshots keep the old layout
+        self.slots = {}
+        self.keys = []
+        self.values.clear()
+        self.versions.clear()
+        self.exclusive.clear()
+        self.dirty.clear()
+        self.subscribers.clear()
+
+
+class Subscription:
+    """
+    Changed keys of interest, created by :meth:`Store.subscribe`.
+
+    Slots changed since the last :meth:`drain` accumulate every time the
+    store notifies, a slot that changed several times is reported once.
+
+    Args:
+        store: the store
+        slots: the slots of interest
+        callback: called by :meth:`Store.notify` with the changed keys
+    """
+
+    def __init__(
+        self,
+        store: Store,
+        slots: typing.List[int],
+        callback: typing.Optional[typing.Callable[[typing.List[str]], None]] = None,
+    ) -> None:
+        self.store = store
+        self.slots = slots
+        self.callback = callback
+        self.pending: typing.Set[int] = set()
+
+    @property
+    def changed(self) -> bool:
+        """Whether anything changed since the last drain."""
+        return bool(self.pending)
+
+    def drain(self) -> typing.List[str]:
+        """The keys that changed since the last call, in slot order."""
+        if not self.pending:
+            return []
+        pending, self.pending = self.pending, set()
+        return [self.store.keys[slot] for slot in sorted(pending)]
+
+    def close(self) -> None:
+        """Unsubscribe."""
+        self.store.unsubscribe(self)
+
+
+class Snapshot:
+    """
+    An immutable view of a :class:`Store`, published by :class:`Snapshots`.
+
+    Values are shared with the store, not copied: replacing a value in the
+    store never affects a snapshot, mutating a value object in place does.
+    Keys resolve to slots as they did when the snapshot was taken, even after
+    :meth:`Store.clear`.
+
+    Attributes:
+        version: increases by one with every published snapshot
+        tick: the tick it was taken after, if known
+    """
+
+    __slots__ = ("store", "version", "tick", "size", "chunks", "slots", "keys")
+
+    def __init__(
+        self,
+        store: Store,
+        version: int,
+        tick: typing.Optional[int],
+        size: int,
+        chunks: typing.Tuple[typing.Tuple[typing.Any, ...], ...],
+    ) -> None:
+        self.store = store
+        self.version = version
+        self.tick = tick
+        self.size = size
+        self.chunks = chunks
+        # the store only appends to these until it's cleared, which replaces
+        # them, so up to ``size`` they stay as they were
+        self.slots = store.slots
+        self.keys = store.keys
+
+    def __len__(self) -> int:
+        return self.size
+
+    def value(self, slot: int) -> typing.Any:
+        """Value of a slot, :data:`UNSET` if it hadn't been written."""
+        if not 0 <= slot < self.size:
+            raise IndexError(f"slot {slot} is not in snapshot {self.version}")
+        return self.chunks[slot >> Snapshots.CHUNK_BITS][slot & (Snapshots.CHUNK - 1)]
+
+    def __getitem__(self, key: str) -> typing.Any:
+        """
+        Value of a key.
+
+        Raises:
+            KeyError: if the key didn't exist or wasn't set when the snapshot was taken
+        """
+        slot = self.slots.get(py_trees.blackboard.Blackboard.absolute_name("/", key))
+        value = UNSET if slot is None or slot >= self.size else self.value(slot)
+        if value is UNSET:
+            raise KeyError(f"'{key}' is not set in snapshot {self.version}")
+        return value
+
+    def get(self, key: str, default: typing.Any = None) -> typing.Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """Every key that was set, with its value."""
+        keys = self.keys
+        return {
+            keys[slot]: value
+            for slot in range(self.size)
+            for value in (self.value(slot),)
+            if value is not UNSET
+        }
+
+
+class Snapshots:
+    """
+    Publish copy-on-write snapshots of a store on every :meth:`Store.notify`.
+
+    Slots are grouped into chunks of :attr:`CHUNK`; a new snapshot rebuilds
+    only the chunks holding changed slots and shares the rest.
+
+    Args:
+        store: the store to snapshot, starts publishing immediately
+        history: number of previous snapshots to keep in :attr:`history`
+    """
+
+    CHUNK_BITS = 6
+    CHUNK = 1 << CHUNK_BITS
+
+    def __init__(self, store: Store, history: int = 0) -> None:
+        self.store = store
+        self.history: typing.Deque[Snapshot] = collections.deque(maxlen=history)
+        self.latest = Snapshot(store, 0, None, 0, ())
+        self.publish(set(range(len(store))), None)
+        store.snapshots.append(self)
+
+    def publish(self, dirty: typing.Iterable[int], tick: typing.Optional[int] = None) -> Snapshot:
+        """Publish a new snapshot, ``dirty`` being the slots changed since the last one."""
+        previous = self.latest
+        values = self.store.values
+        size = len(values)
+        count = (size + self.CHUNK - 1) >> self.CHUNK_BITS
+        stale = {slot >> self.CHUNK_BITS for slot in dirty}
+        if size > previous.size:
+            # new slots were appended to the last chunk, or beyond it
+            stale.update(range(previous.size >> self.CHUNK_BITS, count))
+        if stale:
+            chunks = list(previous.chunks)
+            chunks.extend(() for _ in range(count - len(chunks)))
+            for chunk in stale:
+                if chunk < count:
+                    chunks[chunk] = tuple(values[chunk << self.CHUNK_BITS:(chunk + 1) << self.CHUNK_BITS])
+            shared = tuple(chunks)
+        else:
+            shared = previous.chunks
+        snapshot = Snapshot(self.store, previous.version + 1, tick, size, shared)
+        if self.history.maxlen:
+            self.history.append(previous)
+        # a single reference assignment, atomic for readers on other threads
+        self.latest = snapshot
+        return snapshot
+
+    def close(self) -> None:
+        """Stop publishing."""
+        if self in self.store.snapshots:
+            self.store.snapshots.remove(self)
+
+
+_default = Store()
+
+
+def default_store() -> Store:
+    """The store shared by clients that weren't given one."""
+    return _default
+
+
+class Client:
+    """
+    Slot-based counterpart of :class:`py_trees.blackboard.Client`.
+
+    Keys are registered with the same access levels as py_trees; write
+    access implies read access. A ``trusted`` client skips the per-access
+    permission checks, registration is still checked.
+
+    Args:
+        name: the client name, for error messages
+        namespace: prefix for relative keys, as in py_trees
+        store: defaults to :func:`default_store`
+        trusted: skip the read / write permission checks
+    """
+
+    def __init__(
+        self,
+        name: str,
+        namespace: str = "/",
+        store: typing.Optional[Store] = None,
+        trusted: bool = False,
+    ) -> None:
+        self.name = name
+        self.namespace = namespace
+        self.store = store if store is not None else _default
+        self.trusted = trusted
+        self.readable: typing.Set[int] = set()
+        self.writable: typing.Set[int] = set()
+
+    def register_key(self, key: str, access: py_trees.common.Access) -> int:
+        """
+        Register ``key`` with this client.
+
+        Args:
+            key: absolute, or relative to the client's namespace
+            access: read, write or exclusive write
+
+        Returns:
+            the slot to use for subsequent access
+
+        Raises:
+            AttributeError: if exclusive write access conflicts with another client
+            TypeError: if the access argument is of incorrect type
+        """
+        key = py_trees.blackboard.Blackboard.absolute_name(self.namespace, key)
+        slot = self.store.intern(key)
+        if access == Access.READ:
+            self.readable.add(slot)
+            return slot
+        if not isinstance(access, Access):
+            raise TypeError(f"access argument is of incorrect type [{type(access)}]")
+        owner = self.store.exclusive.get(slot)
+        if owner is not None and owner != self.name:
+            raise AttributeError(
+                f"'{self.name}' requested write on key '{key}', but '{owner}' has exclusive write access"
+            )
+        if access == Access.EXCLUSIVE_WRITE:
+            self.store.exclusive[slot] = self.name
+        self.readable.add(slot)
+        self.writable.add(slot)
+        return slot
+
+    def slot(self, key: str) -> int:
+        """Slot of a key registered with this client."""
+        return self.store.slot(py_trees.blackboard.Blackboard.absolute_name(self.namespace, key))
+
+    def read(self, slot: int) -> typing.Any:
+        """
+        Value of a slot.
+
+        Raises:
+            AttributeError: if the client doesn't have read access
+            KeyError: if the slot hasn't been written yet
+        """
+        if not self.trusted and slot not in self.readable:
+            raise AttributeError(
+                f"client '{self.name}' does not have read access to '{self.store.keys[slot]}'"
+            )
+        value = self.store.values[slot]
+        if value is UNSET:
+            raise KeyError(
+                f"client '{self.name}' tried to access '{self.store.keys[slot]}' but it does not yet exist"
+            )
+        return value
+
+    def write(self, slot: int, value: typing.Any) -> None:
+        """
+        Set the value of a slot.
+
+        Raises:
+            AttributeError: if the client doesn't have write access
+        """
+        if not self.trusted and slot not in self.writable:
+            raise AttributeError(
+                f"client '{self.name}' does not have write access to '{self.store.keys[slot]}'"
+            )
+        self.store.set(slot, value)
+
+    def version(self, slot: int) -> int:
+        """How many times the slot's value has changed, for cheap change checks."""
+        return self.store.versions[slot]
+
+    def read_many(
+        self, slots: typing.Sequence[int], default: typing.Any = None
+    ) -> typing.List[typing.Any]:
+        """
+        Values of many slots in one call.
+
+        Args:
+            slots: the slots to read
+            default: returned for slots that haven't been written yet
+
+        Raises:
+            AttributeError: if the client doesn't have read access to all of them
+        """
+        if not self.trusted and not self.readable.issuperset(slots):
+            denied = [self.store.keys[slot] for slot in slots if slot not in self.readable]
+            raise AttributeError(f"client '{self.name}' does not have read access to {denied}")
+        values = self.store.values
+        return [value if value is not UNSET else default for value in map(values.__getitem__, slots)]
+
+    def write_many(self, slots: typing.Sequence[int], values: typing.Iterable[typing.Any]) -> None:
+        """
+        Set many slots in one call.
+
+        Raises:
+            AttributeError: if the client doesn't have write access to all of them
+        """
+        if not self.trusted and not self.writable.issuperset(slots):
+            denied = [self.store.keys[slot] for slot in slots if slot not in self.writable]
+            raise AttributeError(f"client '{self.name}' does not have write access to {denied}")
+        # Store.set, inlined
+        storage, versions, dirty = self.store.values, self.store.versions, self.store.dirty
+        for slot, value in zip(slots, values):
+            old = storage[slot]
+            if old is value or _unchanged(old, value):
+                continue
+            storage[slot] = value
+            versions[slot] += 1
+            dirty.add(slot)
+
+
+class StatusToSlot(py_trees.decorators.Decorator):
+    """
+    :class:`~py_trees.decorators.StatusToBlackboard` for a :class:`Store`.
+
+    Args:
+        name: the decorator name
+        child: the child behaviour or subtree
+        variable_name: the key to write the child's status to
+        store: defaults to :func:`default_store`
+    """
+
+    def __init__(
+        self,
+        name: str,
+        child: py_trees.behaviour.Behaviour,
+        variable_name: str,
+        store: typing.Optional[Store] = None,
+    ) -> None:
+        super().__init__(name=name, child=child)
+        self.variable_name = variable_name
+        self.client = Client(name, store=store)
+        self.slot = self.client.register_key(variable_name, Access.WRITE)
+
+    def update(self) -> py_trees.common.Status:
+        """
+        Reflect the decorated child's status to the store.
+
+        Returns: the decorated child's status
+        """
+        self.client.write(self.slot, self.decorated.status)
+        return self.decorated.status
@@ -0,0 +1,103 @@
+"""
+Pluggable time sources for the tick loop and time-dependent behaviours.
+
+Everything in :mod:`pytree_stuff` that reads or waits on time - the
+:class:`~pytree_stuff.ticking.TickRunner`, :class:`~pytree_stuff.timers.TimerWheel`
+(and so :class:`~pytree_stuff.timers.Timeout`), memoized guards, event-driven
+ticking - uses :func:`default_clock` unless given a clock of its own. The
+default is the real, monotonic :class:`Clock`; a :class:`VirtualClock` moves
+only when the runner "sleeps", so a scenario ticking at 1 Hz for an hour runs
+in however long 3600 ticks take, with identical timing decisions:
+
+.. code-block:: python
+
+   clock.set_default_clock(clock.VirtualClock())
+   tree = py_trees.trees.BehaviourTree(root=build_tree())
+   ticking.TickRunner(tree, rate_hz=1.0).run(number_of_ticks=3600)
+
+Pass ``--virtual`` to any demo to run it this way. Set the clock before
+arming timers, timers armed on one clock don't carry over to another.
+"""
+
+import time
+import typing
+
+
+class Clock:
+    """Real time: :func:`time.monotonic` and :func:`time.sleep`."""
+
+    virtual = False
+
+    def now(self) -> float:
+        """Seconds on a monotonic scale, only differences are meaningful."""
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        """Wait for ``seconds``, returning at once if not positive."""
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """
+    Simulated time that only moves when told to.
+
+    :meth:`sleep` advances it instantly instead of waiting.
+
+    Args:
+        start: the initial reading, in seconds
+    """
+
+    virtual = True
+
+    def __init__(self, start: float = 0.0) -> None:
+        self.time = start
+
+    def now(self) -> float:
+        return self.time
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+
+    def advance(self, seconds: float) -> None:
+        """Move time forward, ignoring negative amounts."""
+        if seconds > 0:
+            self.time += seconds
+
+
+_default_clock: Clock = Clock()
+
+
+def default_clock() -> Clock:
+    """The clock used by anything not given one, real time unless changed."""
+    return _default_clock
+
+
+def set_default_clock(clock: Clock) -> Clock:
+    """
+    Replace the default clock.
+
+    Returns:
+        the previous default, e.g. to restore it afterwards
+    """
+    global _default_clock
+    previous, _default_clock = _default_clock, clock
+    return previous
+
+
+def now() -> float:
+    """The default clock's current reading."""
+    return _default_clock.now()
+
+
+def resolve(clock: typing.Union[Clock, typing.Callable[[], float], None]) -> typing.Callable[[], float]:
+    """
+    A time source from a clock, a callable or None.
+
+    None follows :func:`default_clock` even if it is replaced later.
+    """
+    if clock is None:
+        return now
+    if isinstance(clock, Clock):
+        return clock.now
+    return clock
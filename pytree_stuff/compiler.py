@@ -0,0 +1,400 @@
+"""
+Compile a tree into a flat tick program.
+
+Ticking a py_trees tree walks a chain of generators through every composite
+and decorator, formats a debug log message per node and rebuilds
+``list(Status)`` for every status check. :func:`compile` flattens the tree
+once into per-node tables - an opcode, the behaviour, a tuple of child
+indices and, for composites with memory, a resume cursor that replaces
+``children.index(current_child)`` - and :class:`Program` runs them with a
+small interpreter.
+
+The interpreter reproduces the py_trees 2.3 semantics of ``Sequence``,
+``Selector``, ``Parallel`` (``SuccessOnAll`` / ``SuccessOnOne``), plain
+:class:`~py_trees.decorators.Decorator` subclasses and leaves, calling the
+user hooks (``initialise`` / ``update`` / ``terminate``) and ``stop()`` on the
+real behaviour objects, so statuses, ``current_child`` and the console / dot
+displays are unchanged. Any behaviour that overrides ``tick()`` (e.g.
+``EternalGuard`` or ``OneShot``), or a composite configured in a way the
+interpreter doesn't handle, falls back to its own generator.
+
+.. code-block:: python
+
+   tree = py_trees.trees.BehaviourTree(root=build_tree())
+   compiled = compiler.CompiledTree(tree)
+   ticking.TickRunner(compiled, rate_hz=100.0).run()
+"""
+
+import typing
+
+import py_trees
+
+Status = py_trees.common.Status
+INVALID, RUNNING, SUCCESS, FAILURE = (
+    Status.INVALID,
+    Status.RUNNING,
+    Status.SUCCESS,
+    Status.FAILURE,
+)
+_VALID = frozenset(Status)
+
+LEAF, SEQUENCE, SELECTOR, PARALLEL, DECORATOR, FALLBACK = range(6)
+
+OPCODE_NAMES = ("LEAF", "SEQUENCE", "SELECTOR", "PARALLEL", "DECORATOR", "FALLBACK")
+
+
+def _opcode(behaviour: py_trees.behaviour.Behaviour) -> int:
+    kind = type(behaviour)
+    if kind is py_trees.composites.Sequence:
+        return SEQUENCE
+    if kind is py_trees.composites.Selector:
+        return SELECTOR
+    if kind is py_trees.composites.Parallel and type(behaviour.policy) in (
+        py_trees.common.ParallelPolicy.SuccessOnAll,
+        py_trees.common.ParallelPolicy.SuccessOnOne,
+    ):
+        return PARALLEL
+    if isinstance(behaviour, py_trees.decorators.Decorator):
+        if kind.tick is py_trees.decorators.Decorator.tick:
+            return DECORATOR
+        return FALLBACK
+    if isinstance(behaviour, py_trees.composites.Composite):
+        return FALLBACK
+    if kind.tick is py_trees.behaviour.Behaviour.tick and not behaviour.children:
+        return LEAF
+    return FALLBACK
+
+
+class Program:
+    """
+    A compiled tick program for one tree.
+
+    Args:
+        root: the root of the tree to compile
+
+    Attributes:
+        opcodes: opcode of every node, in pre-order
+        behaviours: the behaviour object behind every node
+        children: child node indices of every node
+        resume: resume cursor of every composite with memory
+    """
+
+    def __init__(self, root: py_trees.behaviour.Behaviour) -> None:
+        self.opcodes: typing.List[int] = []
+        self.behaviours: typing.List[py_trees.behaviour.Behaviour] = []
+        self.children: typing.List[typing.Tuple[int, ...]] = []
+        self.resume: typing.List[int] = []
+        # leaves that use the stock Behaviour.stop() can be stopped inline
+        self.plain_stop: typing.List[bool] = []
+        # called with every node the regular generators would yield, in order
+        self.visit: typing.Optional[typing.Callable[[py_trees.behaviour.Behaviour], None]] = None
+        self._emit(root)
+
+    def _emit(self, behaviour: py_trees.behaviour.Behaviour) -> int:
+        index = len(self.opcodes)
+        opcode = _opcode(behaviour)
+        self.opcodes.append(opcode)
+        self.behaviours.append(behaviour)
+        self.children.append(())
+        self.resume.append(0)
+        self.plain_stop.append(type(behaviour).stop is py_trees.behaviour.Behaviour.stop)
+        if opcode != FALLBACK:
+            self.children[index] = tuple(self._emit(child) for child in behaviour.children)
+        return index
+
+    def listing(self) -> str:
+        """Human readable dump of the program, one node per line."""
+        lines = []
+        for index, opcode in enumerate(self.opcodes):
+            lines.append(
+                f"{index:>4} {OPCODE_NAMES[opcode]:<10} {self.behaviours[index].name}"
+                f" -> {list(self.children[index])}"
+            )
+        return "\n".join(lines)
+
+    def tick(self) -> None:
+        """Tick the root once, as ``for _ in root.tick(): pass`` would."""
+        self._run(0)
+
+    def _run(self, index: int) -> None:
+        opcode = self.opcodes[index]
+        behaviour = self.behaviours[index]
+        if opcode == LEAF:
+            if behaviour.status != RUNNING:
+                behaviour.initialise()
+            new_status = behaviour.update()
+            if new_status not in _VALID:
+                behaviour.logger.error(
+                    "A behaviour returned an invalid status, setting to INVALID [%s][%s]"
+                    % (new_status, behaviour.name)
+                )
+                new_status = INVALID
+            if new_status != RUNNING:
+                if self.plain_stop[index]:
+                    behaviour.terminate(new_status)
+                else:
+                    behaviour.stop(new_status)
+            behaviour.status = new_status
+        elif opcode == SEQUENCE:
+            self._sequence(index, behaviour)
+        elif opcode == SELECTOR:
+            self._selector(index, behaviour)
+        elif opcode == PARALLEL:
+            self._parallel(index, behaviour)
+        elif opcode == DECORATOR:
+            if behaviour.status != RUNNING:
+                behaviour.initialise()
+            self._run(self.children[index][0])
+            new_status = behaviour.update()
+            if new_status not in _VALID:
+                behaviour.logger.error(
+                    "A behaviour returned an invalid status, setting to INVALID [%s][%s]"
+                    % (new_status, behaviour.name)
+                )
+                new_status = INVALID
+            if new_status != RUNNING:
+                behaviour.stop(new_status)
+            behaviour.status = new_status
+        else:
+            visit = self.visit
+            for node in behaviour.tick():
+                if visit is not None:
+                    visit(node)
+            return
+        if self.visit is not None:
+            self.visit(behaviour)
+
+    def _position(self, index: int, behaviour: typing.Any) -> int:
+        # the cursor is only trusted while it agrees with current_child, which
+        # may have been changed by someone ticking the tree the normal way
+        position = self.resume[index]
+        children = behaviour.children
+        if position >= len(children) or children[position] is not behaviour.current_child:
+            position = children.index(behaviour.current_child)
+        return position
+
+    def _sequence(self, index: int, behaviour: typing.Any) -> None:
+        children = behaviour.children
+        nodes = self.children[index]
+        position = 0
+        if behaviour.status != RUNNING:
+            behaviour.current_child = children[0] if children else None
+            for child in children:
+                if child.status != INVALID:
+                    child.stop(INVALID)
+            behaviour.initialise()
+        elif behaviour.memory:
+            position = self._position(index, behaviour)
+        else:
+            behaviour.current_child = children[0] if children else None
+        if not children:
+            behaviour.current_child = None
+            behaviour.stop(SUCCESS)
+            return
+        last = len(children) - 1
+        run = self._run
+        while position <= last:
+            run(nodes[position])
+            status = children[position].status
+            if status != SUCCESS:
+                behaviour.status = status
+                self.resume[index] = position
+                if not behaviour.memory:
+                    for child in children[position + 1:]:
+                        if child.status != INVALID:
+                            child.stop(INVALID)
+                return
+            if position < last:
+                behaviour.current_child = children[position + 1]
+            position += 1
+        self.resume[index] = last
+        behaviour.stop(SUCCESS)
+
+    def _selector(self, index: int, behaviour: typing.Any) -> None:
+        children = behaviour.children
+        nodes = self.children[index]
+        if behaviour.status != RUNNING:
+            behaviour.current_child = children[0] if children else None
+            self.resume[index] = 0
+            behaviour.initialise()
+        if not children:
+            behaviour.current_child = None
+            behaviour.stop(FAILURE)
+            return
+        if behaviour.memory:
+            position = self._position(index, behaviour)
+            for child in children[:position]:
+                child.stop(INVALID)
+        else:
+            position = 0
+        previous = behaviour.current_child
+        run = self._run
+        for position in range(position, len(children)):
+            run(nodes[position])
+            child = children[position]
+            status = child.status
+            if status == RUNNING or status == SUCCESS:
+                behaviour.current_child = child
+                behaviour.status = status
+                self.resume[index] = position
+                if previous is None or previous != child:
+                    for later in children[position + 1:]:
+                        if later.status != INVALID:
+                            later.stop(INVALID)
+                return
+        behaviour.status = FAILURE
+        behaviour.current_child = children[-1]
+        self.resume[index] = len(children) - 1
+
+    def _parallel(self, index: int, behaviour: typing.Any) -> None:
+        children = behaviour.children
+        nodes = self.children[index]
+        if behaviour.status != RUNNING:
+            for child in children:
+                if child.status != INVALID:
+                    child.stop(INVALID)
+            behaviour.current_child = None
+            behaviour.initialise()
+        if not children:
+            behaviour.current_child = None
+            behaviour.stop(SUCCESS)
+            return
+        synchronise = behaviour.policy.synchronise
+        run = self._run
+        for position, child in enumerate(children):
+            if synchronise and child.status == SUCCESS:
+                continue
+            run(nodes[position])
+        new_status = RUNNING
+        behaviour.current_child = children[-1]
+        for child in children:
+            if child.status == FAILURE:
+                behaviour.current_child = child
+                new_status = FAILURE
+                break
+        else:
+            if type(behaviour.policy) is py_trees.common.ParallelPolicy.SuccessOnAll:
+                if all(child.status == SUCCESS for child in children):
+                    new_status = SUCCESS
+            else:
+                for child in reversed(children):
+                    if child.status == SUCCESS:
+                        new_status = SUCCESS
+                        behaviour.current_child = child
+                        break
+        if new_status != RUNNING:
+            behaviour.stop(new_status)
+        behaviour.status = new_status
+
+
+def compile(root: py_trees.behaviour.Behaviour) -> Program:
+    """Compile the tree under ``root``, see :class:`Program`."""
+    return Program(root)
+
+
+class CompiledTree:
+    """
+    A drop-in stand-in for :class:`~py_trees.trees.BehaviourTree` that ticks a compiled program.
+
+    Tick handlers and visitors registered on the wrapped tree are honoured,
+    and handlers still receive the wrapped tree. Recompile (create a new
+    instance) after changing the structure of the tree.
+
+    Args:
+        tree: the tree to compile
+    """
+
+    def __init__(self, tree: py_trees.trees.BehaviourTree) -> None:
+        self.tree = tree
+        self.program = compile(tree.root)
+
+    @property
+    def root(self) -> py_trees.behaviour.Behaviour:
+        return self.tree.root
+
+    @property
+    def count(self) -> int:
+        return self.tree.count
+
+    def tick(
+        self,
+        pre_tick_handler: typing.Optional[
+            typing.Callable[[py_trees.trees.BehaviourTree], None]
+        ] = None,
+        post_tick_handler: typing.Optional[
+            typing.Callable[[py_trees.trees.BehaviourTree], None]
+        ] = None,
+    ) -> None:
+        """Tick once, with the same handler and visitor protocol as the tree."""
+        tree = self.tree
+        if pre_tick_handler is not None:
+            pre_tick_handler(tree)
+        for handler in tree.pre_tick_handlers:
+            handler(tree)
+        visitors = tree.visitors
+        for visitor in visitors:
+            visitor.initialise()
+
+        partial = [visitor for visitor in visitors if not visitor.full]
+        if partial:
+
+            def visit(node: py_trees.behaviour.Behaviour) -> None:
+                for visitor in partial:
+                    node.visit(visitor)
+
+            self.program.visit = visit
+        try:
+            self.program.tick()
+        finally:
+            self.program.visit = None
+        full = [visitor for visitor in visitors if visitor.full]
+        if full:
+            for node in tree.root.iterate():
+                for visitor in full:
+                    node.visit(visitor)
+
+        for visitor in visitors:
+            visitor.finalise()
+        for handler in tree.post_tick_handlers:
+            handler(tree)
+        if post_tick_handler is not None:
+            post_tick_handler(tree)
+        tree.count += 1
+
+
+def compare_with_objects(
+    factory: typing.Callable[[], py_trees.behaviour.Behaviour], ticks: int = 200
+) -> int:
+    """
+    Tick a compiled and a regular copy of a tree and count status differences.
+
+    Both copies start from the same :mod:`random` seed, so trees with random
+    leaves (e.g. ``Behaviour_Foo``) are comparable too.
+
+    Args:
+        factory: builds the tree, e.g. a demo's ``build_tree``
+        ticks: number of ticks
+
+    Returns:
+        the number of (tick, node) statuses that differ
+    """
+    import random
+
+    def history(tick: typing.Callable[[], None], root: py_trees.behaviour.Behaviour) -> typing.List[typing.List[Status]]:
+        random.seed(0)
+        statuses = []
+        for _ in range(ticks):
+            tick()
+            statuses.append([node.status for node in root.iterate()])
+        return statuses
+
+    regular = py_trees.trees.BehaviourTree(root=factory())
+    compiled = CompiledTree(py_trees.trees.BehaviourTree(root=factory()))
+    expected = history(regular.tick, regular.root)
+    actual = history(compiled.tick, compiled.root)
+    return sum(
+        1
+        for want, got in zip(expected, actual)
+        for a, b in zip(want, got)
+        if a != b
+    )
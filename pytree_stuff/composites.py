@@ -0,0 +1,436 @@
+"""
+Composite variants of the py_trees Sequence, Selector and Parallel.
+
+:class:`ConcurrentParallel` ticks its children at the same time on a thread
+pool, so a parallel of children doing blocking work (sensor reads, I/O)
+takes as long as its slowest child per tick rather than the sum of them all.
+
+:class:`ShortCircuitParallel` only ticks the children still RUNNING - its
+active set - and stops as soon as the outcome is decided, so a wide parallel
+pays per tick for its running children rather than for all of them.
+
+:class:`PreemptiveSelector` is a selector without memory that, while a child
+is running, only re-ticks the higher priority children that could have
+changed their mind - because a blackboard key they declared changed, or a
+re-check interval elapsed - rather than all of them.
+
+.. code-block:: python
+
+   root = composites.ConcurrentParallel(
+       name="Sensors",
+       policy=py_trees.common.ParallelPolicy.SuccessOnAll(),
+       children=[ReadLidar(), ReadCamera(), ReadImu()],
+       timeout=0.05,
+   )
+"""
+
+import concurrent.futures
+import typing
+
+import py_trees
+
+from . import blackboard
+from . import clock as clock_module
+from . import events
+
+Status = py_trees.common.Status
+
+
+def _exhaust(child: py_trees.behaviour.Behaviour) -> typing.List[py_trees.behaviour.Behaviour]:
+    return list(child.tick())
+
+
+class ConcurrentParallel(py_trees.composites.Parallel):
+    """
+    A :class:`~py_trees.composites.Parallel` that ticks its children on worker threads.
+
+    Every child is ticked on the pool and the parallel waits for all of them
+    (a per-tick barrier) before applying the policy, with the same semantics
+    as :class:`~py_trees.composites.Parallel`. Nodes are yielded to the tree
+    (and its visitors) afterwards, in child order.
+
+    With a ``timeout``, a child still ticking when it expires counts as
+    RUNNING for this tick and isn't ticked again until its tick completes;
+    the policy picks up its status on the tick after that. Threads can't be
+    interrupted, so stopping the parallel waits for such ticks to finish.
+
+    Children tick concurrently: they mustn't share state without their own
+    locking. Call :meth:`shutdown` (``tree.shutdown()`` does) to release the
+    threads.
+
+    Args:
+        name: the composite behaviour name
+        policy: parallel policy (see :py:class:`~py_trees.common.ParallelPolicy`)
+        children: list of children to add
+        max_workers: pool size, by default one thread per child
+        timeout: seconds to wait for the children each tick, None for as long as it takes
+    """
+
+    def __init__(
+        self,
+        name: str,
+        policy: py_trees.common.ParallelPolicy.Base,
+        children: typing.Optional[typing.Sequence[py_trees.behaviour.Behaviour]] = None,
+        max_workers: typing.Optional[int] = None,
+        timeout: typing.Optional[float] = None,
+    ) -> None:
+        super().__init__(name=name, policy=policy, children=children)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.executor: typing.Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self.pending: typing.Dict[
+            py_trees.behaviour.Behaviour, "concurrent.futures.Future[typing.List[py_trees.behaviour.Behaviour]]"
+        ] = {}
+
+    def tick(self) -> typing.Iterator[py_trees.behaviour.Behaviour]:
+        """
+        Tick the children concurrently, then apply the policy.
+
+        Yields:
+            :class:`~py_trees.behaviour.Behaviour`: a reference to itself or one of its children
+
+        Raises:
+            RuntimeError: if the policy configuration was invalid
+        """
+        self.logger.debug("%s.tick()" % self.__class__.__name__)
+        self.validate_policy_configuration()
+
+        if self.status != Status.RUNNING:
+            self._join()
+            for child in self.children:
+                if child.status != Status.INVALID:
+                    child.stop(Status.INVALID)
+            self.current_child = None
+            self.initialise()
+
+        if not self.children:
+            self.current_child = None
+            self.stop(Status.SUCCESS)
+            yield self
+            return
+
+        if self.executor is None:
+            self.executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers or len(self.children),
+                thread_name_prefix=self.name,
+            )
+        for child in self.children:
+            if child in self.pending or (self.policy.synchronise and child.status == Status.SUCCESS):
+                continue
+            self.pending[child] = self.executor.submit(_exhaust, child)
+        concurrent.futures.wait(list(self.pending.values()), timeout=self.timeout)
+
+        self.feedback_message = ""
+        statuses = []
+        for child in self.children:
+            future = self.pending.get(child)
+            if future is None:
+                statuses.append(child.status)
+            elif future.done():
+                del self.pending[child]
+                # re-raises anything the child raised, as ticking it here would
+                yield from future.result()
+                statuses.append(child.status)
+            else:
+                self.feedback_message = f"still ticking '{child.name}'"
+                statuses.append(Status.RUNNING)
+
+        new_status = self._decide(statuses)
+        if new_status != Status.RUNNING:
+            self.stop(new_status)
+        self.status = new_status
+        yield self
+
+    def _decide(self, statuses: typing.List[Status]) -> Status:
+        """The policy applied to the children's statuses, as Parallel.tick does."""
+        self.current_child = self.children[-1]
+        for child, status in zip(self.children, statuses):
+            if status == Status.FAILURE:
+                self.current_child = child
+                return Status.FAILURE
+        if type(self.policy) is py_trees.common.ParallelPolicy.SuccessOnAll:
+            if all(status == Status.SUCCESS for status in statuses):
+                return Status.SUCCESS
+        elif type(self.policy) is py_trees.common.ParallelPolicy.SuccessOnOne:
+            for child, status in reversed(list(zip(self.children, statuses))):
+                if status == Status.SUCCESS:
+                    self.current_child = child
+                    return Status.SUCCESS
+        elif type(self.policy) is py_trees.common.ParallelPolicy.SuccessOnSelected:
+            selected = dict(zip(self.children, statuses))
+            if all(selected[child] == Status.SUCCESS for child in self.policy.children):
+                self.current_child = self.policy.children[-1]
+                return Status.SUCCESS
+        else:
+            raise RuntimeError(
+                "this parallel has been configured with an unrecognised policy [{}]".format(
+                    type(self.policy)
+                )
+            )
+        return Status.RUNNING
+
+    def _join(self) -> None:
+        """Wait for ticks still in flight, children can't be stopped mid-tick."""
+        for future in self.pending.values():
+            concurrent.futures.wait([future])
+        self.pending.clear()
+
+    def stop(self, new_status: Status = Status.INVALID) -> None:
+        """
+        Wait for ticks in flight, then stop any running children.
+
+        Args:
+            new_status : the composite is transitioning to this new status
+        """
+        self._join()
+        super().stop(new_status)
+
+    def shutdown(self) -> None:
+        """Release the worker threads."""
+        self._join()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+class ShortCircuitParallel(py_trees.composites.Parallel):
+    """
+    A :class:`~py_trees.composites.Parallel` that only ticks undecided children.
+
+    Children leave the :attr:`active` set as soon as they finish: a SUCCESS
+    is final (as with a synchronised policy) and isn't ticked again until the
+    parallel restarts. The tick stops at the first child that decides the
+    outcome - a FAILURE, the first SUCCESS for
+    :class:`~py_trees.common.ParallelPolicy.SuccessOnOne`, the last selected
+    child for :class:`~py_trees.common.ParallelPolicy.SuccessOnSelected` -
+    without ticking the children after it, which are then stopped as usual.
+
+    Unlike :class:`~py_trees.composites.Parallel`, where any FAILURE takes
+    precedence, the first child in order to decide the outcome wins when
+    several finish on the same tick.
+
+    Args:
+        name: the composite behaviour name
+        policy: parallel policy (see :py:class:`~py_trees.common.ParallelPolicy`)
+        children: list of children to add
+    """
+
+    def __init__(
+        self,
+        name: str,
+        policy: py_trees.common.ParallelPolicy.Base,
+        children: typing.Optional[typing.Sequence[py_trees.behaviour.Behaviour]] = None,
+    ) -> None:
+        super().__init__(name=name, policy=policy, children=children)
+        self.active: typing.List[py_trees.behaviour.Behaviour] = []
+        self.selected: typing.Set[py_trees.behaviour.Behaviour] = set()
+
+    def tick(self) -> typing.Iterator[py_trees.behaviour.Behaviour]:
+        """
+        Tick the active children until the outcome is decided.
+
+        Yields:
+            :class:`~py_trees.behaviour.Behaviour`: a reference to itself or one of its children
+
+        Raises:
+            RuntimeError: if the policy configuration was invalid
+        """
+        self.logger.debug("%s.tick()" % self.__class__.__name__)
+        if self.status != Status.RUNNING:
+            self.validate_policy_configuration()
+            for child in self.children:
+                if child.status != Status.INVALID:
+                    child.stop(Status.INVALID)
+            self.current_child = None
+            self.active = list(self.children)
+            if type(self.policy) is py_trees.common.ParallelPolicy.SuccessOnSelected:
+                self.selected = set(self.policy.children)
+            self.initialise()
+
+        if not self.children:
+            self.current_child = None
+            self.stop(Status.SUCCESS)
+            yield self
+            return
+
+        policy = type(self.policy)
+        new_status = Status.RUNNING
+        decided: typing.Optional[py_trees.behaviour.Behaviour] = None
+        running = []
+        for child in self.active:
+            if decided is not None:
+                running.append(child)
+                continue
+            for node in child.tick():
+                yield node
+            status = child.status
+            if status == Status.RUNNING:
+                running.append(child)
+            elif status == Status.FAILURE:
+                new_status, decided = Status.FAILURE, child
+            elif policy is py_trees.common.ParallelPolicy.SuccessOnOne:
+                new_status, decided = Status.SUCCESS, child
+            elif policy is py_trees.common.ParallelPolicy.SuccessOnSelected:
+                self.selected.discard(child)
+                if not self.selected:
+                    new_status, decided = Status.SUCCESS, self.policy.children[-1]
+            elif policy is not py_trees.common.ParallelPolicy.SuccessOnAll:
+                raise RuntimeError(
+                    "this parallel has been configured with an unrecognised policy [{}]".format(
+                        type(self.policy)
+                    )
+                )
+        self.active = running
+        if new_status == Status.RUNNING and not running:
+            # every child succeeded, only SuccessOnAll gets here undecided
+            new_status = Status.SUCCESS
+        self.current_child = decided if decided is not None else self.children[-1]
+        if new_status != Status.RUNNING:
+            self.stop(new_status)
+        self.status = new_status
+        yield self
+
+    def stop(self, new_status: Status = Status.INVALID) -> None:
+        """
+        Stop the running children, only the active ones can be.
+
+        Args:
+            new_status : the composite is transitioning to this new status
+        """
+        self.logger.debug(f"{self.__class__.__name__}.stop()[{self.status}->{new_status}]")
+        for child in self.active:
+            if child.status == Status.RUNNING:
+                child.stop(Status.INVALID)
+        self.active = []
+        py_trees.composites.Composite.stop(self, new_status)
+
+
+class PreemptiveSelector(py_trees.composites.Selector):
+    """
+    A :class:`~py_trees.composites.Selector` without memory that skips unchanged priorities.
+
+    While a child is RUNNING, the higher priority children before it all
+    failed when last ticked. Each tick, one of them is only ticked again if
+
+    * its subtree declares dependencies (see :func:`pytree_stuff.events.dependencies`)
+      and one of the keys changed, or its declared period elapsed, or
+    * it has a re-check interval and that elapsed, or
+    * it has neither, in which case it is always re-checked, as without memory
+
+    and preempts the running child exactly as with a regular selector if it
+    no longer fails. Skipped children keep their FAILURE status.
+
+    Args:
+        name: the composite behaviour name
+        children: list of children to add
+        recheck: re-check interval in seconds, for every child that doesn't
+            declare dependencies or for the children in a mapping
+        store: the store declared keys refer to
+        clock: a :class:`~pytree_stuff.clock.Clock` or time source for the
+            intervals, defaults to following :func:`~pytree_stuff.clock.default_clock`
+    """
+
+    def __init__(
+        self,
+        name: str,
+        children: typing.Optional[typing.Sequence[py_trees.behaviour.Behaviour]] = None,
+        recheck: typing.Union[None, float, typing.Mapping[py_trees.behaviour.Behaviour, float]] = None,
+        store: typing.Optional[blackboard.Store] = None,
+        clock: typing.Union[clock_module.Clock, typing.Callable[[], float], None] = None,
+    ) -> None:
+        super().__init__(name=name, memory=False, children=children)
+        self.recheck = recheck
+        self.store = store if store is not None else blackboard.default_store()
+        self.clock = clock_module.resolve(clock)
+        self.rechecked = 0
+        self.skipped = 0
+        # child -> (slots or None, interval or None), planned when the children change
+        self._plans: typing.Dict[
+            py_trees.behaviour.Behaviour, typing.Tuple[typing.Optional[typing.Tuple[int, ...]], typing.Optional[float]]
+        ] = {}
+        # child -> (versions, time) when it was last ticked
+        self._checked: typing.Dict[py_trees.behaviour.Behaviour, typing.Tuple[typing.Tuple[int, ...], float]] = {}
+        self._planned: typing.List[py_trees.behaviour.Behaviour] = []
+
+    def _plan(self) -> None:
+        self._plans.clear()
+        self._checked.clear()
+        self._planned = list(self.children)
+        for child in self.children:
+            dependencies = events.dependencies(child)
+            if isinstance(self.recheck, typing.Mapping):
+                interval = self.recheck.get(child)
+            else:
+                interval = self.recheck if dependencies is None else None
+            if dependencies is None:
+                self._plans[child] = (None, interval)
+            else:
+                slots = tuple(sorted({self.store.intern(key) for key in dependencies.keys}))
+                periods = [period for period in (interval, dependencies.every) if period is not None]
+                self._plans[child] = (slots, min(periods) if periods else None)
+
+    def _due(self, child: py_trees.behaviour.Behaviour, now: float) -> bool:
+        """Whether a failed higher priority child may have changed."""
+        slots, interval = self._plans.get(child, (None, None))
+        checked = self._checked.get(child)
+        if checked is None or (slots is None and interval is None):
+            return True
+        if interval is not None and now - checked[1] >= interval:
+            return True
+        if slots is not None:
+            versions = self.store.versions
+            return any(versions[slot] != seen for slot, seen in zip(slots, checked[0]))
+        return False
+
+    def tick(self) -> typing.Iterator[py_trees.behaviour.Behaviour]:
+        """
+        Tick the children in priority order, skipping those that can't have changed.
+
+        Yields:
+            :class:`~py_trees.behaviour.Behaviour`: a reference to itself or one of its children
+        """
+        self.logger.debug("%s.tick()" % self.__class__.__name__)
+        if self.status != Status.RUNNING:
+            self.current_child = self.children[0] if self.children else None
+            if self._planned != self.children:
+                self._plan()
+            self.initialise()
+
+        if not self.children:
+            self.current_child = None
+            self.stop(Status.FAILURE)
+            yield self
+            return
+
+        previous = self.current_child
+        running = previous if self.status == Status.RUNNING else None
+        now = self.clock()
+        versions = self.store.versions
+        for child in self.children:
+            if running is not None:
+                if child is running:
+                    running = None
+                elif not self._due(child, now):
+                    self.skipped += 1
+                    continue
+                else:
+                    self.rechecked += 1
+            slots = self._plans.get(child, (None, None))[0]
+            self._checked[child] = (tuple(versions[slot] for slot in slots) if slots else (), now)
+            for node in child.tick():
+                yield node
+                if node is child and (node.status == Status.RUNNING or node.status == Status.SUCCESS):
+                    self.current_child = child
+                    self.status = node.status
+                    if previous is None or previous != self.current_child:
+                        # we interrupted, invalidate everything at a lower priority
+                        passed = False
+                        for lower in self.children:
+                            if passed and lower.status != Status.INVALID:
+                                lower.stop(Status.INVALID)
+                            passed = passed or lower is child
+                    yield self
+                    return
+        self.status = Status.FAILURE
+        self.current_child = self.children[-1]
+        yield self
@@ -0,0 +1,164 @@
+"""
+Incremental, throttled console status display for ticking trees.
+
+Formatting the whole tree with :func:`py_trees.display.ascii_tree` every tick
+can cost more than the tick itself on large trees. :class:`StatusRenderer`
+instead remembers the last status shown for every node and either prints
+only the nodes whose status changed, or redraws the full tree no more often
+than a capped frame rate. Output is handed to a background writer thread
+through a bounded queue, so a slow terminal never blocks the tick loop;
+when the queue is full, frames are dropped and counted.
+"""
+
+import enum
+import queue
+import sys
+import threading
+import time
+import typing
+
+import py_trees
+
+
+class DisplayMode(enum.Enum):
+    """How a :class:`StatusRenderer` shows the tree."""
+
+    FULL = "full"
+    """Redraw the whole tree, at most ``max_fps`` times a second."""
+    CHANGES = "changes"
+    """Print one line for every node whose status changed since the last frame."""
+    OFF = "off"
+    """Print nothing at all."""
+
+
+class StatusRenderer:
+    """
+    Render tree status to a stream without blocking the caller.
+
+    Instances are callables suitable for use as a post tick handler:
+
+    .. code-block:: python
+
+       renderer = StatusRenderer(tree.root, mode=DisplayMode.CHANGES)
+       tree.add_post_tick_handler(renderer)
+       ...
+       renderer.close()
+
+    Args:
+        root: root of the tree to display
+        mode: what to print each tick
+        max_fps: cap on full redraws per second, None redraws every tick
+            (the tick on which the root finishes is always drawn)
+        stream: where to write, defaults to stdout
+        queue_size: frames buffered before new frames are dropped
+    """
+
+    def __init__(
+        self,
+        root: py_trees.behaviour.Behaviour,
+        mode: DisplayMode = DisplayMode.FULL,
+        max_fps: typing.Optional[float] = None,
+        stream: typing.Optional[typing.TextIO] = None,
+        queue_size: int = 256,
+    ) -> None:
+        self.root = root
+        self.mode = mode
+        self.min_interval = 0.0 if not max_fps else 1.0 / max_fps
+        self.stream = stream if stream is not None else sys.stdout
+        self.dropped_frames = 0
+        self._last_redraw = -float("inf")
+        self._queue: "queue.Queue[typing.Optional[str]]" = queue.Queue(maxsize=queue_size)
+        self._writer: typing.Optional[threading.Thread] = None
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Re-read the tree structure, call after adding or removing behaviours."""
+        self._nodes: typing.List[py_trees.behaviour.Behaviour] = []
+        self._prefixes: typing.List[str] = []
+        self._last: typing.List[py_trees.common.Status] = []
+        self._collect(self.root, 0)
+
+    def _collect(self, node: py_trees.behaviour.Behaviour, depth: int) -> None:
+        self._nodes.append(node)
+        self._prefixes.append(
+            "    " * depth + node.name.replace("\n", " ") + " ["
+        )
+        self._last.append(py_trees.common.Status.INVALID)
+        for child in node.children:
+            self._collect(child, depth + 1)
+
+    def __call__(self, tree: py_trees.trees.BehaviourTree) -> None:
+        """Queue whatever the display mode asks for after a tick."""
+        if self.mode is DisplayMode.OFF:
+            return
+        if self.mode is DisplayMode.CHANGES:
+            frame = self.changes(tree.count + 1)
+            if frame:
+                self._emit(frame)
+            return
+        now = time.monotonic()
+        finished = self.root.status != py_trees.common.Status.RUNNING
+        if now - self._last_redraw < self.min_interval and not finished:
+            return
+        self._last_redraw = now
+        self._snapshot()
+        self._emit(
+            f"--- Tick {tree.count + 1} ---\n"
+            + py_trees.display.ascii_tree(self.root, show_status=True)
+            + "\n\n"
+        )
+
+    def changes(self, tick: int) -> str:
+        """
+        Lines for the nodes whose status changed since the previous call.
+
+        Args:
+            tick: tick number used to label the lines
+
+        Returns:
+            the newline terminated lines, empty if nothing changed
+        """
+        symbols = py_trees.display.ascii_symbols
+        lines = []
+        last = self._last
+        for index, node in enumerate(self._nodes):
+            status = node.status
+            if status is not last[index]:
+                last[index] = status
+                message = " -- " + node.feedback_message if node.feedback_message else ""
+                lines.append(
+                    f"[{tick}] {self._prefixes[index]}{symbols[status]}]{message}\n"
+                )
+        return "".join(lines)
+
+    def _snapshot(self) -> None:
+        last = self._last
+        for index, node in enumerate(self._nodes):
+            last[index] = node.status
+
+    def _emit(self, frame: str) -> None:
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._write, name="StatusRenderer", daemon=True
+            )
+            self._writer.start()
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            self.dropped_frames += 1
+
+    def _write(self) -> None:
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
+            self.stream.write(frame)
+            self.stream.flush()
+
+    def close(self, timeout: typing.Optional[float] = 1.0) -> None:
+        """Flush queued frames and stop the writer thread."""
+        if self._writer is None:
+            return
+        self._queue.put(None)
+        self._writer.join(timeout)
+        self._writer = None
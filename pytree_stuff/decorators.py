@@ -0,0 +1,457 @@
+"""
+Decorator variants of the py_trees Retry, Repeat and OneShot.
+
+:class:`py_trees.decorators.Retry` and :class:`~py_trees.decorators.Repeat`
+restart their child on the very next tick, so a flaky resource is hit at
+the tick rate. :class:`BackoffRetry` and :class:`BackoffRepeat` wait between
+attempts instead - RUNNING without ticking the child - for a delay given by
+a :class:`Backoff` and measured on the tree's clock
+(:mod:`pytree_stuff.clock`), and record every attempt for metrics.
+
+.. code-block:: python
+
+   retry = decorators.BackoffRetry(
+       name="Retry 3 Times",
+       child=connect,
+       num_failures=3,
+       backoff=decorators.Backoff(initial=0.5, factor=2.0, maximum=10.0, jitter=0.2),
+   )
+   ...
+   print(retry.statistics())
+
+:class:`~py_trees.decorators.OneShot` only remembers for the life of the
+process. :class:`PersistentOneShot` saves the final status (and chosen
+blackboard outputs) to a :class:`ResultStore` on disk, so an expensive
+calibration subtree is skipped entirely after a restart:
+
+.. code-block:: python
+
+   calibrate = decorators.PersistentOneShot(
+       name="Calibrate Once",
+       child=calibration,
+       key="camera/calibration",
+       version=config_digest,
+       results=decorators.ResultStore("calibration.json"),
+       outputs=["camera_offset"],
+   )
+"""
+
+import collections
+import json
+import os
+import random
+import time
+import typing
+from pathlib import Path
+
+import py_trees
+
+from . import blackboard
+from . import clock as clock_module
+from . import rendering, ticking
+
+Status = py_trees.common.Status
+
+
+class Backoff:
+    """
+    Exponential backoff with optional jitter.
+
+    The delay after the n'th attempt is ``initial * factor ** (n - 1)``,
+    capped at ``maximum``, then reduced by up to ``jitter`` of itself at
+    random so that many clients don't retry in lockstep. ``factor=1.0``
+    gives a fixed period.
+
+    Args:
+        initial: delay after the first attempt, in seconds
+        factor: growth per attempt
+        maximum: upper bound on the delay, in seconds
+        jitter: fraction of the delay to randomise, between 0 and 1
+        seed: seed for the jitter, for reproducible runs
+    """
+
+    def __init__(
+        self,
+        initial: float = 1.0,
+        factor: float = 2.0,
+        maximum: float = 60.0,
+        jitter: float = 0.0,
+        seed: typing.Optional[int] = None,
+    ) -> None:
+        if initial < 0 or factor < 1.0 or maximum < 0:
+            raise ValueError("backoff needs initial >= 0, factor >= 1 and maximum >= 0")
+        if not 0.0 <= jitter <= 1.0:
+            raise ValueError(f"jitter must be between 0 and 1 [{jitter}]")
+        self.initial = initial
+        self.factor = factor
+        self.maximum = maximum
+        self.jitter = jitter
+        self.random = random.Random(seed)
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after the ``attempt``'th attempt (counting from 1)."""
+        delay = min(self.maximum, self.initial * self.factor ** max(0, attempt - 1))
+        if self.jitter:
+            delay *= 1.0 - self.jitter * self.random.random()
+        return delay
+
+
+class _BackoffDecorator(py_trees.decorators.Decorator):
+    """Waits out :attr:`deadline` before ticking the child and times attempts."""
+
+    def __init__(
+        self,
+        name: str,
+        child: py_trees.behaviour.Behaviour,
+        backoff: typing.Optional[Backoff],
+        clock: typing.Union[clock_module.Clock, typing.Callable[[], float], None],
+        history: int,
+    ) -> None:
+        super().__init__(name=name, child=child)
+        self.backoff = backoff if backoff is not None else Backoff()
+        self.clock = clock_module.resolve(clock)
+        self.deadline: typing.Optional[float] = None
+        self.attempt_started = 0.0
+        # attempts of the current run, and across runs
+        self.attempts = 0
+        self.total_attempts = 0
+        self.outcomes = {Status.SUCCESS: 0, Status.FAILURE: 0}
+        self.latencies: typing.Deque[float] = collections.deque(maxlen=history)
+
+    def tick(self) -> typing.Iterator[py_trees.behaviour.Behaviour]:
+        """
+        Tick the child, unless waiting for the next attempt.
+
+        Yields:
+            a reference to itself or one of its children
+        """
+        if self.status == Status.RUNNING and self.deadline is not None:
+            remaining = self.deadline - self.clock()
+            if remaining > 0:
+                self.feedback_message = f"backing off [{remaining:.3f}s until attempt {self.attempts + 1}]"
+                yield self
+                return
+            self.deadline = None
+        if self.decorated.status != Status.RUNNING:
+            self.attempt_started = self.clock()
+        yield from super().tick()
+
+    def _finished(self, status: Status) -> None:
+        """Record an attempt that just finished."""
+        self.attempts += 1
+        self.total_attempts += 1
+        self.outcomes[status] += 1
+        self.latencies.append(self.clock() - self.attempt_started)
+
+    def _back_off(self) -> None:
+        self.deadline = self.clock() + self.backoff.delay(self.attempts)
+
+    def initialise(self) -> None:
+        self.attempts = 0
+        self.deadline = None
+
+    def terminate(self, new_status: Status) -> None:
+        self.deadline = None
+
+    def statistics(self) -> typing.Dict[str, float]:
+        """Attempt counts and latency percentiles (seconds), e.g. for logging."""
+        return {
+            "attempts": self.total_attempts,
+            "successes": self.outcomes[Status.SUCCESS],
+            "failures": self.outcomes[Status.FAILURE],
+            "latency_p50": ticking.TickStatistics.percentile(self.latencies, 50),
+            "latency_p99": ticking.TickStatistics.percentile(self.latencies, 99),
+        }
+
+
+class BackoffRetry(_BackoffDecorator):
+    """
+    :class:`~py_trees.decorators.Retry` that waits between attempts.
+
+    Up to ``num_failures`` attempts, each failure followed by the
+    :class:`Backoff` delay before the child is ticked again.
+
+    Args:
+        name: the decorator name
+        child: the child behaviour or subtree
+        num_failures: attempts before giving up
+        backoff: defaults to :class:`Backoff` ``()``
+        clock: a :class:`~pytree_stuff.clock.Clock` or time source, defaults
+            to following :func:`~pytree_stuff.clock.default_clock`
+        history: number of attempt latencies kept for :meth:`statistics`
+    """
+
+    def __init__(
+        self,
+        name: str,
+        child: py_trees.behaviour.Behaviour,
+        num_failures: int,
+        backoff: typing.Optional[Backoff] = None,
+        clock: typing.Union[clock_module.Clock, typing.Callable[[], float], None] = None,
+        history: int = 1024,
+    ) -> None:
+        super().__init__(name, child, backoff, clock, history)
+        self.num_failures = num_failures
+
+    def update(self) -> Status:
+        status = self.decorated.status
+        if status == Status.RUNNING:
+            self.feedback_message = f"running [attempt {self.attempts + 1} of {self.num_failures}]"
+            return Status.RUNNING
+        self._finished(status)
+        if status == Status.SUCCESS:
+            self.feedback_message = f"succeeded [attempt {self.attempts} of {self.num_failures}]"
+            return Status.SUCCESS
+        if self.attempts < self.num_failures:
+            self._back_off()
+            self.feedback_message = f"attempt failed [{self.attempts} of {self.num_failures}], backing off"
+            return Status.RUNNING
+        self.feedback_message = f"final failure [{self.attempts} of {self.num_failures}]"
+        return Status.FAILURE
+
+
+class BackoffRepeat(_BackoffDecorator):
+    """
+    :class:`~py_trees.decorators.Repeat` that waits between repetitions.
+
+    Runs the child until it has succeeded ``num_success`` times, waiting the
+    :class:`Backoff` delay after each success; fails as soon as it fails.
+    A negative ``num_success`` repeats until the child fails.
+
+    Args:
+        name: the decorator name
+        child: the child behaviour or subtree
+        num_success: successes needed, negative for no limit
+        backoff: defaults to :class:`Backoff` ``()``
+        clock: a :class:`~pytree_stuff.clock.Clock` or time source, defaults
+            to following :func:`~pytree_stuff.clock.default_clock`
+        history: number of attempt latencies kept for :meth:`statistics`
+    """
+
+    def __init__(
+        self,
+        name: str,
+        child: py_trees.behaviour.Behaviour,
+        num_success: int,
+        backoff: typing.Optional[Backoff] = None,
+        clock: typing.Union[clock_module.Clock, typing.Callable[[], float], None] = None,
+        history: int = 1024,
+    ) -> None:
+        super().__init__(name, child, backoff, clock, history)
+        self.num_success = num_success
+
+    def update(self) -> Status:
+        status = self.decorated.status
+        target = "forever" if self.num_success < 0 else f"from {self.num_success}"
+        if status == Status.RUNNING:
+            self.feedback_message = f"running [{self.attempts} success {target}]"
+            return Status.RUNNING
+        self._finished(status)
+        if status == Status.FAILURE:
+            self.feedback_message = f"failed, aborting [{self.attempts - 1} success {target}]"
+            return Status.FAILURE
+        if self.num_success < 0 or self.attempts < self.num_success:
+            self._back_off()
+            self.feedback_message = f"success [{self.attempts} success {target}], backing off"
+            return Status.RUNNING
+        self.feedback_message = f"success [{self.attempts} success {target}]"
+        return Status.SUCCESS
+
+
+class ResultStore:
+    """
+    Final statuses and outputs of :class:`PersistentOneShot` decorators, on disk.
+
+    A JSON file mapping each key to the version it was recorded under, the
+    status, the output values and when it was saved. Writes merge with what
+    other processes saved meanwhile and replace the file atomically; an
+    unreadable file counts as empty, it is only a cache.
+
+    Args:
+        path: the file, created (with its directory) on the first save;
+            None keeps the entries in memory only, e.g. for benchmarks
+    """
+
+    def __init__(self, path: typing.Union[str, Path, None] = None) -> None:
+        self.path = Path(path) if path is not None else None
+        self.entries: typing.Optional[typing.Dict[str, typing.Dict[str, typing.Any]]] = None
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def _read(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        if self.path is None:
+            return dict(self.entries or {})
+        try:
+            entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _write(self, entries: typing.Dict[str, typing.Dict[str, typing.Any]]) -> None:
+        self.entries = entries
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+        temporary.write_text(json.dumps(entries, indent=2, sort_keys=True) + "\n")
+        os.replace(temporary, self.path)
+
+    def __len__(self) -> int:
+        if self.entries is None:
+            self.entries = self._read()
+        return len(self.entries)
+
+    def get(
+        self, key: str, version: str, max_age: typing.Optional[float] = None
+    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """
+        The entry saved under ``key``, if it is current.
+
+        Args:
+            key: the entry's key
+            version: the entry must have been saved under this version
+            max_age: seconds since it was saved (wall clock, so valid across
+                restarts) after which it no longer counts, None for no limit
+
+        Returns:
+            the entry, with ``status`` and ``outputs``, or None
+        """
+        if self.entries is None:
+            self.entries = self._read()
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.get("version") != version or (
+            max_age is not None and time.time() - entry.get("saved", 0.0) > max_age
+        ):
+            self.stale += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, version: str, status: Status, outputs: typing.Mapping[str, typing.Any]) -> None:
+        """
+        Save an entry, replacing any under the same key.
+
+        Raises:
+            TypeError: if an output value can't be stored as JSON
+        """
+        entries = self._read()
+        entries[key] = {
+            "version": version,
+            "status": status.name,
+            "outputs": dict(outputs),
+            "saved": time.time(),
+        }
+        self._write(entries)
+
+    def invalidate(self, key: typing.Optional[str] = None) -> None:
+        """Forget the entry under ``key``, or every entry if None."""
+        entries = self._read()
+        if key is None:
+            entries.clear()
+        elif entries.pop(key, None) is None:
+            self.entries = entries
+            return
+        self._write(entries)
+
+
+class PersistentOneShot(py_trees.decorators.OneShot):
+    """
+    :class:`~py_trees.decorators.OneShot` that remembers across restarts.
+
+    Once the child completes (as decided by ``policy``), the final status and
+    the values of the ``outputs`` keys are saved in a :class:`ResultStore`.
+    A later process finding a current entry writes the outputs back to the
+    store and bounces with the saved status without ticking the child at all.
+
+    An entry is current if it was saved under the same ``version`` and the
+    same child subtree structure (see
+    :func:`~pytree_stuff.rendering.structure_hash`) and, with ``max_age``,
+    recently enough. The structure hash only covers the shape of the subtree
+    and the class and name of each node, not their parameters or anything
+    else the child reads: ``version`` must change whenever those do, e.g. a
+    digest of the calibration config, or the stale result is restored.
+    :meth:`invalidate` drops an entry by hand.
+
+    Args:
+        name: the decorator name
+        child: the child behaviour or subtree
+        key: the entry's key in the store, unique among the trees sharing it
+        version: identifies everything the child's result depends on beyond
+            the tree shape, e.g. a config hash
+        results: where entries are saved, a :class:`ResultStore` on a path of
+            the application's choosing
+        policy: when the one shot completes
+        outputs: keys of a :class:`~pytree_stuff.blackboard.Store` the child
+            writes, saved and restored with the status; values must be JSON
+        store: defaults to :func:`~pytree_stuff.blackboard.default_store`
+        max_age: seconds an entry stays valid, None for no limit
+    """
+
+    def __init__(
+        self,
+        name: str,
+        child: py_trees.behaviour.Behaviour,
+        key: str,
+        version: str,
+        results: ResultStore,
+        policy: py_trees.common.OneShotPolicy = py_trees.common.OneShotPolicy.ON_SUCCESSFUL_COMPLETION,
+        outputs: typing.Iterable[str] = (),
+        store: typing.Optional[blackboard.Store] = None,
+        max_age: typing.Optional[float] = None,
+    ) -> None:
+        super().__init__(name=name, child=child, policy=policy)
+        self.key = key
+        self.version = version
+        self.results = results
+        self.max_age = max_age
+        self.client = blackboard.Client(name, store=store)
+        self.outputs = {output: self.client.register_key(output, py_trees.common.Access.WRITE) for output in outputs}
+        self.looked_up = False
+        self.restored = False
+
+    def _version(self) -> str:
+        return f"{self.version}:{rendering.structure_hash(self.decorated)}"
+
+    def _restore(self) -> None:
+        self.looked_up = True
+        entry = self.results.get(self.key, self._version(), self.max_age)
+        if entry is None:
+            return
+        values = entry.get("outputs", {})
+        if not set(self.outputs) <= set(values):
+            return  # saved before these outputs were declared
+        self.client.write_many(list(self.outputs.values()), [values[output] for output in self.outputs])
+        self.final_status = Status[entry["status"]]
+        self.restored = True
+        self.feedback_message = f"restored [{self.key}]"
+
+    def tick(self) -> typing.Iterator[py_trees.behaviour.Behaviour]:
+        """
+        Look up a saved result on the first tick, then behave as a one shot.
+
+        Yields:
+            a reference to itself or a behaviour in its child subtree
+        """
+        if not self.looked_up:
+            self._restore()
+        yield from super().tick()
+
+    def terminate(self, new_status: Status) -> None:
+        completed = self.final_status is None
+        super().terminate(new_status)
+        if completed and self.final_status is not None:
+            values = self.client.store.values
+            outputs = {
+                output: values[slot] for output, slot in self.outputs.items() if values[slot] is not blackboard.UNSET
+            }
+            self.results.put(self.key, self._version(), self.final_status, outputs)
+
+    def invalidate(self) -> None:
+        """Drop the saved result, the child runs again on the next tick."""
+        self.results.invalidate(self.key)
+        self.final_status = None
+        self.restored = False
@@ -0,0 +1,139 @@
+"""The console loop shared by the demo scripts."""
+
+import argparse
+import typing
+from pathlib import Path
+
+import py_trees
+
+from . import clock, compiler, console, profiling, rendering, ticking
+
+
+def parse_arguments(
+    argv: typing.Optional[typing.Sequence[str]] = None,
+) -> argparse.Namespace:
+    """
+    Command line options common to every demo.
+
+    Unknown options are ignored so that individual demos remain free to
+    add their own.
+
+    Args:
+        argv: arguments to parse, defaults to :data:`sys.argv`
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument(
+        "--display",
+        choices=[mode.value for mode in console.DisplayMode],
+        default=console.DisplayMode.FULL.value,
+        help="print the full tree, only status changes, or nothing",
+    )
+    parser.add_argument(
+        "--max-fps",
+        type=float,
+        default=None,
+        help="cap full tree redraws per second (default: every tick)",
+    )
+    parser.add_argument(
+        "--no-render",
+        action="store_true",
+        help="skip writing the dot/png/svg renderings of the tree",
+    )
+    parser.add_argument(
+        "--compiled",
+        action="store_true",
+        help="tick through pytree_stuff.compiler instead of the tree's generators",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FOLDED",
+        nargs="?",
+        const="",
+        default=None,
+        help="print a per-node profile, optionally writing collapsed stacks to FOLDED",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="record every tick to a binary trace, replay with python -m pytree_stuff.trace",
+    )
+    parser.add_argument(
+        "--virtual",
+        action="store_true",
+        help="run on a pytree_stuff.clock.VirtualClock, as fast as possible with the same timing",
+    )
+    arguments, _ = parser.parse_known_args(argv)
+    return arguments
+
+
+def render(
+    root: py_trees.behaviour.Behaviour,
+    name: str,
+    target_directory: typing.Union[str, Path],
+    argv: typing.Optional[typing.Sequence[str]] = None,
+) -> None:
+    """
+    Render a demo tree in the background, unless disabled or already up to date.
+
+    Args:
+        root: the root of the demo tree
+        name: file name stem for the created files
+        target_directory: where to write the files
+        argv: command line options, see :func:`parse_arguments`
+    """
+    if parse_arguments(argv).no_render:
+        return
+    rendering.render(root, name=name, target_directory=target_directory)
+
+
+def run(
+    tree: py_trees.trees.BehaviourTree,
+    rate_hz: float = 1.0,
+    argv: typing.Optional[typing.Sequence[str]] = None,
+) -> ticking.TickStatistics:
+    """
+    Tick a demo tree at a fixed rate, displaying it until it finishes.
+
+    Args:
+        tree: a tree that has already been set up
+        rate_hz: ticks per second
+        argv: command line options, see :func:`parse_arguments`
+
+    Returns:
+        the tick runner statistics, also printed once the tree finishes
+    """
+    arguments = parse_arguments(argv)
+    renderer = console.StatusRenderer(
+        tree.root,
+        mode=console.DisplayMode(arguments.display),
+        max_fps=arguments.max_fps,
+    )
+    if arguments.virtual:
+        clock.set_default_clock(clock.VirtualClock())
+    runner = ticking.TickRunner(
+        compiler.CompiledTree(tree) if arguments.compiled else tree, rate_hz=rate_hz
+    )
+    recorder = None
+    if arguments.trace:
+        # imported here so that `python -m pytree_stuff.trace` runs cleanly
+        from . import trace
+
+        recorder = trace.TraceRecorder(tree.root, arguments.trace)
+        tree.add_post_tick_handler(recorder)
+    profiler = profiling.Profiler(tree.root) if arguments.profile is not None else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        statistics = runner.run(post_tick_handler=renderer)
+    finally:
+        renderer.close()
+        if recorder is not None:
+            recorder.close()
+        if profiler is not None:
+            profiler.disable()
+    print(statistics.summary())
+    if profiler is not None:
+        print(profiler.report())
+        if arguments.profile:
+            profiler.write_collapsed(arguments.profile)
+    return statistics
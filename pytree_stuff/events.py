@@ -0,0 +1,324 @@
+"""
+Event-driven ticking: skip subtrees whose inputs didn't change.
+
+Most of a large tree is usually idle - conditions that keep returning the
+same answer because nothing they look at changed. Here behaviours declare
+what their result depends on (keys of a :class:`~pytree_stuff.blackboard.Store`
+and / or a re-evaluation period) with :func:`declare`, and
+:class:`EventDrivenTree` skips any *pure* subtree that finished (SUCCESS or
+FAILURE) last time it ran and whose dependencies are unchanged since: the
+subtree's root reports its previous status without running anything below
+it. A changed key, or an elapsed period, wakes the subtree up again.
+
+A subtree is pure when every node in it is either declared, a constant
+(``Success`` / ``Failure``), or one of the stateless composites and
+decorators (``Sequence``, ``Selector``, ``Parallel``, the status mapping
+decorators, ``Condition``) over pure children. Declaring a behaviour asserts
+that, given the same dependencies, ticking it from scratch gives the same
+result - true for checks and conditions, not for e.g. a ``DelayedSuccess``.
+
+.. code-block:: python
+
+   store = blackboard.Store()
+   battery_ok = events.CheckKey("Battery OK?", "battery", lambda level: level > 0.2, store=store)
+   ...
+   tree = events.EventDrivenTree(py_trees.trees.BehaviourTree(root), store=store)
+   tree.tick()
+"""
+
+import typing
+
+import py_trees
+
+from . import blackboard
+from . import clock as clock_module
+
+Status = py_trees.common.Status
+
+STATELESS = (
+    py_trees.composites.Sequence,
+    py_trees.composites.Selector,
+    py_trees.composites.Parallel,
+    py_trees.decorators.Inverter,
+    py_trees.decorators.PassThrough,
+    py_trees.decorators.SuccessIsFailure,
+    py_trees.decorators.FailureIsSuccess,
+    py_trees.decorators.SuccessIsRunning,
+    py_trees.decorators.FailureIsRunning,
+    py_trees.decorators.RunningIsSuccess,
+    py_trees.decorators.RunningIsFailure,
+    py_trees.decorators.Condition,
+    py_trees.behaviours.Success,
+    py_trees.behaviours.Failure,
+)
+"""Behaviour types whose result only depends on their children's."""
+
+
+class Dependencies:
+    """
+    What a behaviour's result depends on.
+
+    Args:
+        keys: keys of the store passed to :class:`EventDrivenTree`
+        every: re-evaluate at least this often, in seconds
+    """
+
+    __slots__ = ("keys", "every")
+
+    def __init__(self, keys: typing.Iterable[str] = (), every: typing.Optional[float] = None) -> None:
+        self.keys = tuple(keys)
+        self.every = every
+
+
+def declare(
+    behaviour: py_trees.behaviour.Behaviour,
+    keys: typing.Iterable[str] = (),
+    every: typing.Optional[float] = None,
+) -> py_trees.behaviour.Behaviour:
+    """
+    Declare what a behaviour's result depends on, see the module docs.
+
+    Args:
+        behaviour: the behaviour, usually a condition-like leaf
+        keys: blackboard keys it reads
+        every: re-evaluate at least this often, in seconds (time based checks)
+
+    Returns:
+        the behaviour, for use inline while building a tree
+    """
+    behaviour.dependencies = Dependencies(keys, every)  # type: ignore[attr-defined]
+    return behaviour
+
+
+def dependencies(node: py_trees.behaviour.Behaviour) -> typing.Optional[Dependencies]:
+    """
+    What a whole subtree's result depends on.
+
+    Returns:
+        the declared keys and shortest period below ``node``, or None if the
+        subtree isn't pure (see the module docs)
+    """
+    declared = getattr(node, "dependencies", None)
+    if declared is not None:
+        return declared
+    return _combine(node, [dependencies(child) for child in node.children])
+
+
+def _combine(
+    node: py_trees.behaviour.Behaviour, children: typing.List[typing.Optional[Dependencies]]
+) -> typing.Optional[Dependencies]:
+    """Dependencies of an undeclared node given its children's, None if it isn't pure."""
+    composite = isinstance(node, (py_trees.composites.Composite, py_trees.decorators.Decorator))
+    if type(node) not in STATELESS or bool(children) != composite or None in children:
+        return None
+    keys: typing.Dict[str, None] = {}
+    periods = []
+    for child in children:
+        assert child is not None
+        keys.update(dict.fromkeys(child.keys))
+        if child.every is not None:
+            periods.append(child.every)
+    return Dependencies(keys, min(periods) if periods else None)
+
+
+class CheckKey(py_trees.behaviour.Behaviour):
+    """
+    SUCCESS if ``predicate(value)`` holds for a store key, otherwise FAILURE.
+
+    FAILURE too if the key hasn't been set. Declares its key as a dependency.
+
+    Args:
+        name: the behaviour name
+        key: the key to check
+        predicate: called with the key's value
+        store: defaults to :func:`~pytree_stuff.blackboard.default_store`
+    """
+
+    def __init__(
+        self,
+        name: str,
+        key: str,
+        predicate: typing.Callable[[typing.Any], bool] = bool,
+        store: typing.Optional[blackboard.Store] = None,
+    ) -> None:
+        super().__init__(name)
+        self.client = blackboard.Client(name, store=store)
+        self.slot = self.client.register_key(key, py_trees.common.Access.READ)
+        self.predicate = predicate
+        declare(self, keys=[key])
+
+    def update(self) -> Status:
+        value = self.client.read_many([self.slot], default=blackboard.UNSET)[0]
+        if value is blackboard.UNSET:
+            self.feedback_message = "not set"
+            return Status.FAILURE
+        return Status.SUCCESS if self.predicate(value) else Status.FAILURE
+
+
+_ABSENT = object()
+
+
+class _Subtree:
+    """Cached result of a pure subtree."""
+
+    __slots__ = ("slots", "every", "status", "versions", "wake", "tick", "previous")
+
+    def __init__(self, slots: typing.Tuple[int, ...], every: typing.Optional[float]) -> None:
+        self.slots = slots
+        self.every = every
+        self.status: typing.Optional[Status] = None
+        self.versions: typing.Tuple[int, ...] = ()
+        self.wake = float("inf")
+        # the installed tick, and the instance attribute it replaced, if any
+        self.tick: typing.Any = None
+        self.previous: typing.Any = _ABSENT
+
+
+class EventDrivenTree:
+    """
+    Tick a tree, skipping pure subtrees whose dependencies didn't change.
+
+    Duck-types :class:`~py_trees.trees.BehaviourTree` (``root``, ``count``,
+    ``tick()``), so it can be driven by a :class:`~pytree_stuff.ticking.TickRunner`.
+    The skipping is installed on the tree's nodes, call :meth:`close` to
+    remove it. Rebuild after changing the structure of the tree.
+
+    A skipped subtree's root shows its previous status; nodes below it keep
+    whatever status they were last left with.
+
+    Args:
+        tree: the tree
+        store: the store declared keys refer to
+        clock: a :class:`~pytree_stuff.clock.Clock` or time source for
+            ``every``, defaults to following :func:`~pytree_stuff.clock.default_clock`
+    """
+
+    def __init__(
+        self,
+        tree: py_trees.trees.BehaviourTree,
+        store: typing.Optional[blackboard.Store] = None,
+        clock: typing.Union[clock_module.Clock, typing.Callable[[], float], None] = None,
+    ) -> None:
+        self.tree = tree
+        self.store = store if store is not None else blackboard.default_store()
+        self.clock = clock_module.resolve(clock)
+        self.evaluated = 0
+        self.skipped = 0
+        self.subtrees: typing.Dict[py_trees.behaviour.Behaviour, _Subtree] = {}
+        dependencies = self._analyse(tree.root)
+        if dependencies is not None:
+            self._install(tree.root, dependencies)
+
+    @property
+    def root(self) -> py_trees.behaviour.Behaviour:
+        return self.tree.root
+
+    @property
+    def count(self) -> int:
+        return self.tree.count
+
+    def tick(
+        self,
+        pre_tick_handler: typing.Optional[
+            typing.Callable[[py_trees.trees.BehaviourTree], None]
+        ] = None,
+        post_tick_handler: typing.Optional[
+            typing.Callable[[py_trees.trees.BehaviourTree], None]
+        ] = None,
+    ) -> None:
+        """Tick once, with the same handler and visitor protocol as the tree."""
+        tree = self.tree
+        if pre_tick_handler is not None:
+            pre_tick_handler(tree)
+        for handler in tree.pre_tick_handlers:
+            handler(tree)
+        visitors = tree.visitors
+        for visitor in visitors:
+            visitor.initialise()
+
+        partial = [visitor for visitor in visitors if not visitor.full]
+        if partial:
+            for node in tree.root.tick():
+                for visitor in partial:
+                    node.visit(visitor)
+        else:
+            for _ in tree.root.tick():
+                pass
+        # unlike BehaviourTree.tick, don't walk the whole tree unless a visitor wants it
+        full = [visitor for visitor in visitors if visitor.full]
+        if full:
+            for node in tree.root.iterate():
+                for visitor in full:
+                    node.visit(visitor)
+
+        for visitor in visitors:
+            visitor.finalise()
+        for handler in tree.post_tick_handlers:
+            handler(tree)
+        if post_tick_handler is not None:
+            post_tick_handler(tree)
+        tree.count += 1
+
+    def _analyse(self, node: py_trees.behaviour.Behaviour) -> typing.Optional[Dependencies]:
+        """The node's dependencies if it is pure, installing skipping on its maximal pure subtrees."""
+        declared = getattr(node, "dependencies", None)
+        if declared is not None:
+            return declared
+        children = [self._analyse(child) for child in node.children]
+        combined = _combine(node, children)
+        if combined is None:
+            for child, dependencies in zip(node.children, children):
+                if dependencies is not None:
+                    self._install(child, dependencies)
+        return combined
+
+    def _install(self, node: py_trees.behaviour.Behaviour, dependencies: Dependencies) -> None:
+        slots = {self.store.intern(key) for key in dependencies.keys}
+        subtree = _Subtree(tuple(sorted(slots)), dependencies.every)
+        self.subtrees[node] = subtree
+        original = node.tick
+        versions = self.store.versions
+        clock = self.clock
+
+        def tick() -> typing.Iterator[py_trees.behaviour.Behaviour]:
+            if (
+                subtree.status is not None
+                and clock() < subtree.wake
+                and all(versions[slot] == seen for slot, seen in zip(subtree.slots, subtree.versions))
+            ):
+                self.skipped += 1
+                # a parent may have reset it with stop(INVALID)
+                node.status = subtree.status
+                yield node
+                return
+            self.evaluated += 1
+            # read the versions first: writes made while ticking trigger another evaluation
+            seen = tuple(versions[slot] for slot in subtree.slots)
+            yield from original()
+            if node.status == Status.SUCCESS or node.status == Status.FAILURE:
+                subtree.status = node.status
+                subtree.versions = seen
+                subtree.wake = float("inf") if subtree.every is None else clock() + subtree.every
+            else:
+                subtree.status = None
+
+        subtree.tick = tick
+        subtree.previous = node.__dict__.get("tick", _ABSENT)
+        node.tick = tick  # type: ignore[method-assign]
+
+    def wake(self, node: typing.Optional[py_trees.behaviour.Behaviour] = None) -> None:
+        """Force the next tick to evaluate a skipped subtree, or all of them."""
+        for root, subtree in self.subtrees.items():
+            if node is None or root is node:
+                subtree.status = None
+
+    def close(self) -> None:
+        """Remove the skipping, restoring the nodes' own ``tick``."""
+        for node, subtree in self.subtrees.items():
+            if node.__dict__.get("tick") is not subtree.tick:
+                continue  # since wrapped, e.g. by a profiler, leave it be
+            if subtree.previous is _ABSENT:
+                del node.__dict__["tick"]
+            else:
+                node.__dict__["tick"] = subtree.previous
+        self.subtrees.clear()
@@ -0,0 +1,301 @@
+"""
+Tick many independent trees across worker processes.
+
+Every demo ticks a single tree in a blocking loop, so a fleet of trees run
+that way is confined to one core. :class:`Fleet` builds the trees inside a
+set of worker processes (one share of the factories each) and ticks them
+either in lockstep - every tree finishes tick ``n`` before any tree starts
+tick ``n + 1`` - or free-running, each worker as fast as it can.
+
+Trees never cross the process boundary. After every tick each worker writes a
+fixed size summary row per tree (root status and how many nodes are in each
+status) into a block of shared memory, which the parent reads without any
+pickling.
+
+.. code-block:: python
+
+   fleet = Fleet([Behaviour_Foo.build_tree] * 64, seed=1)
+   for tick, summaries in fleet.run(number_of_ticks=100):
+       running = sum(summary.status == Status.RUNNING for summary in summaries)
+"""
+
+import multiprocessing
+import multiprocessing.shared_memory
+import multiprocessing.synchronize
+import os
+import random
+import threading
+import time
+import typing
+
+import py_trees
+
+from . import compiler
+
+TreeFactory = typing.Callable[[], py_trees.behaviour.Behaviour]
+
+STATUSES = (
+    py_trees.common.Status.INVALID,
+    py_trees.common.Status.RUNNING,
+    py_trees.common.Status.SUCCESS,
+    py_trees.common.Status.FAILURE,
+)
+CODES = {status: code for code, status in enumerate(STATUSES)}
+
+# shared memory layout, in int64 words: a header followed by one row per tree
+_HEADER = 1
+_STOP = 0
+# version is odd while a worker is writing the row
+_VERSION, _TICK, _STATUS, _COUNTS = 0, 1, 2, 3
+_ROW = _COUNTS + len(STATUSES)
+
+
+class TreeSummary(typing.NamedTuple):
+    """Where a single tree of the fleet got to."""
+
+    index: int
+    tick: int
+    status: py_trees.common.Status
+    counts: typing.Dict[py_trees.common.Status, int]
+
+
+class Fleet:
+    """
+    Tick independent trees on a pool of worker processes.
+
+    With the default ``fork`` start method the factories may be any callable,
+    e.g. a ``build_tree`` imported from a demo script; other start methods
+    need picklable (module level) factories.
+
+    Args:
+        factories: one tree factory per tree, e.g. ``[build_tree] * 100``
+        processes: number of worker processes, defaults to the CPU count
+        lockstep: keep every tree on the same tick, otherwise free-running
+        compiled: tick through :class:`~pytree_stuff.compiler.CompiledTree`
+        seed: seed :mod:`random` in each worker with ``seed + worker``, so
+            trees with random leaves are reproducible
+        context: a multiprocessing context, defaults to ``fork`` where available
+    """
+
+    def __init__(
+        self,
+        factories: typing.Sequence[TreeFactory],
+        processes: typing.Optional[int] = None,
+        lockstep: bool = True,
+        compiled: bool = False,
+        seed: typing.Optional[int] = None,
+        context: typing.Optional[typing.Any] = None,
+    ) -> None:
+        if not factories:
+            raise ValueError("a fleet needs at least one tree")
+        self.factories = list(factories)
+        self.processes = max(1, min(processes or os.cpu_count() or 1, len(self.factories)))
+        self.lockstep = lockstep
+        self.compiled = compiled
+        self.seed = seed
+        if context is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        self.context = context
+
+    def _shares(self) -> typing.List[typing.List[int]]:
+        return [list(range(worker, len(self.factories), self.processes)) for worker in range(self.processes)]
+
+    def run(
+        self,
+        number_of_ticks: typing.Optional[int] = None,
+        stop_on_terminal_state: bool = True,
+        poll_interval: float = 0.05,
+    ) -> typing.Iterator[typing.Tuple[int, typing.List[TreeSummary]]]:
+        """
+        Tick the fleet, yielding ``(tick, summaries)`` as it goes.
+
+        In lockstep mode there's one yield per tick and the workers wait for
+        the consumer before ticking again. Free-running, the summaries are
+        snapshots taken every ``poll_interval`` seconds, ``tick`` is the
+        lowest tick count across the fleet and a final snapshot is yielded
+        once every worker finished. Closing the generator stops the workers.
+
+        Args:
+            number_of_ticks: ticks per tree, None for no limit
+            stop_on_terminal_state: stop ticking a tree once its root is no
+                longer RUNNING, and stop the fleet once that holds for every tree
+            poll_interval: seconds between free-running snapshots
+
+        Raises:
+            RuntimeError: if a worker failed to build or tick one of its trees
+        """
+        shares = self._shares()
+        memory = multiprocessing.shared_memory.SharedMemory(
+            create=True, size=8 * (_HEADER + _ROW * len(self.factories))
+        )
+        words = memory.buf.cast("q")
+        for index in range(len(words)):
+            words[index] = 0
+        barrier = self.context.Barrier(self.processes + 1) if self.lockstep else None
+        workers = [
+            self.context.Process(
+                target=_work,
+                args=(
+                    memory,
+                    share,
+                    [self.factories[index] for index in share],
+                    barrier,
+                    number_of_ticks,
+                    stop_on_terminal_state,
+                    self.compiled,
+                    None if self.seed is None else self.seed + worker,
+                ),
+                name=f"fleet-{worker}",
+                daemon=True,
+            )
+            for worker, share in enumerate(shares)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            if barrier is not None:
+                yield from self._lockstep(words, barrier, number_of_ticks, stop_on_terminal_state)
+            else:
+                yield from self._free_running(words, workers, poll_interval)
+        finally:
+            words[_STOP] = 1
+            if barrier is not None:
+                barrier.abort()
+            for worker in workers:
+                worker.join(timeout=5.0)
+                if worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+            words.release()
+            memory.close()
+            memory.unlink()
+        failed = [worker.name for worker in workers if worker.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"fleet workers failed, see their tracebacks {failed}")
+
+    def _lockstep(
+        self,
+        words: memoryview,
+        barrier: multiprocessing.synchronize.Barrier,
+        number_of_ticks: typing.Optional[int],
+        stop_on_terminal_state: bool,
+    ) -> typing.Iterator[typing.Tuple[int, typing.List[TreeSummary]]]:
+        tick = 0
+        while number_of_ticks is None or tick < number_of_ticks:
+            try:
+                barrier.wait()  # every worker finished this tick
+            except threading.BrokenBarrierError:
+                return
+            tick += 1
+            summaries = self.summaries(words)
+            finished = (number_of_ticks is not None and tick >= number_of_ticks) or (
+                stop_on_terminal_state
+                and all(summary.status != py_trees.common.Status.RUNNING for summary in summaries)
+            )
+            if finished:
+                words[_STOP] = 1
+            yield tick, summaries
+            try:
+                barrier.wait()  # release the workers into the next tick
+            except threading.BrokenBarrierError:
+                return
+            if finished:
+                return
+
+    def _free_running(
+        self,
+        words: memoryview,
+        workers: typing.List[typing.Any],
+        poll_interval: float,
+    ) -> typing.Iterator[typing.Tuple[int, typing.List[TreeSummary]]]:
+        while any(worker.is_alive() for worker in workers):
+            time.sleep(poll_interval)
+            summaries = self.summaries(words)
+            yield min(summary.tick for summary in summaries), summaries
+        summaries = self.summaries(words)
+        yield min(summary.tick for summary in summaries), summaries
+
+    def summaries(self, words: memoryview) -> typing.List[TreeSummary]:
+        """Read a consistent summary of every tree from the shared memory words."""
+        summaries = []
+        for index in range(len(self.factories)):
+            base = _HEADER + _ROW * index
+            while True:
+                version = words[base + _VERSION]
+                row = words[base:base + _ROW].tolist()
+                if not version & 1 and words[base + _VERSION] == version:
+                    break
+            summaries.append(
+                TreeSummary(
+                    index=index,
+                    tick=row[_TICK],
+                    status=STATUSES[row[_STATUS]],
+                    counts={status: row[_COUNTS + code] for code, status in enumerate(STATUSES)},
+                )
+            )
+        return summaries
+
+
+def _work(
+    memory: multiprocessing.shared_memory.SharedMemory,
+    indices: typing.List[int],
+    factories: typing.List[TreeFactory],
+    barrier: typing.Optional[multiprocessing.synchronize.Barrier],
+    number_of_ticks: typing.Optional[int],
+    stop_on_terminal_state: bool,
+    compiled: bool,
+    seed: typing.Optional[int],
+) -> None:
+    words = memory.buf.cast("q")
+    try:
+        if seed is not None:
+            random.seed(seed)
+        trees: typing.List[typing.Any] = []
+        nodes: typing.List[typing.List[py_trees.behaviour.Behaviour]] = []
+        for factory in factories:
+            tree = py_trees.trees.BehaviourTree(root=factory())
+            tree.setup(timeout=1.0)
+            trees.append(compiler.CompiledTree(tree) if compiled else tree)
+            nodes.append(list(tree.root.iterate()))
+        active = [True] * len(trees)
+        tick = 0
+        while not words[_STOP] and (number_of_ticks is None or tick < number_of_ticks):
+            tick += 1
+            for position, tree in enumerate(trees):
+                if not active[position]:
+                    continue
+                tree.tick()
+                _write(words, indices[position], tree, nodes[position])
+                if stop_on_terminal_state and tree.root.status != py_trees.common.Status.RUNNING:
+                    active[position] = False
+            if barrier is not None:
+                barrier.wait()  # tick done, the parent reads the summaries
+                barrier.wait()  # the parent asks for another tick, or to stop
+            elif stop_on_terminal_state and not any(active):
+                break
+    except threading.BrokenBarrierError:
+        # the parent stopped the fleet, or another worker failed
+        pass
+    except BaseException:
+        if barrier is not None:
+            barrier.abort()
+        raise
+    finally:
+        words.release()
+
+
+def _write(
+    words: memoryview, index: int, tree: typing.Any, nodes: typing.List[py_trees.behaviour.Behaviour]
+) -> None:
+    counts = [0] * len(STATUSES)
+    for node in nodes:
+        counts[CODES[node.status]] += 1
+    base = _HEADER + _ROW * index
+    version = words[base + _VERSION]
+    words[base + _VERSION] = version + 1
+    words[base + _TICK] = tree.count
+    words[base + _STATUS] = CODES[tree.root.status]
+    for code, count in enumerate(counts):
+        words[base + _COUNTS + code] = count
+    words[base + _VERSION] = version + 2
@@ -0,0 +1,264 @@
+"""
+Memoized guard conditions.
+
+:class:`~py_trees.decorators.EternalGuard` calls its condition before every
+tick of its child, and the demos' conditions are cheap - in practice they
+query expensive state. :class:`Memoized` wraps a condition so its result is
+reused while the blackboard keys it declares hold the same values and, if
+given, a time to live hasn't elapsed. Results live in a :class:`ConditionCache`
+with LRU eviction, which many guards can share, and which counts hits,
+misses, expirations and evictions.
+
+.. code-block:: python
+
+   store = blackboard.Store()
+   guard = guards.MemoizedEternalGuard(
+       name="Battery OK?",
+       child=task,
+       condition=lambda blackboard: expensive_check(blackboard.read(battery)),
+       keys=["battery"],
+       ttl=0.5,
+       store=store,
+   )
+   ...
+   print(guards.default_cache().summary())
+
+Keys refer to a :class:`~pytree_stuff.blackboard.Store`. A condition with a
+``blackboard`` parameter is passed a :class:`~pytree_stuff.blackboard.Client`
+with read access to them, much like :class:`~py_trees.decorators.EternalGuard`.
+"""
+
+import collections
+import inspect
+import itertools
+import typing
+
+import py_trees
+
+from . import blackboard
+from . import clock as clock_module
+from . import events
+
+Status = py_trees.common.Status
+
+_tokens = itertools.count()
+
+
+class ConditionCache:
+    """
+    Condition results shared by many :class:`Memoized` conditions.
+
+    Args:
+        capacity: maximum number of results, the least recently used are
+            evicted beyond that
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1 [{capacity}]")
+        self.capacity = capacity
+        # key -> (result, expiry)
+        self.entries: "collections.OrderedDict[typing.Hashable, typing.Tuple[typing.Any, float]]" = (
+            collections.OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: typing.Hashable, now: float) -> typing.Tuple[bool, typing.Any]:
+        """
+        Look up a result, counting the hit or miss.
+
+        Returns:
+            whether it was found, and the result if so
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            if now < entry[1]:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[0]
+            del self.entries[key]
+            self.expirations += 1
+        self.misses += 1
+        return False, None
+
+    def put(self, key: typing.Hashable, result: typing.Any, expiry: float) -> None:
+        """Store a result until ``expiry`` (a clock reading), evicting if full."""
+        entries = self.entries
+        entries[key] = (result, expiry)
+        entries.move_to_end(key)
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every result, keeping the counters."""
+        self.entries.clear()
+
+    def summary(self) -> typing.Dict[str, float]:
+        """Size, counters and hit rate, e.g. for logging."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_default_cache: typing.Optional[ConditionCache] = None
+
+
+def default_cache() -> ConditionCache:
+    """The cache shared by conditions that aren't given one."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ConditionCache()
+    return _default_cache
+
+
+class Memoized:
+    """
+    A condition whose result is cached on its declared keys.
+
+    The result is reused while every key holds the same value, of the same
+    type (values that can't be hashed compare by the key's version instead)
+    and, with a ``ttl``, for at most that long. Without keys or ``ttl`` the
+    condition only ever runs once per cache eviction.
+
+    Args:
+        condition: returns a bool or :class:`~py_trees.common.Status`, may take
+            a ``blackboard`` argument (see the module docs)
+        keys: the store keys the result depends on
+        ttl: seconds a result stays valid, None for as long as the keys don't change
+        store: defaults to :func:`~pytree_stuff.blackboard.default_store`
+        cache: defaults to :func:`default_cache`
+        clock: a :class:`~pytree_stuff.clock.Clock` or time source, defaults
+            to following :func:`~pytree_stuff.clock.default_clock`
+        name: name of the client passed to the condition
+    """
+
+    def __init__(
+        self,
+        condition: typing.Callable[..., typing.Any],
+        keys: typing.Iterable[str] = (),
+        ttl: typing.Optional[float] = None,
+        store: typing.Optional[blackboard.Store] = None,
+        cache: typing.Optional[ConditionCache] = None,
+        clock: typing.Union[clock_module.Clock, typing.Callable[[], float], None] = None,
+        name: str = "Memoized",
+    ) -> None:
+        self.keys = list(keys)
+        self.ttl = ttl
+        self.store = store if store is not None else blackboard.default_store()
+        self.cache = cache if cache is not None else default_cache()
+        self.clock = clock_module.resolve(clock)
+        self.client = blackboard.Client(name, store=self.store)
+        self.slots = [self.client.register_key(key, py_trees.common.Access.READ) for key in self.keys]
+        if "blackboard" in inspect.signature(condition).parameters:
+            self.condition: typing.Callable[[], typing.Any] = lambda: condition(blackboard=self.client)
+        else:
+            self.condition = condition
+        self.token = next(_tokens)
+
+    def key(self) -> typing.Hashable:
+        """The cache key for the current values of the declared keys."""
+        values = self.store.values
+        # 1 == 1.0 == True, but for the store a value of another type is a change
+        key = (self.token,) + tuple((type(values[slot]), values[slot]) for slot in self.slots)
+        try:
+            hash(key)
+        except TypeError:
+            versions = self.store.versions
+            key = (self.token, None) + tuple(versions[slot] for slot in self.slots)
+        return key
+
+    def __call__(self) -> typing.Any:
+        key = self.key()
+        now = self.clock()
+        found, result = self.cache.get(key, now)
+        if not found:
+            result = self.condition()
+            self.cache.put(key, result, float("inf") if self.ttl is None else now + self.ttl)
+        return result
+
+    def invalidate(self) -> None:
+        """Forget the cached result for the current key values."""
+        self.cache.entries.pop(self.key(), None)
+
+
+class MemoizedEternalGuard(py_trees.decorators.EternalGuard):
+    """
+    :class:`~py_trees.decorators.EternalGuard` with a :class:`Memoized` condition.
+
+    Args:
+        name: the decorator name
+        child: the guarded child or subtree
+        condition: see :class:`Memoized`
+        keys: see :class:`Memoized`
+        ttl: see :class:`Memoized`
+        store: see :class:`Memoized`
+        cache: see :class:`Memoized`
+        clock: see :class:`Memoized`
+    """
+
+    def __init__(
+        self,
+        name: str,
+        child: py_trees.behaviour.Behaviour,
+        condition: typing.Callable[..., typing.Any],
+        keys: typing.Iterable[str] = (),
+        ttl: typing.Optional[float] = None,
+        store: typing.Optional[blackboard.Store] = None,
+        cache: typing.Optional[ConditionCache] = None,
+        clock: typing.Union[clock_module.Clock, typing.Callable[[], float], None] = None,
+    ) -> None:
+        memoized = Memoized(condition, keys, ttl=ttl, store=store, cache=cache, clock=clock, name=name)
+        super().__init__(name=name, child=child, condition=memoized)
+        self.memoized = memoized
+
+
+class MemoizedCondition(py_trees.behaviour.Behaviour):
+    """
+    A leaf returning SUCCESS or FAILURE from a :class:`Memoized` condition.
+
+    Declares its keys, and ``ttl`` as the re-evaluation period, for
+    :mod:`pytree_stuff.events`.
+
+    Args:
+        name: the behaviour name
+        condition: see :class:`Memoized`
+        keys: see :class:`Memoized`
+        ttl: see :class:`Memoized`
+        store: see :class:`Memoized`
+        cache: see :class:`Memoized`
+        clock: see :class:`Memoized`
+    """
+
+    def __init__(
+        self,
+        name: str,
+        condition: typing.Callable[..., typing.Any],
+        keys: typing.Iterable[str] = (),
+        ttl: typing.Optional[float] = None,
+        store: typing.Optional[blackboard.Store] = None,
+        cache: typing.Optional[ConditionCache] = None,
+        clock: typing.Union[clock_module.Clock, typing.Callable[[], float], None] = None,
+    ) -> None:
+        super().__init__(name)
+        self.memoized = Memoized(condition, keys, ttl=ttl, store=store, cache=cache, clock=clock, name=name)
+        events.declare(self, keys=self.memoized.keys, every=ttl)
+
+    def update(self) -> Status:
+        result = self.memoized()
+        if isinstance(result, Status):
+            return Status.FAILURE if result == Status.FAILURE else Status.SUCCESS
+        return Status.SUCCESS if result else Status.FAILURE
@@ -0,0 +1,219 @@
+"""
+Run slow leaf work on a shared, bounded thread pool.
+
+A leaf that does its work inside ``update()`` stretches every tick by however
+long that work takes. :class:`Offload` instead submits a callable to an
+:class:`OffloadPool` on its first tick and stays RUNNING until the future
+completes, so the tick itself only ever polls. The pool bounds how much work
+may be queued, and records queue depth, queue wait and run times so that
+overloaded pools show up before they start to hurt.
+
+.. code-block:: python
+
+   checksum = offload.Offload("Checksum", hashlib.sha256, payload)
+   ...
+   print(offload.default_pool().summary())
+"""
+
+import collections
+import concurrent.futures
+import threading
+import time
+import typing
+
+import py_trees
+
+from . import ticking
+
+
+class OffloadPool:
+    """
+    A thread pool with a bounded queue and wait / run time metrics.
+
+    Args:
+        max_workers: worker threads, defaults to the executor's default
+        max_pending: submissions allowed to wait for a worker, beyond which
+            :meth:`try_submit` refuses new work
+        history: number of recent samples used for the percentiles
+    """
+
+    def __init__(
+        self,
+        max_workers: typing.Optional[int] = None,
+        max_pending: int = 64,
+        history: int = 4096,
+    ) -> None:
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="offload"
+        )
+        self.max_pending = max_pending
+        self.submitted = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.queued = 0
+        self.running = 0
+        self.waits: typing.Deque[float] = collections.deque(maxlen=history)
+        self.durations: typing.Deque[float] = collections.deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        """Submissions still waiting for a worker thread."""
+        return self.queued
+
+    def try_submit(
+        self, function: typing.Callable[..., typing.Any], *args: typing.Any
+    ) -> typing.Optional["concurrent.futures.Future[typing.Any]"]:
+        """
+        Submit ``function(*args)``, unless the queue is full.
+
+        Returns:
+            the future, or None if the queue already holds ``max_pending`` submissions
+
+        Raises:
+            RuntimeError: if the pool was shut down
+        """
+        with self._lock:
+            if self.queued >= self.max_pending:
+                self.rejected += 1
+                return None
+            self.queued += 1
+            self.submitted += 1
+        try:
+            future = self.executor.submit(self._call, time.perf_counter(), function, args)
+        except BaseException:
+            # e.g. RuntimeError after shutdown(), nothing was queued
+            with self._lock:
+                self.queued -= 1
+                self.submitted -= 1
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _call(
+        self, submitted: float, function: typing.Callable[..., typing.Any], args: typing.Tuple[typing.Any, ...]
+    ) -> typing.Any:
+        started = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.waits.append(started - submitted)
+        try:
+            return function(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.running -= 1
+                self.durations.append(finished - started)
+
+    def _done(self, future: "concurrent.futures.Future[typing.Any]") -> None:
+        with self._lock:
+            if future.cancelled():
+                # never reached _call
+                self.queued -= 1
+                self.cancelled += 1
+            else:
+                self.completed += 1
+
+    def summary(self) -> str:
+        """One line, human readable summary of the pool metrics."""
+        percentile = ticking.TickStatistics.percentile
+        return (
+            f"submitted={self.submitted} completed={self.completed} "
+            f"cancelled={self.cancelled} rejected={self.rejected} "
+            f"queued={self.queued} running={self.running} "
+            f"wait p50={percentile(self.waits, 50) * 1e3:.3f}ms "
+            f"p99={percentile(self.waits, 99) * 1e3:.3f}ms "
+            f"run p50={percentile(self.durations, 50) * 1e3:.3f}ms "
+            f"p99={percentile(self.durations, 99) * 1e3:.3f}ms"
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancel queued work and stop the worker threads."""
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_default: typing.Optional[OffloadPool] = None
+_default_lock = threading.Lock()
+
+
+def default_pool() -> OffloadPool:
+    """The pool shared by every :class:`Offload` that wasn't given one."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = OffloadPool()
+        return _default
+
+
+class Offload(py_trees.behaviour.Behaviour):
+    """
+    Run a callable on an :class:`OffloadPool`, RUNNING until it returns.
+
+    The callable is submitted on the first tick. If the pool's queue is full,
+    the behaviour stays RUNNING and retries on the following ticks. Once it
+    returns, a :class:`~py_trees.common.Status` result is used as is, ``False``
+    means FAILURE and anything else SUCCESS; the value is kept in ``result``.
+    An exception means FAILURE.
+
+    Interrupting the behaviour cancels work that hasn't started yet. Work
+    that already started runs to completion and its result is discarded.
+
+    Args:
+        name: the behaviour name
+        function: the work, called from a worker thread
+        args: positional arguments for ``function``
+        pool: defaults to :func:`default_pool`
+    """
+
+    def __init__(
+        self,
+        name: str,
+        function: typing.Callable[..., typing.Any],
+        *args: typing.Any,
+        pool: typing.Optional[OffloadPool] = None,
+    ) -> None:
+        super().__init__(name)
+        self.function = function
+        self.args = args
+        self.pool = pool
+        self.future: typing.Optional["concurrent.futures.Future[typing.Any]"] = None
+        self.result: typing.Any = None
+
+    def initialise(self) -> None:
+        # update(), called straight after, submits
+        self.future = None
+        self.result = None
+
+    def _submit(self) -> None:
+        pool = self.pool or default_pool()
+        self.future = pool.try_submit(self.function, *self.args)
+        self.feedback_message = "queue full, retrying" if self.future is None else "submitted"
+
+    def update(self) -> py_trees.common.Status:
+        if self.future is None:
+            self._submit()
+            if self.future is None:
+                return py_trees.common.Status.RUNNING
+        if not self.future.done():
+            return py_trees.common.Status.RUNNING
+        if self.future.cancelled():
+            self.feedback_message = "cancelled"
+            return py_trees.common.Status.FAILURE
+        error = self.future.exception()
+        if error is not None:
+            self.feedback_message = f"{type(error).__name__}: {error}"
+            return py_trees.common.Status.FAILURE
+        self.result = self.future.result()
+        self.feedback_message = "done"
+        if isinstance(self.result, py_trees.common.Status):
+            return self.result
+        if self.result is False:
+            return py_trees.common.Status.FAILURE
+        return py_trees.common.Status.SUCCESS
+
+    def terminate(self, new_status: py_trees.common.Status) -> None:
+        if new_status == py_trees.common.Status.INVALID and self.future is not None:
+            self.future.cancel()
+            self.future = None
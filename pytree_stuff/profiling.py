@@ -0,0 +1,227 @@
+"""
+Opt-in per-node profiling.
+
+:class:`Profiler` wraps ``tick`` and the ``initialise`` / ``update`` /
+``terminate`` hooks of every node under a root with timing shims that use
+:func:`time.perf_counter_ns`, and removes them again when disabled, so a tree
+that isn't being profiled runs the original methods with no overhead at all.
+
+Per node it records call counts, cumulative time (the node's ``tick()``
+generator, children included) and self time (cumulative minus the children's
+cumulative time). The results come as a hot-path report sorted by self time,
+or as collapsed stacks for ``flamegraph.pl`` / speedscope.
+
+.. code-block:: python
+
+   with profiling.Profiler(tree.root) as profiler:
+       for _ in range(1000):
+           tree.tick()
+   print(profiler.report())
+   profiler.write_collapsed("tree.folded")
+
+Trees ticked through :mod:`pytree_stuff.compiler` never call ``tick()`` on
+the compiled nodes, for those the self time is the time spent in the hooks.
+"""
+
+import time
+import typing
+from pathlib import Path
+
+import py_trees
+
+HOOKS = ("initialise", "update", "terminate")
+_ABSENT = object()
+
+
+class NodeProfile:
+    """Counters for a single node, all times in nanoseconds."""
+
+    __slots__ = ("ticks", "tick_ns", "calls", "hook_ns")
+
+    def __init__(self) -> None:
+        self.ticks = 0
+        self.tick_ns = 0
+        self.calls = dict.fromkeys(HOOKS, 0)
+        self.hook_ns = dict.fromkeys(HOOKS, 0)
+
+
+class Profiler:
+    """
+    Time every node of a tree.
+
+    Nodes added to the tree while enabled aren't profiled until the profiler
+    is re-enabled.
+
+    Args:
+        root: the root of the tree to profile
+    """
+
+    def __init__(self, root: py_trees.behaviour.Behaviour) -> None:
+        self.root = root
+        self.profiles: typing.Dict[py_trees.behaviour.Behaviour, NodeProfile] = {}
+        # node -> attribute -> (shim, instance attribute it replaced, if any)
+        self.shims: typing.Dict[
+            py_trees.behaviour.Behaviour, typing.Dict[str, typing.Tuple[typing.Any, typing.Any]]
+        ] = {}
+        self.enabled = False
+
+    def __enter__(self) -> "Profiler":
+        self.enable()
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.disable()
+
+    def enable(self) -> None:
+        """Install the timing shims on every node under the root."""
+        if self.enabled:
+            return
+        for node in self.root.iterate():
+            profile = self.profiles.setdefault(node, NodeProfile())
+            shims = self.shims[node] = {}
+            for attribute in HOOKS + ("tick",):
+                method = getattr(node, attribute)
+                if attribute == "tick":
+                    shim = _timed_tick(method, profile)
+                else:
+                    shim = _timed_hook(method, attribute, profile)
+                # keep shims other modules installed, e.g. events.EventDrivenTree's
+                shims[attribute] = (shim, node.__dict__.get(attribute, _ABSENT))
+                setattr(node, attribute, shim)
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Remove the shims, restoring the class methods."""
+        if not self.enabled:
+            return
+        for node, shims in self.shims.items():
+            for attribute, (shim, previous) in shims.items():
+                if node.__dict__.get(attribute) is not shim:
+                    continue  # since wrapped or removed by someone else, leave it be
+                if previous is _ABSENT:
+                    del node.__dict__[attribute]
+                else:
+                    node.__dict__[attribute] = previous
+        self.shims.clear()
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Zero every counter."""
+        for node in self.profiles:
+            self.profiles[node] = NodeProfile()
+        if self.enabled:
+            self.disable()
+            self.enable()
+
+    def _nodes(self) -> typing.Iterator[typing.Tuple[typing.Tuple[str, ...], py_trees.behaviour.Behaviour]]:
+        stack: typing.List[typing.Tuple[typing.Tuple[str, ...], py_trees.behaviour.Behaviour]] = [
+            ((self.root.name,), self.root)
+        ]
+        while stack:
+            path, node = stack.pop()
+            yield path, node
+            for child in reversed(node.children):
+                stack.append((path + (child.name,), child))
+
+    def cumulative_ns(self, node: py_trees.behaviour.Behaviour) -> int:
+        """Time spent ticking ``node`` and its descendants."""
+        profile = self.profiles.get(node)
+        if profile is None:
+            return 0
+        if profile.ticks:
+            return profile.tick_ns
+        # not ticked through its generator, e.g. compiled
+        return sum(profile.hook_ns.values()) + sum(self.cumulative_ns(child) for child in node.children)
+
+    def self_ns(self, node: py_trees.behaviour.Behaviour) -> int:
+        """Time spent ticking ``node``, excluding its descendants."""
+        children = sum(self.cumulative_ns(child) for child in node.children)
+        return max(0, self.cumulative_ns(node) - children)
+
+    def hot_path(self) -> typing.List[py_trees.behaviour.Behaviour]:
+        """From the root, repeatedly follow the child with the most cumulative time."""
+        path = [self.root]
+        while path[-1].children:
+            path.append(max(path[-1].children, key=self.cumulative_ns))
+        return path
+
+    def report(self, limit: typing.Optional[int] = 20) -> str:
+        """
+        The hot path and a table of nodes sorted by self time.
+
+        Args:
+            limit: maximum number of table rows, None for all nodes
+        """
+        total = self.cumulative_ns(self.root) or 1
+        rows = sorted(self._nodes(), key=lambda item: self.self_ns(item[1]), reverse=True)
+        lines = [
+            "hot path: " + " -> ".join(
+                f"{node.name} ({100.0 * self.cumulative_ns(node) / total:.0f}%)"
+                for node in self.hot_path()
+            ),
+            f"{'self ms':>10} {'self %':>7} {'cum ms':>10} {'ticks':>8} "
+            f"{'init':>7} {'update':>8} {'term':>7}  node",
+        ]
+        for path, node in rows[:limit]:
+            profile = self.profiles.get(node, NodeProfile())
+            lines.append(
+                f"{self.self_ns(node) / 1e6:>10.3f} {100.0 * self.self_ns(node) / total:>6.1f}%"
+                f" {self.cumulative_ns(node) / 1e6:>10.3f} {profile.ticks:>8}"
+                f" {profile.calls['initialise']:>7} {profile.calls['update']:>8}"
+                f" {profile.calls['terminate']:>7}  {'/'.join(path)}"
+            )
+        return "\n".join(lines)
+
+    def collapsed(self) -> str:
+        """Self time per node as collapsed stacks (``root;child;leaf nanoseconds``)."""
+        lines = []
+        for path, node in self._nodes():
+            self_time = self.self_ns(node)
+            if self_time:
+                frames = ";".join(name.replace(";", ":") for name in path)
+                lines.append(f"{frames} {self_time}")
+        return "\n".join(lines) + "\n"
+
+    def write_collapsed(self, path: typing.Union[str, Path]) -> None:
+        """Write :meth:`collapsed` to a file, e.g. for ``flamegraph.pl``."""
+        Path(path).write_text(self.collapsed())
+
+
+def _timed_hook(
+    method: typing.Callable[..., typing.Any], hook: str, profile: NodeProfile
+) -> typing.Callable[..., typing.Any]:
+    clock = time.perf_counter_ns
+
+    def timed(*args: typing.Any) -> typing.Any:
+        started = clock()
+        try:
+            return method(*args)
+        finally:
+            profile.hook_ns[hook] += clock() - started
+            profile.calls[hook] += 1
+
+    return timed
+
+
+def _timed_tick(
+    method: typing.Callable[[], typing.Iterator[py_trees.behaviour.Behaviour]],
+    profile: NodeProfile,
+) -> typing.Callable[[], typing.Iterator[py_trees.behaviour.Behaviour]]:
+    clock = time.perf_counter_ns
+
+    def timed() -> typing.Iterator[py_trees.behaviour.Behaviour]:
+        # only time spent inside the generator counts, not the consumer's
+        # work (e.g. visitors) while it is suspended at a yield
+        profile.ticks += 1
+        generator = method()
+        while True:
+            started = clock()
+            try:
+                node = next(generator)
+            except StopIteration:
+                profile.tick_ns += clock() - started
+                return
+            profile.tick_ns += clock() - started
+            yield node
+
+    return timed
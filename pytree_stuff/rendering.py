@@ -0,0 +1,147 @@
+"""
+Cached, off-thread dot/png/svg rendering of trees.
+
+:func:`py_trees.display.render_dot_tree` runs graphviz synchronously and
+rewrites every file each time a demo starts. :func:`render` instead hashes the
+tree structure, skips the work entirely when the files on disk were rendered
+from the same structure, and otherwise hands the graphviz calls to a single
+background worker so that startup isn't gated on them.
+"""
+
+import concurrent.futures
+import hashlib
+import os
+import typing
+from pathlib import Path
+
+import py_trees
+
+_executor: typing.Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+EXTENSIONS = ("dot", "png", "svg")
+
+
+def structure_hash(root: py_trees.behaviour.Behaviour) -> str:
+    """
+    Hash everything about a tree that shows up in its rendered graph.
+
+    Covers the shape of the tree, each node's class and name, the memory /
+    policy flags the dot graph annotates and the py_trees version. Statuses
+    and other runtime state are ignored.
+
+    Args:
+        root: the root of a tree, or subtree
+
+    Returns:
+        a hex digest
+    """
+    digest = hashlib.sha256(py_trees.version.__version__.encode())
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        fields = [
+            str(depth),
+            type(node).__qualname__,
+            node.name,
+            str(node.blackbox_level),
+        ]
+        if hasattr(node, "memory"):
+            fields.append(f"memory={node.memory}")
+        policy = getattr(node, "policy", None)
+        if policy is not None:
+            fields.append(f"{type(policy).__name__}:{getattr(policy, 'synchronise', None)}")
+        digest.update("\0".join(fields).encode())
+        digest.update(b"\n")
+        stack.extend((child, depth + 1) for child in reversed(node.children))
+    return digest.hexdigest()
+
+
+def _paths(name: str, target_directory: Path) -> typing.Dict[str, Path]:
+    stem = py_trees.utilities.get_valid_filename(name)
+    return {extension: target_directory / f"{stem}.{extension}" for extension in EXTENSIONS}
+
+
+def _hash_path(name: str, target_directory: Path) -> Path:
+    return target_directory / f".{py_trees.utilities.get_valid_filename(name)}.hash"
+
+
+def _up_to_date(digest: str, paths: typing.Dict[str, Path], hash_path: Path) -> bool:
+    if not hash_path.exists() or not all(path.exists() for path in paths.values()):
+        return False
+    return hash_path.read_text().strip() == digest
+
+
+def is_current(
+    root: py_trees.behaviour.Behaviour,
+    name: str,
+    target_directory: typing.Union[str, Path],
+) -> bool:
+    """Whether the rendered files on disk already match this tree's structure."""
+    target_directory = Path(target_directory)
+    return _up_to_date(
+        structure_hash(root),
+        _paths(name, target_directory),
+        _hash_path(name, target_directory),
+    )
+
+
+def _write(
+    graph: typing.Any, paths: typing.Dict[str, Path], hash_path: Path, digest: str
+) -> typing.Dict[str, str]:
+    writers = {"dot": graph.write, "png": graph.write_png, "svg": graph.write_svg}
+    for extension, path in paths.items():
+        writers[extension](os.fspath(path))
+    # only record the hash once every file made it to disk
+    hash_path.write_text(digest + "\n")
+    return {extension: os.fspath(path) for extension, path in paths.items()}
+
+
+def _report(future: "concurrent.futures.Future[typing.Dict[str, str]]") -> None:
+    error = future.exception()
+    if error is not None:
+        py_trees.console.logwarn(f"tree rendering failed [{error}]")
+
+
+def render(
+    root: py_trees.behaviour.Behaviour,
+    name: str,
+    target_directory: typing.Union[str, Path],
+    background: bool = True,
+    force: bool = False,
+) -> typing.Optional["concurrent.futures.Future[typing.Dict[str, str]]"]:
+    """
+    Render a tree to dot/png/svg unless the existing files are up to date.
+
+    The dot graph is built on the calling thread, so the tree may be ticked
+    as soon as this returns; only the graphviz invocations run on the worker.
+
+    Args:
+        root: the root of a tree, or subtree
+        name: file name stem for the created files
+        target_directory: where to write the files, created if missing
+        background: run graphviz on the background worker
+        force: render even if the files are up to date
+
+    Returns:
+        a future for the written file names, or None if nothing needed doing
+    """
+    global _executor
+    target_directory = Path(target_directory)
+    digest = structure_hash(root)
+    hash_path = _hash_path(name, target_directory)
+    paths = _paths(name, target_directory)
+    if not force and _up_to_date(digest, paths, hash_path):
+        return None
+    target_directory.mkdir(parents=True, exist_ok=True)
+    graph = py_trees.display.dot_tree(root)
+    if not background:
+        future: "concurrent.futures.Future[typing.Dict[str, str]]" = concurrent.futures.Future()
+        future.set_result(_write(graph, paths, hash_path, digest))
+        return future
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="render"
+        )
+    future = _executor.submit(_write, graph, paths, hash_path, digest)
+    future.add_done_callback(_report)
+    return future
@@ -0,0 +1,372 @@
+"""
+A blackboard in shared memory, for trees living in different processes.
+
+:mod:`py_trees.blackboard` (and :mod:`pytree_stuff.blackboard`) only exist
+inside one process, so agents ticked by separate workers - e.g. a
+:class:`~pytree_stuff.fleet.Fleet` - can't see each other's state without
+pickling it through pipes or sockets. A :class:`SharedBlackboard` is a block
+of :mod:`multiprocessing.shared_memory` holding
+
+* a registry of keys, each with a fixed type (float, int or
+  :class:`~py_trees.common.Status`) and a slot, so every process resolves a
+  key to the same offset
+* one 16 byte slot per key: a sequence counter and the 8 byte value
+
+Writes follow the seqlock protocol (the counter is odd while the value is
+being written) and reads retry until they see the same even counter before
+and after reading, so readers never block writers and never return a torn
+value. Each key must have a single writing process at a time. A writer
+dying mid-write leaves its slot odd: reads then raise :class:`TimeoutError`
+after :attr:`SharedBlackboard.stall_timeout`, until :meth:`~SharedBlackboard.repair`
+is called on the slot and it is rewritten.
+
+.. code-block:: python
+
+   board = SharedBlackboard.create(capacity=256)
+   slot = board.register("battery", float)
+   # in another process, attached with SharedBlackboard.attach(board.name)
+   level = board.read(board.slot("battery"))
+"""
+
+import multiprocessing.resource_tracker
+import multiprocessing.shared_memory
+import os
+import struct
+import time
+import typing
+
+import py_trees
+
+STATUSES = (
+    py_trees.common.Status.INVALID,
+    py_trees.common.Status.RUNNING,
+    py_trees.common.Status.SUCCESS,
+    py_trees.common.Status.FAILURE,
+)
+CODES = {status: code for code, status in enumerate(STATUSES)}
+
+FLOAT, INT, STATUS = 1, 2, 3
+KINDS: typing.Dict[typing.Any, int] = {
+    float: FLOAT,
+    int: INT,
+    py_trees.common.Status: STATUS,
+    "float": FLOAT,
+    "int": INT,
+    "status": STATUS,
+}
+
+MAGIC = b"PYTSHBB1"
+KEY_BYTES = 56
+# magic, capacity, registered keys
+_HEADER = struct.Struct("<8sQQ")
+_COUNT_WORD = 2
+# key, kind, padding
+_ENTRY = struct.Struct(f"<{KEY_BYTES}sB7x")
+_SLOT_WORDS = 2  # sequence counter, value
+
+
+# segments created by this process, which its resource tracker must keep
+_created: typing.Set[str] = set()
+
+
+def _own_tracker() -> bool:
+    """
+    Whether this process started the resource tracker it reports to.
+
+    Children started with spawn or forkserver are handed their parent's
+    tracker without its pid, forked children copy the pid of a process that
+    isn't theirs; either way the tracker is shared with the parent, whose
+    registrations it would lose if the child unregistered the same names.
+    """
+    pid = multiprocessing.resource_tracker._resource_tracker._pid  # type: ignore[attr-defined]
+    if pid is None:
+        return False
+    try:
+        os.waitpid(pid, os.WNOHANG)
+    except ChildProcessError:
+        return False
+    return True
+
+
+def _untrack(memory: multiprocessing.shared_memory.SharedMemory) -> None:
+    """Drop this process' tracker record of a segment, if it has one of its own."""
+    if os.name == "posix" and _own_tracker():
+        multiprocessing.resource_tracker.unregister(memory._name, "shared_memory")  # type: ignore[attr-defined]
+
+
+def _open(name: typing.Optional[str], create: bool, size: int = 0) -> multiprocessing.shared_memory.SharedMemory:
+    if create:
+        memory = multiprocessing.shared_memory.SharedMemory(name=name, create=True, size=size)
+        _created.add(memory.name)
+        return memory
+    try:
+        # the creator owns the segment, don't let this process' resource tracker unlink it
+        return multiprocessing.shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+    except TypeError:  # python < 3.13, attaching always registers the segment
+        memory = multiprocessing.shared_memory.SharedMemory(name=name)
+        if memory.name not in _created:
+            _untrack(memory)
+        return memory
+
+
+class SharedBlackboard:
+    """
+    Fixed-type key slots in a shared memory block, see the module docs.
+
+    Use :meth:`create` in one process and :meth:`attach` (or simply inherit
+    the instance, with the ``fork`` start method) in the others.
+
+    Args:
+        memory: the shared memory block
+        owner: whether this process created, and will unlink, the block
+        lock: a :class:`multiprocessing.Lock` shared by every process that
+            registers keys; without one, register every key before other
+            processes start registering theirs
+    """
+
+    def __init__(
+        self,
+        memory: multiprocessing.shared_memory.SharedMemory,
+        owner: bool = False,
+        lock: typing.Optional[typing.Any] = None,
+    ) -> None:
+        self.memory = memory
+        self.owner = owner
+        self.lock = lock
+        # seconds a read waits on a slot stuck mid-write before giving up
+        self.stall_timeout = 1.0
+        magic, self.capacity, _ = _HEADER.unpack_from(memory.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"not a shared blackboard [{memory.name}]")
+        self._registry = _HEADER.size
+        self._slots = self._registry + self.capacity * _ENTRY.size
+        self._words = memory.buf.cast("q")
+        self._floats = memory.buf.cast("d")
+        self._base = self._slots // 8
+        self._keys: typing.Dict[str, int] = {}
+        self._kinds: typing.List[int] = []
+
+    @classmethod
+    def create(
+        cls,
+        capacity: int = 1024,
+        name: typing.Optional[str] = None,
+        lock: typing.Optional[typing.Any] = None,
+    ) -> "SharedBlackboard":
+        """
+        Create a new, empty blackboard.
+
+        Args:
+            capacity: maximum number of keys
+            name: shared memory name, random if None
+            lock: see :class:`SharedBlackboard`
+        """
+        size = _HEADER.size + capacity * (_ENTRY.size + 8 * _SLOT_WORDS)
+        memory = _open(name, create=True, size=size)
+        memory.buf[:size] = bytes(size)
+        _HEADER.pack_into(memory.buf, 0, MAGIC, capacity, 0)
+        return cls(memory, owner=True, lock=lock)
+
+    @classmethod
+    def attach(cls, name: str, lock: typing.Optional[typing.Any] = None) -> "SharedBlackboard":
+        """Attach to a blackboard created by another process."""
+        return cls(_open(name, create=False), lock=lock)
+
+    @property
+    def name(self) -> str:
+        """The shared memory name, for :meth:`attach`."""
+        return self.memory.name
+
+    def __len__(self) -> int:
+        return self._words[_COUNT_WORD]
+
+    def _refresh(self) -> None:
+        # pick up keys registered by other processes
+        for slot in range(len(self._kinds), len(self)):
+            key, kind = _ENTRY.unpack_from(self.memory.buf, self._registry + slot * _ENTRY.size)
+            self._keys[key.rstrip(b"\0").decode()] = slot
+            self._kinds.append(kind)
+
+    def register(self, key: str, kind: typing.Any) -> int:
+        """
+        Register a key, or look up the slot of an existing one.
+
+        Args:
+            key: the key, at most 56 bytes of utf-8
+            kind: ``float``, ``int`` or :class:`~py_trees.common.Status`
+
+        Returns:
+            the key's slot
+
+        Raises:
+            ValueError: if the key is too long, the blackboard is full or the
+                key exists with another kind
+        """
+        code = KINDS.get(kind)
+        if code is None:
+            raise ValueError(f"unsupported kind [{kind}], use float, int or Status")
+        encoded = key.encode()
+        if len(encoded) > KEY_BYTES:
+            raise ValueError(f"key is longer than {KEY_BYTES} bytes [{key}]")
+        if self.lock is not None:
+            self.lock.acquire()
+        try:
+            self._refresh()
+            slot = self._keys.get(key)
+            if slot is None:
+                slot = len(self)
+                if slot >= self.capacity:
+                    raise ValueError(f"shared blackboard is full [{self.capacity} keys]")
+                _ENTRY.pack_into(self.memory.buf, self._registry + slot * _ENTRY.size, encoded, code)
+                # publish the entry only once it is complete
+                self._words[_COUNT_WORD] = slot + 1
+                self._refresh()
+            elif self._kinds[slot] != code:
+                raise ValueError(f"'{key}' is already registered with another kind")
+        finally:
+            if self.lock is not None:
+                self.lock.release()
+        return slot
+
+    def slot(self, key: str) -> int:
+        """
+        Slot of a registered key.
+
+        Raises:
+            KeyError: if no process registered it
+        """
+        slot = self._keys.get(key)
+        if slot is None:
+            self._refresh()
+            slot = self._keys[key]
+        return slot
+
+    def keys(self) -> typing.List[str]:
+        """Every registered key, in slot order."""
+        self._refresh()
+        return sorted(self._keys, key=self._keys.__getitem__)
+
+    def write(self, slot: int, value: typing.Any) -> None:
+        """Set a slot's value, the kind decides how it's stored."""
+        if slot >= len(self._kinds):
+            self._refresh()
+        kind = self._kinds[slot]
+        words = self._words
+        index = self._base + slot * _SLOT_WORDS
+        sequence = words[index]
+        words[index] = sequence + 1
+        if kind == FLOAT:
+            self._floats[index + 1] = value
+        elif kind == STATUS:
+            words[index + 1] = CODES[value]
+        else:
+            words[index + 1] = value
+        words[index] = sequence + 2
+
+    def read(self, slot: int) -> typing.Any:
+        """
+        A slot's value, retrying while a write is in progress.
+
+        Slots that were never written read as ``0.0``, ``0`` and INVALID.
+        """
+        if slot >= len(self._kinds):
+            self._refresh()
+        kind = self._kinds[slot]
+        words = self._words
+        index = self._base + slot * _SLOT_WORDS
+        stuck, deadline = -1, 0.0
+        while True:
+            sequence = words[index]
+            if sequence & 1:
+                if sequence != stuck:
+                    stuck, deadline = sequence, time.monotonic() + self.stall_timeout
+                elif time.monotonic() > deadline:
+                    raise TimeoutError(
+                        f"slot {slot} has been mid-write for {self.stall_timeout}s, did its writer die? see repair()"
+                    )
+                continue
+            value = self._floats[index + 1] if kind == FLOAT else words[index + 1]
+            if words[index] == sequence:
+                break
+        return STATUSES[value] if kind == STATUS else value
+
+    def repair(self, slot: int) -> None:
+        """
+        Complete a write its writer never finished, e.g. because it died.
+
+        Readers of a slot left mid-write (an odd sequence counter) retry for
+        :attr:`stall_timeout` and then raise :class:`TimeoutError`. Once the
+        writer is known to be gone, this makes the slot readable again; the
+        value may be half written, so the new writer should rewrite it.
+        """
+        index = self._base + slot * _SLOT_WORDS
+        sequence = self._words[index]
+        if sequence & 1:
+            self._words[index] = sequence + 1
+
+    def version(self, slot: int) -> int:
+        """How many times the slot was written."""
+        return self._words[self._base + slot * _SLOT_WORDS] // 2
+
+    def read_many(self, slots: typing.Sequence[int]) -> typing.List[typing.Any]:
+        """Values of many slots, each one consistent on its own."""
+        read = self.read
+        return [read(slot) for slot in slots]
+
+    def write_many(self, slots: typing.Sequence[int], values: typing.Iterable[typing.Any]) -> None:
+        """Set many slots."""
+        write = self.write
+        for slot, value in zip(slots, values):
+            write(slot, value)
+
+    def close(self) -> None:
+        """Detach from the block, unlinking it if this process created it."""
+        self._words.release()
+        self._floats.release()
+        self.memory.close()
+        if self.owner:
+            _created.discard(self.memory.name)
+            try:
+                self.memory.unlink()
+            except FileNotFoundError:
+                # already unlinked elsewhere, only the tracker's record is left
+                _untrack(self.memory)
+
+    def __enter__(self) -> "SharedBlackboard":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+
+class StatusToShared(py_trees.decorators.Decorator):
+    """
+    :class:`~py_trees.decorators.StatusToBlackboard` for a :class:`SharedBlackboard`.
+
+    Args:
+        name: the decorator name
+        child: the child behaviour or subtree
+        variable_name: the key to write the child's status to
+        board: the shared blackboard
+    """
+
+    def __init__(
+        self,
+        name: str,
+        child: py_trees.behaviour.Behaviour,
+        variable_name: str,
+        board: SharedBlackboard,
+    ) -> None:
+        super().__init__(name=name, child=child)
+        self.variable_name = variable_name
+        self.board = board
+        self.slot = board.register(variable_name, py_trees.common.Status)
+
+    def update(self) -> py_trees.common.Status:
+        """
+        Reflect the decorated child's status to the shared blackboard.
+
+        Returns: the decorated child's status
+        """
+        self.board.write(self.slot, self.decorated.status)
+        return self.decorated.status
@@ -0,0 +1,429 @@
+"""
+Array-backed simulation of many agents that share one tree structure.
+
+:class:`MassSimulation` compiles the structure of a tree (typically the root
+returned by a demo's ``build_tree()``) into flat tables and keeps the runtime
+state of every agent in NumPy arrays, one row per node and one column per
+agent. A tick walks the compiled tree once, applying each node's status
+transition to all the agents that reach it with vectorised operations, so the
+Python-level cost per tick depends on the size of the tree, not the number of
+agents.
+
+Supported behaviours are the built-in composites (:class:`~py_trees.composites.Sequence`,
+:class:`~py_trees.composites.Selector`, :class:`~py_trees.composites.Parallel` with
+``SuccessOnAll`` / ``SuccessOnOne``), the status-mapping decorators plus
+``Condition``, ``Count``, ``Repeat`` and ``Retry``, the counter-based leaves in
+:mod:`pytree_stuff.behaviours` and py_trees' ``Success`` / ``Failure`` / ``Running``.
+Statuses match those of the object version tick for tick; feedback messages and
+decorator bookkeeping (e.g. ``Count``'s counters) are not simulated.
+
+Requires numpy (``uv sync --extra simulation``).
+"""
+
+import typing
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(
+        "pytree_stuff.simulation requires numpy, install it with `uv sync --extra simulation`"
+    ) from e
+
+import py_trees
+
+from . import behaviours
+
+INVALID, RUNNING, SUCCESS, FAILURE = 0, 1, 2, 3
+
+STATUSES = (
+    py_trees.common.Status.INVALID,
+    py_trees.common.Status.RUNNING,
+    py_trees.common.Status.SUCCESS,
+    py_trees.common.Status.FAILURE,
+)
+CODES = {status: code for code, status in enumerate(STATUSES)}
+
+# status remapping decorators, child status code -> decorator status code
+_MAPPINGS: typing.Dict[type, typing.Dict[int, int]] = {
+    py_trees.decorators.Inverter: {SUCCESS: FAILURE, FAILURE: SUCCESS},
+    py_trees.decorators.PassThrough: {},
+    py_trees.decorators.Count: {},
+    py_trees.decorators.SuccessIsFailure: {SUCCESS: FAILURE},
+    py_trees.decorators.FailureIsSuccess: {FAILURE: SUCCESS},
+    py_trees.decorators.SuccessIsRunning: {SUCCESS: RUNNING},
+    py_trees.decorators.FailureIsRunning: {FAILURE: RUNNING},
+    py_trees.decorators.RunningIsSuccess: {RUNNING: SUCCESS},
+    py_trees.decorators.RunningIsFailure: {RUNNING: FAILURE},
+}
+
+_CONSTANTS: typing.Dict[type, int] = {
+    py_trees.behaviours.Success: SUCCESS,
+    py_trees.behaviours.Failure: FAILURE,
+    py_trees.behaviours.Running: RUNNING,
+    behaviours.AlwaysRunning: RUNNING,
+}
+
+
+class _Node:
+    """Compiled description of a single behaviour."""
+
+    __slots__ = ("kind", "name", "children", "memory", "synchronise", "param", "outcome", "table")
+
+    def __init__(self, kind: str, name: str) -> None:
+        self.kind = kind
+        self.name = name
+        self.children: typing.List[int] = []
+        self.memory = False
+        self.synchronise = False
+        self.param = 0
+        self.outcome = INVALID
+        self.table: typing.Optional[np.ndarray] = None
+
+
+class MassSimulation:
+    """
+    Tick many copies of one tree structure together.
+
+    Args:
+        root: the root of the tree to replicate, it is only read, never ticked
+        agents: number of agents
+
+    Raises:
+        TypeError: if the tree contains a behaviour that can't be simulated
+    """
+
+    def __init__(self, root: py_trees.behaviour.Behaviour, agents: int) -> None:
+        self.agents = agents
+        self.nodes: typing.List[_Node] = []
+        self.behaviours: typing.List[py_trees.behaviour.Behaviour] = []
+        self._compile(root)
+        shape = (len(self.nodes), agents)
+        self.status = np.zeros(shape, dtype=np.int8)
+        self.counter = np.zeros(shape, dtype=np.int32)
+        self.current = np.full(shape, -1, dtype=np.int32)
+        # per agent leaf durations, overridable with set_ticks()
+        self.ticks = np.zeros(shape, dtype=np.int32)
+        for index, node in enumerate(self.nodes):
+            if node.kind == "delayed":
+                self.ticks[index] = node.param
+        self.count = 0
+
+    ##########################################################################
+    # Compilation
+    ##########################################################################
+
+    def _compile(self, behaviour: py_trees.behaviour.Behaviour) -> int:
+        index = len(self.nodes)
+        node = _Node(self._kind(behaviour), behaviour.name)
+        self.nodes.append(node)
+        self.behaviours.append(behaviour)
+        if node.kind in ("sequence", "selector"):
+            node.memory = behaviour.memory
+        elif node.kind == "parallel":
+            node.synchronise = getattr(behaviour.policy, "synchronise", False)
+        elif node.kind == "delayed":
+            node.param = behaviour.ticks
+            node.outcome = CODES[behaviour.outcome]
+        elif node.kind == "constant":
+            node.param = _CONSTANTS[type(behaviour)]
+        elif node.kind == "map":
+            table = np.arange(4, dtype=np.int8)
+            for source, target in _MAPPINGS[type(behaviour)].items():
+                table[source] = target
+            node.table = table
+        elif node.kind == "condition":
+            node.param = CODES[behaviour.succeed_status]
+        elif node.kind == "repeat":
+            node.param = behaviour.num_success
+        elif node.kind == "retry":
+            node.param = behaviour.num_failures
+        for child in behaviour.children:
+            node.children.append(self._compile(child))
+        return index
+
+    @staticmethod
+    def _kind(behaviour: py_trees.behaviour.Behaviour) -> str:
+        kind = type(behaviour)
+        if kind is py_trees.composites.Sequence:
+            return "sequence"
+        if kind is py_trees.composites.Selector:
+            return "selector"
+        if kind is py_trees.composites.Parallel:
+            if type(behaviour.policy) is py_trees.common.ParallelPolicy.SuccessOnAll:
+                return "parallel"
+            if type(behaviour.policy) is py_trees.common.ParallelPolicy.SuccessOnOne:
+                return "parallel_one"
+        if kind in _MAPPINGS:
+            return "map"
+        if kind is py_trees.decorators.Condition:
+            return "condition"
+        if kind is py_trees.decorators.Repeat:
+            return "repeat"
+        if kind is py_trees.decorators.Retry:
+            return "retry"
+        if kind in _CONSTANTS:
+            return "constant"
+        if isinstance(behaviour, behaviours.Delayed):
+            return "delayed"
+        raise TypeError(
+            f"can't simulate {kind.__module__}.{kind.__qualname__} [{behaviour.name}]"
+        )
+
+    ##########################################################################
+    # Public API
+    ##########################################################################
+
+    def index(self, name: str) -> int:
+        """Index of the first node called ``name``."""
+        for index, node in enumerate(self.nodes):
+            if node.name == name:
+                return index
+        raise KeyError(name)
+
+    def set_ticks(self, node: typing.Union[int, str], ticks: typing.Any) -> None:
+        """
+        Give every agent its own duration for a counter-based leaf.
+
+        Args:
+            node: index or name of a :class:`~pytree_stuff.behaviours.Delayed` leaf
+            ticks: scalar or array of shape ``(agents,)``
+        """
+        index = self.index(node) if isinstance(node, str) else node
+        if self.nodes[index].kind != "delayed":
+            raise TypeError(f"'{self.nodes[index].name}' is not a counter based leaf")
+        self.ticks[index] = ticks
+
+    def tick(self, agents: typing.Optional[np.ndarray] = None) -> None:
+        """
+        Tick the root once for every agent, or only for a boolean mask of agents.
+
+        Args:
+            agents: boolean mask of shape ``(agents,)``, all agents if None
+        """
+        mask = np.ones(self.agents, dtype=bool) if agents is None else agents
+        self._tick(0, mask)
+        self.count += 1
+
+    @property
+    def root_status(self) -> np.ndarray:
+        """Status codes of every agent's root, see :data:`STATUSES`."""
+        return self.status[0]
+
+    def statuses(self, agent: int) -> typing.List[py_trees.common.Status]:
+        """Status of every node for one agent, in pre-order."""
+        return [STATUSES[code] for code in self.status[:, agent]]
+
+    ##########################################################################
+    # Ticking
+    ##########################################################################
+
+    def _tick(self, index: int, mask: np.ndarray) -> None:
+        if not mask.any():
+            return
+        node = self.nodes[index]
+        getattr(self, "_tick_" + node.kind)(index, node, mask)
+
+    def _tick_constant(self, index: int, node: _Node, mask: np.ndarray) -> None:
+        self.status[index][mask] = node.param
+
+    def _tick_delayed(self, index: int, node: _Node, mask: np.ndarray) -> None:
+        status, counter = self.status[index], self.counter[index]
+        counter[mask & (status != RUNNING)] = 0
+        counter[mask] += 1
+        finished = counter >= self.ticks[index]
+        status[mask & finished] = node.outcome
+        status[mask & ~finished] = RUNNING
+
+    def _tick_sequence(self, index: int, node: _Node, mask: np.ndarray) -> None:
+        status, current = self.status[index], self.current[index]
+        restart = mask & (status != RUNNING)
+        current[restart] = 0
+        for child in node.children:
+            self._stop(child, restart & (self.status[child] != INVALID), INVALID)
+        if node.memory:
+            start = np.where(restart, 0, current)
+        else:
+            start = np.zeros(self.agents, dtype=np.int32)
+            current[mask] = 0
+        alive = mask.copy()
+        last = len(node.children) - 1
+        for position, child in enumerate(node.children):
+            ticking = alive & (start <= position)
+            self._tick(child, ticking)
+            result = self.status[child]
+            halted = ticking & (result != SUCCESS)
+            status[halted] = result[halted]
+            if not node.memory:
+                for later in node.children[position + 1:]:
+                    self._stop(later, halted & (self.status[later] != INVALID), INVALID)
+            alive &= ~halted
+            if position < last:
+                current[ticking & ~halted] = position + 1
+        self._stop(index, alive, SUCCESS)
+
+    def _tick_selector(self, index: int, node: _Node, mask: np.ndarray) -> None:
+        status, current = self.status[index], self.current[index]
+        current[mask & (status != RUNNING)] = 0
+        if node.memory:
+            start = np.where(mask, current, 0)
+            for position, child in enumerate(node.children):
+                self._stop(child, mask & (position < start), INVALID)
+        else:
+            start = np.zeros(self.agents, dtype=np.int32)
+        previous = current.copy()
+        alive = mask.copy()
+        for position, child in enumerate(node.children):
+            ticking = alive & (start <= position)
+            self._tick(child, ticking)
+            result = self.status[child]
+            chosen = ticking & ((result == RUNNING) | (result == SUCCESS))
+            status[chosen] = result[chosen]
+            current[chosen] = position
+            switched = chosen & (previous != position)
+            for later in node.children[position + 1:]:
+                self._stop(later, switched & (self.status[later] != INVALID), INVALID)
+            alive &= ~chosen
+        status[alive] = FAILURE
+        current[alive] = len(node.children) - 1
+
+    def _tick_parallel(self, index: int, node: _Node, mask: np.ndarray) -> None:
+        status = self.status[index]
+        restart = mask & (status != RUNNING)
+        for child in node.children:
+            self._stop(child, restart & (self.status[child] != INVALID), INVALID)
+        for child in node.children:
+            if node.synchronise:
+                self._tick(child, mask & (self.status[child] != SUCCESS))
+            else:
+                self._tick(child, mask)
+        children = self.status[node.children]
+        failed = mask & (children == FAILURE).any(axis=0)
+        if node.kind == "parallel":
+            succeeded = mask & ~failed & (children == SUCCESS).all(axis=0)
+        else:
+            succeeded = mask & ~failed & (children == SUCCESS).any(axis=0)
+        status[mask] = RUNNING
+        self._stop(index, failed, FAILURE)
+        self._stop(index, succeeded, SUCCESS)
+
+    _tick_parallel_one = _tick_parallel
+
+    def _tick_decorator(self, index: int, mask: np.ndarray, new: np.ndarray) -> None:
+        status = self.status[index]
+        status[mask] = RUNNING
+        self._stop(index, mask & (new == SUCCESS), SUCCESS)
+        self._stop(index, mask & (new == FAILURE), FAILURE)
+
+    def _tick_map(self, index: int, node: _Node, mask: np.ndarray) -> None:
+        child = node.children[0]
+        self._tick(child, mask)
+        self._tick_decorator(index, mask, node.table[self.status[child]])
+
+    def _tick_condition(self, index: int, node: _Node, mask: np.ndarray) -> None:
+        child = node.children[0]
+        self._tick(child, mask)
+        new = np.where(self.status[child] == node.param, SUCCESS, RUNNING)
+        self._tick_decorator(index, mask, new)
+
+    def _tick_repeat(self, index: int, node: _Node, mask: np.ndarray) -> None:
+        counter = self.counter[index]
+        counter[mask & (self.status[index] != RUNNING)] = 0
+        child = node.children[0]
+        self._tick(child, mask)
+        result = self.status[child]
+        counter[mask & (result == SUCCESS)] += 1
+        new = np.where(
+            result == FAILURE,
+            FAILURE,
+            np.where((result == SUCCESS) & (counter == node.param), SUCCESS, RUNNING),
+        )
+        self._tick_decorator(index, mask, new)
+
+    def _tick_retry(self, index: int, node: _Node, mask: np.ndarray) -> None:
+        counter = self.counter[index]
+        counter[mask & (self.status[index] != RUNNING)] = 0
+        child = node.children[0]
+        self._tick(child, mask)
+        result = self.status[child]
+        counter[mask & (result == FAILURE)] += 1
+        new = np.where(
+            result == FAILURE,
+            np.where(counter < node.param, RUNNING, FAILURE),
+            result,
+        )
+        self._tick_decorator(index, mask, new)
+
+    ##########################################################################
+    # Stopping
+    ##########################################################################
+
+    def _stop(self, index: int, mask: np.ndarray, new: int) -> None:
+        """Mirror of the behaviour/composite/decorator ``stop()`` methods."""
+        if not mask.any():
+            return
+        node = self.nodes[index]
+        if node.kind in ("sequence", "selector", "parallel", "parallel_one"):
+            if node.kind.startswith("parallel"):
+                for child in node.children:
+                    self._stop(child, mask & (self.status[child] == RUNNING), INVALID)
+            if new == INVALID:
+                self.current[index][mask] = -1
+                for child in node.children:
+                    self._stop(child, mask & (self.status[child] != INVALID), INVALID)
+        elif node.children:
+            child = node.children[0]
+            if new == INVALID:
+                self._stop(child, mask, INVALID)
+            self._stop(child, mask & (self.status[child] == RUNNING), INVALID)
+        self.status[index][mask] = new
+
+
+def compare_with_objects(
+    factory: typing.Callable[[], py_trees.behaviour.Behaviour],
+    agents: int = 64,
+    ticks: int = 50,
+    seed: int = 0,
+) -> int:
+    """
+    Tick the simulation and one object tree per agent side by side.
+
+    Every counter-based leaf gets a random per-agent duration and every agent
+    skips random ticks, so agents' paths through the tree diverge.
+
+    Args:
+        factory: builds the tree, e.g. a demo's ``build_tree``
+        agents: number of agents
+        ticks: number of ticks
+        seed: random seed
+
+    Returns:
+        the number of (tick, agent, node) statuses that differ
+    """
+    rng = np.random.default_rng(seed)
+    simulation = MassSimulation(factory(), agents)
+    trees = [py_trees.trees.BehaviourTree(root=factory()) for _ in range(agents)]
+    for index, node in enumerate(simulation.nodes):
+        if node.kind == "delayed":
+            durations = rng.integers(1, 6, size=agents)
+            simulation.set_ticks(index, durations)
+            for agent, tree in enumerate(trees):
+                _preorder(tree.root)[index].ticks = int(durations[agent])
+    mismatches = 0
+    for _ in range(ticks):
+        active = rng.random(agents) < 0.8
+        simulation.tick(active)
+        for agent, tree in enumerate(trees):
+            if active[agent]:
+                tree.tick()
+            expected = [b.status for b in _preorder(tree.root)]
+            mismatches += sum(
+                1 for a, b in zip(expected, simulation.statuses(agent)) if a != b
+            )
+    return mismatches
+
+
+def _preorder(root: py_trees.behaviour.Behaviour) -> typing.List[py_trees.behaviour.Behaviour]:
+    nodes = [root]
+    for child in root.children:
+        nodes.extend(_preorder(child))
+    return nodes
@@ -0,0 +1,239 @@
+"""Drift-free, fixed-rate tick scheduling for behaviour trees."""
+
+import collections
+import enum
+import math
+import time
+import typing
+
+import py_trees
+
+from . import clock as clock_module
+from . import timers as timers_module
+
+
+class OverrunPolicy(enum.Enum):
+    """What to do with tick slots that were missed because a tick overran."""
+
+    CATCH_UP = "catch_up"
+    """Keep every slot, ticking back-to-back until the schedule is caught up."""
+    SKIP = "skip"
+    """Drop the missed slots and realign with the next slot on the rate grid."""
+
+
+class TickStatistics:
+    """
+    Deadline and jitter bookkeeping for a :class:`TickRunner`.
+
+    Latency is the time spent inside ``tree.tick()``, jitter is how late a
+    tick started relative to its scheduled slot. Only the most recent
+    ``history`` samples are kept so memory stays constant on long runs.
+
+    Args:
+        history: number of recent samples used for the percentiles
+    """
+
+    def __init__(self, history: int = 4096) -> None:
+        self.ticks = 0
+        self.deadline_misses = 0
+        self.skipped_slots = 0
+        self.latencies: typing.Deque[float] = collections.deque(maxlen=history)
+        self.jitters: typing.Deque[float] = collections.deque(maxlen=history)
+
+    def record(self, latency: float, jitter: float, missed: bool) -> None:
+        """Record a single tick (all times in seconds)."""
+        self.ticks += 1
+        self.latencies.append(latency)
+        self.jitters.append(jitter)
+        if missed:
+            self.deadline_misses += 1
+
+    @staticmethod
+    def percentile(samples: typing.Iterable[float], percent: float) -> float:
+        """Nearest-rank percentile of ``samples``, 0.0 if there are none."""
+        ordered = sorted(samples)
+        if not ordered:
+            return 0.0
+        rank = max(0, math.ceil(percent / 100.0 * len(ordered)) - 1)
+        return ordered[rank]
+
+    @property
+    def latency_p50(self) -> float:
+        return self.percentile(self.latencies, 50)
+
+    @property
+    def latency_p99(self) -> float:
+        return self.percentile(self.latencies, 99)
+
+    @property
+    def jitter_p50(self) -> float:
+        return self.percentile(self.jitters, 50)
+
+    @property
+    def jitter_p99(self) -> float:
+        return self.percentile(self.jitters, 99)
+
+    def summary(self) -> str:
+        """One line, human readable summary of the collected statistics."""
+        return (
+            f"ticks={self.ticks} deadline_misses={self.deadline_misses} "
+            f"skipped_slots={self.skipped_slots} "
+            f"latency p50={self.latency_p50 * 1e3:.3f}ms p99={self.latency_p99 * 1e3:.3f}ms "
+            f"jitter p50={self.jitter_p50 * 1e3:.3f}ms p99={self.jitter_p99 * 1e3:.3f}ms"
+        )
+
+
+class TickRunner:
+    """
+    Tick a behaviour tree at a fixed rate without accumulating drift.
+
+    Tick slots are computed as ``start + n * period`` rather than by adding
+    the period to the previous deadline, so rounding and sleep overshoot never
+    accumulate. A tick whose latency exceeds ``budget`` counts as a deadline
+    miss, and the ``policy`` decides what happens to any slots that passed
+    while it was running.
+
+    Args:
+        tree: the behaviour tree to tick
+        rate_hz: ticks per second
+        policy: how to treat slots missed after an overrun
+        budget: allowed tick latency in seconds, defaults to one period
+        history: number of samples kept for the latency/jitter percentiles
+        clock: a :class:`~pytree_stuff.clock.Clock` (providing ``sleep`` too) or
+            a monotonic time source in seconds, defaults to
+            :func:`~pytree_stuff.clock.default_clock`
+        sleep: function used to wait for the next slot, defaults to the
+            clock's, or :func:`time.sleep` for a plain time source
+        timers: the :class:`~pytree_stuff.timers.TimerWheel` to advance before
+            every tick, defaults to :func:`~pytree_stuff.timers.default_wheel`
+
+    Raises:
+        ValueError: if the rate is not positive
+    """
+
+    def __init__(
+        self,
+        tree: py_trees.trees.BehaviourTree,
+        rate_hz: float = 1.0,
+        policy: OverrunPolicy = OverrunPolicy.SKIP,
+        budget: typing.Optional[float] = None,
+        history: int = 4096,
+        clock: typing.Union[clock_module.Clock, typing.Callable[[], float], None] = None,
+        sleep: typing.Optional[typing.Callable[[float], None]] = None,
+        timers: typing.Optional[timers_module.TimerWheel] = None,
+    ) -> None:
+        if rate_hz <= 0:
+            raise ValueError(f"rate_hz must be positive [{rate_hz}]")
+        self.tree = tree
+        self.period = 1.0 / rate_hz
+        self.policy = policy
+        self.budget = self.period if budget is None else budget
+        self.statistics = TickStatistics(history=history)
+        if clock is None:
+            clock = clock_module.default_clock()
+        if isinstance(clock, clock_module.Clock):
+            self.clock = clock.now
+            self.sleep = sleep if sleep is not None else clock.sleep
+            self.virtual = clock.virtual
+        else:
+            self.clock = clock
+            self.sleep = sleep if sleep is not None else time.sleep
+            self.virtual = False
+        self.timers = timers if timers is not None else timers_module.default_wheel()
+        self._start: typing.Optional[float] = None
+        self._slot = 0
+        self._interrupted = False
+
+    @property
+    def next_tick_time(self) -> float:
+        """Scheduled start time of the next tick."""
+        if self._start is None:
+            return self.clock()
+        return self._start + self._slot * self.period
+
+    def interrupt(self) -> None:
+        """Stop :meth:`run` after the tick currently in progress."""
+        self._interrupted = True
+
+    def tick_once(
+        self,
+        pre_tick_handler: typing.Optional[
+            typing.Callable[[py_trees.trees.BehaviourTree], None]
+        ] = None,
+        post_tick_handler: typing.Optional[
+            typing.Callable[[py_trees.trees.BehaviourTree], None]
+        ] = None,
+    ) -> None:
+        """Wait for the next slot, tick the tree and advance the schedule."""
+        scheduled, delay = self._schedule()
+        if delay > 0:
+            self.sleep(delay)
+        started = self.clock()
+        self.timers.advance()
+        self.tree.tick(pre_tick_handler, post_tick_handler)
+        self._advance(scheduled, started, self.clock())
+
+    def _schedule(self) -> typing.Tuple[float, float]:
+        """The next slot and how long to wait for it."""
+        now = self.clock()
+        if self._start is None:
+            self._start = now
+            self._slot = 0
+        scheduled = self._start + self._slot * self.period
+        return scheduled, scheduled - now
+
+    def _advance(self, scheduled: float, started: float, finished: float) -> None:
+        """Record a tick and move the schedule on to the next slot."""
+        assert self._start is not None
+        latency = finished - started
+        self.statistics.record(
+            latency=latency,
+            jitter=max(0.0, started - scheduled),
+            missed=latency > self.budget,
+        )
+        self._slot += 1
+        if self.policy is OverrunPolicy.SKIP:
+            behind = math.floor((finished - self._start) / self.period) + 1 - self._slot
+            if behind > 0:
+                self.statistics.skipped_slots += behind
+                self._slot += behind
+
+    def run(
+        self,
+        number_of_ticks: typing.Optional[int] = None,
+        stop_on_terminal_state: bool = True,
+        pre_tick_handler: typing.Optional[
+            typing.Callable[[py_trees.trees.BehaviourTree], None]
+        ] = None,
+        post_tick_handler: typing.Optional[
+            typing.Callable[[py_trees.trees.BehaviourTree], None]
+        ] = None,
+    ) -> TickStatistics:
+        """
+        Tick repeatedly on the fixed-rate schedule.
+
+        Args:
+            number_of_ticks: stop after this many ticks, run forever if None
+            stop_on_terminal_state: stop once the root is no longer RUNNING
+            pre_tick_handler: function to execute before each tick
+            post_tick_handler: function to execute after each tick
+
+        Returns:
+            the runner's accumulated statistics
+        """
+        self._interrupted = False
+        ticks = 0
+        try:
+            while not self._interrupted and (
+                number_of_ticks is None or ticks < number_of_ticks
+            ):
+                self.tick_once(pre_tick_handler, post_tick_handler)
+                ticks += 1
+                if (
+                    stop_on_terminal_state
+                    and self.tree.root.status != py_trees.common.Status.RUNNING
+                ):
+                    break
+        except KeyboardInterrupt:
+            pass
+        return self.statistics
@@ -0,0 +1,256 @@
+"""
+Timeouts expired by a hierarchical timer wheel.
+
+:class:`py_trees.decorators.Timeout` reads the clock and formats a feedback
+message inside every decorator, every tick. Here the deadlines live in one
+:class:`TimerWheel` that the :class:`~pytree_stuff.ticking.TickRunner`
+advances once before each tick: arming, cancelling and expiring a timer are
+O(1) and advancing costs the same however many timers are armed, so a
+:class:`Timeout` only checks a flag set by its timer.
+
+A wheel counts either seconds (in steps of ``resolution``) or ticks, the
+latter letting simulations time out deterministically however fast they run:
+
+.. code-block:: python
+
+   wheel = timers.TimerWheel(ticks=True)
+   guarded = timers.Timeout("Timeout After 3 Ticks", child=task, duration=3, wheel=wheel)
+   runner = ticking.TickRunner(tree, rate_hz=1000.0, timers=wheel)
+
+Timeouts use :func:`default_wheel` (seconds) unless given one, and runners
+advance it unless given another. Trees ticked without a runner can advance
+a wheel with ``tree.add_pre_tick_handler(wheel)``.
+"""
+
+import math
+import typing
+
+import py_trees
+
+from . import clock as clock_module
+
+Status = py_trees.common.Status
+
+BITS = 8
+SLOTS = 1 << BITS
+MASK = SLOTS - 1
+LEVELS = 4
+
+
+class Timer:
+    """An armed timer, see :meth:`TimerWheel.schedule`."""
+
+    __slots__ = ("deadline", "callback", "bucket")
+
+    def __init__(self, deadline: int, callback: typing.Callable[[], None]) -> None:
+        self.deadline = deadline
+        self.callback = callback
+        self.bucket: typing.Optional[typing.Dict["Timer", None]] = None
+
+    @property
+    def active(self) -> bool:
+        """Whether it is still armed."""
+        return self.bucket is not None
+
+
+class TimerWheel:
+    """
+    A hierarchical timer wheel: ``LEVELS`` wheels of ``SLOTS`` buckets each.
+
+    A timer goes in the lowest level whose span covers its deadline and
+    cascades down a level each time the level below completes a turn, so
+    timers due beyond the last level's span are re-filed until they are.
+
+    Args:
+        resolution: seconds per step, when counting seconds
+        clock: a :class:`~pytree_stuff.clock.Clock` or time source, when
+            counting seconds; defaults to following
+            :func:`~pytree_stuff.clock.default_clock`
+        ticks: count ticks (one step per :meth:`advance`) instead of seconds
+    """
+
+    def __init__(
+        self,
+        resolution: float = 0.01,
+        clock: typing.Union[clock_module.Clock, typing.Callable[[], float], None] = None,
+        ticks: bool = False,
+    ) -> None:
+        if resolution <= 0:
+            raise ValueError(f"resolution must be positive [{resolution}]")
+        self.resolution = resolution
+        self.clock = clock_module.resolve(clock)
+        self.ticks = ticks
+        self.wheels: typing.List[typing.List[typing.Dict[Timer, None]]] = [
+            [{} for _ in range(SLOTS)] for _ in range(LEVELS)
+        ]
+        self.armed = 0
+        self.expired = 0
+        self.now = 0 if ticks else self._steps()
+
+    def _steps(self) -> int:
+        return math.floor(self.clock() / self.resolution)
+
+    def __len__(self) -> int:
+        return self.armed
+
+    def schedule(self, delay: float, callback: typing.Callable[[], None]) -> Timer:
+        """
+        Call ``callback`` from the first :meth:`advance` at least ``delay`` later.
+
+        Args:
+            delay: seconds, or ticks for a tick counting wheel
+            callback: called without arguments when the timer expires
+
+        Returns:
+            the timer, for :meth:`cancel`
+        """
+        if self.ticks:
+            start, steps = self.now, int(delay)
+        else:
+            start, steps = self._steps(), math.ceil(delay / self.resolution)
+            if not self.armed:
+                # nothing to expire on the way, catch up with the clock (or a new one)
+                self.now = start
+        timer = Timer(max(start, self.now) + max(1, steps), callback)
+        self._file(timer)
+        self.armed += 1
+        return timer
+
+    def cancel(self, timer: Timer) -> None:
+        """Disarm a timer, a no-op if it expired or was already cancelled."""
+        if timer.bucket is not None:
+            del timer.bucket[timer]
+            timer.bucket = None
+            self.armed -= 1
+
+    def _file(self, timer: Timer) -> None:
+        delta = timer.deadline - self.now
+        level = 0
+        while level < LEVELS - 1 and delta >= SLOTS << (BITS * level):
+            level += 1
+        # beyond the last level's span: park it a turn ahead, it is re-filed then
+        deadline = min(timer.deadline, self.now + (MASK << (BITS * level)))
+        bucket = self.wheels[level][(deadline >> (BITS * level)) & MASK]
+        bucket[timer] = None
+        timer.bucket = bucket
+
+    def advance(self, steps: typing.Optional[int] = None) -> int:
+        """
+        Move the wheel on, expiring due timers.
+
+        Args:
+            steps: how far; by default one for a tick counting wheel, or up
+                to the clock's current time
+
+        Returns:
+            the number of timers that expired
+        """
+        if steps is None:
+            steps = 1 if self.ticks else self._steps() - self.now
+        target = self.now + steps
+        expired = 0
+        while self.now < target:
+            if not self.armed:
+                self.now = target
+                break
+            now = self.now = self._next(target)
+            level = 0
+            # a completed turn moves the next level's current bucket down
+            while level < LEVELS - 1 and (now >> (BITS * level)) & MASK == 0:
+                level += 1
+                bucket = self.wheels[level][(now >> (BITS * level)) & MASK]
+                if bucket:
+                    self.wheels[level][(now >> (BITS * level)) & MASK] = {}
+                    for timer in bucket:
+                        self._file(timer)
+            bucket = self.wheels[0][now & MASK]
+            if bucket:
+                self.wheels[0][now & MASK] = {}
+                for timer in list(bucket):
+                    if timer.bucket is not bucket:
+                        continue  # cancelled by an earlier callback
+                    timer.bucket = None
+                    self.armed -= 1
+                    expired += 1
+                    timer.callback()
+        self.expired += expired
+        return expired
+
+    def _next(self, target: int) -> int:
+        """The first step up to ``target`` with a bucket to cascade or expire."""
+        best = target
+        for level, wheel in enumerate(self.wheels):
+            shift = BITS * level
+            turn = self.now >> shift
+            for ahead in range(1, SLOTS + 1):
+                step = (turn + ahead) << shift
+                if step >= best:
+                    break
+                if wheel[(turn + ahead) & MASK]:
+                    best = step
+                    break
+        return best
+
+    def __call__(self, tree: typing.Any = None) -> None:
+        """Advance, for use as a pre tick handler."""
+        self.advance()
+
+
+_default_wheel: typing.Optional[TimerWheel] = None
+
+
+def default_wheel() -> TimerWheel:
+    """The seconds counting wheel shared by timeouts and runners not given one."""
+    global _default_wheel
+    if _default_wheel is None:
+        _default_wheel = TimerWheel()
+    return _default_wheel
+
+
+class Timeout(py_trees.decorators.Decorator):
+    """
+    :class:`py_trees.decorators.Timeout` with its deadline on a :class:`TimerWheel`.
+
+    Arms a timer when the child starts and fails, stopping the child, on the
+    first tick after it expires with the child still RUNNING.
+
+    Args:
+        name: the decorator name
+        child: the child behaviour or subtree
+        duration: seconds, or ticks for a tick counting wheel
+        wheel: defaults to :func:`default_wheel`
+    """
+
+    def __init__(
+        self,
+        name: str,
+        child: py_trees.behaviour.Behaviour,
+        duration: float = 5.0,
+        wheel: typing.Optional[TimerWheel] = None,
+    ) -> None:
+        super().__init__(name=name, child=child)
+        self.duration = duration
+        self.wheel = wheel if wheel is not None else default_wheel()
+        self.timer: typing.Optional[Timer] = None
+        self.timed_out = False
+
+    def _expire(self) -> None:
+        self.timed_out = True
+
+    def initialise(self) -> None:
+        self.timed_out = False
+        self.feedback_message = ""
+        self.timer = self.wheel.schedule(self.duration, self._expire)
+
+    def update(self) -> Status:
+        status = self.decorated.status
+        if status == Status.RUNNING and self.timed_out:
+            self.feedback_message = "timed out"
+            self.decorated.stop(Status.INVALID)
+            return Status.FAILURE
+        return status
+
+    def terminate(self, new_status: Status) -> None:
+        if self.timer is not None:
+            self.wheel.cancel(self.timer)
+            self.timer = None
@@ -0,0 +1,330 @@
+"""
+Binary tick traces and their replay.
+
+:class:`TraceRecorder` appends one fixed width record per tick to a
+memory-mapped file - the tick number, a timestamp and one status byte per
+node, in the tree's pre-order - so recording costs a handful of bytes per
+node and memory stays constant however long the tree runs. The file grows in
+chunks and is trimmed to the last record when the recorder closes.
+
+:class:`TraceReader` maps a trace back in and replays any range of ticks as
+the same status view the demos print, without running a single behaviour:
+
+.. code-block:: bash
+
+   uv run python Decorators/Retry_Demo.py --trace retry.trace
+   uv run python -m pytree_stuff.trace retry.trace --start 3 --end 5
+   uv run python -m pytree_stuff.trace retry.trace --demo Decorators/Retry_Demo.py
+
+File layout (little endian): a 32 byte header (magic, format version, node
+count, record size, record count, metadata size), JSON metadata describing
+the nodes, padding to 8 bytes, then the records. Each record is a ``uint64``
+tick, a ``float64`` :func:`time.time` timestamp and the status bytes, padded
+to 8 bytes.
+"""
+
+import argparse
+import json
+import mmap
+import struct
+import sys
+import time
+import typing
+from pathlib import Path
+
+import py_trees
+
+from . import rendering
+
+MAGIC = b"PYTTRACE"
+VERSION = 1
+
+STATUSES = (
+    py_trees.common.Status.INVALID,
+    py_trees.common.Status.RUNNING,
+    py_trees.common.Status.SUCCESS,
+    py_trees.common.Status.FAILURE,
+)
+CODES = {status: code for code, status in enumerate(STATUSES)}
+
+_HEADER = struct.Struct("<8sIIIQI")  # magic, version, nodes, record size, records, metadata size
+_HEADER_SIZE = _HEADER.size
+_RECORDS_OFFSET = struct.calcsize("<8sIII")
+_RECORD = struct.Struct("<Qd")
+
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+
+class TraceRecorder:
+    """
+    Record the status of every node, every tick, to a memory-mapped file.
+
+    Instances are callables suitable for use as a post tick handler:
+
+    .. code-block:: python
+
+       recorder = TraceRecorder(tree.root, "demo.trace")
+       tree.add_post_tick_handler(recorder)
+       ...
+       recorder.close()
+
+    Args:
+        root: root of the tree to record, its structure must not change
+        path: the trace file, overwritten if it exists
+        chunk_records: how many records to grow the file by at a time
+    """
+
+    def __init__(
+        self,
+        root: py_trees.behaviour.Behaviour,
+        path: typing.Union[str, Path],
+        chunk_records: int = 65536,
+    ) -> None:
+        self.root = root
+        self.path = Path(path)
+        depths = list(_depths(root))
+        self.nodes = [node for _, node in depths]
+        self.records = 0
+        self.chunk_records = chunk_records
+        metadata = json.dumps(
+            {
+                "structure": rendering.structure_hash(root),
+                "nodes": [[depth, node.name, type(node).__qualname__] for depth, node in depths],
+            }
+        ).encode()
+        self.record_size = _align(_RECORD.size + len(self.nodes))
+        self.offset = _align(_HEADER_SIZE + len(metadata))
+        self._file = open(self.path, "w+b")
+        self._file.write(
+            _HEADER.pack(MAGIC, VERSION, len(self.nodes), self.record_size, 0, len(metadata))
+        )
+        self._file.write(metadata)
+        self._file.flush()
+        self._header = mmap.mmap(self._file.fileno(), _HEADER_SIZE)
+        # only a window of chunk_records records is mapped at any time
+        self._map: typing.Optional[mmap.mmap] = None
+        self._window = 0
+        self._capacity = 0
+        self._grow()
+
+    def _grow(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        start = self.offset + self.records * self.record_size
+        self._window = start - start % mmap.ALLOCATIONGRANULARITY
+        self._capacity = self.records + self.chunk_records
+        end = self.offset + self._capacity * self.record_size
+        self._file.truncate(end)
+        self._map = mmap.mmap(self._file.fileno(), end - self._window, offset=self._window)
+
+    def __call__(self, tree: py_trees.trees.BehaviourTree) -> None:
+        """Record the tick that just finished."""
+        self.record(tree.count + 1)
+
+    def record(self, tick: int, timestamp: typing.Optional[float] = None) -> None:
+        """
+        Append a record of the tree's current statuses.
+
+        Args:
+            tick: the tick number, expected to increase from record to record
+            timestamp: seconds since the epoch, defaults to now
+        """
+        if self.records == self._capacity:
+            self._grow()
+        assert self._map is not None
+        start = self.offset + self.records * self.record_size - self._window
+        _RECORD.pack_into(self._map, start, tick, time.time() if timestamp is None else timestamp)
+        start += _RECORD.size
+        self._map[start:start + len(self.nodes)] = bytes([CODES[node.status] for node in self.nodes])
+        self.records += 1
+        # readers trust the count, so only publish complete records
+        struct.pack_into("<Q", self._header, _RECORDS_OFFSET, self.records)
+
+    def close(self) -> None:
+        """Trim the file to the recorded ticks and close it."""
+        if self._map is None:
+            return
+        self._map.flush()
+        self._map.close()
+        self._map = None
+        self._header.flush()
+        self._header.close()
+        self._file.truncate(self.offset + self.records * self.record_size)
+        self._file.close()
+
+    def __enter__(self) -> "TraceRecorder":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+
+class TraceReader:
+    """
+    Read a trace written by :class:`TraceRecorder`.
+
+    Args:
+        path: the trace file
+
+    Raises:
+        ValueError: if the file is not a trace
+    """
+
+    def __init__(self, path: typing.Union[str, Path]) -> None:
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, nodes, record_size, records, metadata_size = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"not a version {VERSION} tick trace [{path}]")
+        metadata = json.loads(self._map[_HEADER_SIZE:_HEADER_SIZE + metadata_size])
+        self.structure: str = metadata["structure"]
+        self.nodes: typing.List[typing.Tuple[int, str, str]] = [tuple(node) for node in metadata["nodes"]]
+        self.record_size = record_size
+        self.records = records
+        self.offset = _align(_HEADER_SIZE + metadata_size)
+        assert nodes == len(self.nodes)
+
+    def __len__(self) -> int:
+        return self.records
+
+    def tick(self, index: int) -> int:
+        """Tick number of the ``index``'th record."""
+        return _RECORD.unpack_from(self._map, self.offset + index * self.record_size)[0]
+
+    def read(self, index: int) -> typing.Tuple[int, float, typing.List[py_trees.common.Status]]:
+        """The tick, timestamp and node statuses of the ``index``'th record."""
+        start = self.offset + index * self.record_size
+        tick, timestamp = _RECORD.unpack_from(self._map, start)
+        start += _RECORD.size
+        return tick, timestamp, [STATUSES[code] for code in self._map[start:start + len(self.nodes)]]
+
+    def find(self, tick: int) -> int:
+        """Index of the first record at or after ``tick`` (binary search)."""
+        low, high = 0, self.records
+        while low < high:
+            middle = (low + high) // 2
+            if self.tick(middle) < tick:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def iterate(
+        self, start: typing.Optional[int] = None, end: typing.Optional[int] = None
+    ) -> typing.Iterator[typing.Tuple[int, float, typing.List[py_trees.common.Status]]]:
+        """Records with ``start <= tick <= end``, either bound may be None."""
+        index = 0 if start is None else self.find(start)
+        while index < self.records:
+            record = self.read(index)
+            if end is not None and record[0] > end:
+                return
+            yield record
+            index += 1
+
+    def replay(
+        self,
+        start: typing.Optional[int] = None,
+        end: typing.Optional[int] = None,
+        root: typing.Optional[py_trees.behaviour.Behaviour] = None,
+        changes: bool = False,
+    ) -> typing.Iterator[str]:
+        """
+        Frames showing the recorded statuses, one per tick.
+
+        Feedback messages aren't recorded, so none are shown.
+
+        Args:
+            start: first tick, defaults to the first recorded tick
+            end: last tick, defaults to the last recorded tick
+            root: a freshly built copy of the recorded tree; if given, its
+                statuses are overwritten and frames come from
+                :func:`py_trees.display.ascii_tree`, exactly as the demos
+                print them, otherwise from the recorded node names
+            changes: only list the nodes whose status changed, like
+                ``--display changes``
+
+        Raises:
+            ValueError: if ``root`` doesn't have the recorded structure
+        """
+        nodes = None
+        if root is not None:
+            if rendering.structure_hash(root) != self.structure:
+                raise ValueError("the tree doesn't match the recorded structure")
+            nodes = [node for _, node in _depths(root)]
+        symbols = py_trees.display.ascii_symbols
+        prefixes = ["    " * depth + name.replace("\n", " ") + " [" for depth, name, _ in self.nodes]
+        last = [py_trees.common.Status.INVALID] * len(self.nodes)
+        for tick, _, statuses in self.iterate(start, end):
+            if changes:
+                lines = [
+                    f"[{tick}] {prefixes[index]}{symbols[status]}]\n"
+                    for index, status in enumerate(statuses)
+                    if status is not last[index]
+                ]
+                last = list(statuses)
+                if lines:
+                    yield "".join(lines)
+                continue
+            if nodes is not None:
+                for node, status in zip(nodes, statuses):
+                    node.status = status
+                    node.feedback_message = ""
+                body = py_trees.display.ascii_tree(root, show_status=True)
+            else:
+                body = "\n".join(
+                    f"{prefixes[index]}{symbols[status]}]" for index, status in enumerate(statuses)
+                )
+            yield f"--- Tick {tick} ---\n{body}\n\n"
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "TraceReader":
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+
+def _depths(
+    root: py_trees.behaviour.Behaviour,
+) -> typing.Iterator[typing.Tuple[int, py_trees.behaviour.Behaviour]]:
+    # pre-order, unlike Behaviour.iterate()
+    stack = [(0, root)]
+    while stack:
+        depth, node = stack.pop()
+        yield depth, node
+        stack.extend((depth + 1, child) for child in reversed(node.children))
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a binary tick trace.")
+    parser.add_argument("trace", type=Path, help="a file written by TraceRecorder / --trace")
+    parser.add_argument("--start", type=int, help="first tick to show")
+    parser.add_argument("--end", type=int, help="last tick to show")
+    parser.add_argument("--changes", action="store_true", help="only show status changes")
+    parser.add_argument(
+        "--demo", type=Path, help="render with the demo script's build_tree(), as the demo prints it"
+    )
+    args = parser.parse_args(argv)
+
+    root = None
+    if args.demo is not None:
+        from . import benchmark
+
+        factory = benchmark.load(args.demo)
+        if factory is None:
+            parser.error(f"{args.demo} has no build_tree()")
+        root = factory()
+    with TraceReader(args.trace) as reader:
+        for frame in reader.replay(args.start, args.end, root=root, changes=args.changes):
+            sys.stdout.write(frame)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
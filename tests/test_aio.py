@@ -0,0 +1,110 @@
+import asyncio
+import typing
+import unittest
+
+import py_trees
+
+from pytree_stuff import aio, clock
+
+Status = py_trees.common.Status
+
+
+async def _returns(value: typing.Any) -> typing.Any:
+    await asyncio.sleep(0)
+    return value
+
+
+async def _raises() -> None:
+    await asyncio.sleep(0)
+    raise ConnectionError("refused")
+
+
+def _tree(root: py_trees.behaviour.Behaviour) -> py_trees.trees.BehaviourTree:
+    tree = py_trees.trees.BehaviourTree(root=root)
+    tree.setup(timeout=1.0)
+    return tree
+
+
+class TestAsyncBehaviour(unittest.IsolatedAsyncioTestCase):
+    async def test_results(self) -> None:
+        for value, status in (
+            (None, Status.SUCCESS),
+            (True, Status.SUCCESS),
+            (False, Status.FAILURE),
+            (Status.RUNNING, Status.RUNNING),
+        ):
+            with self.subTest(value=value):
+                leaf = aio.AsyncCall("Call", _returns, value)
+                runner = aio.AsyncTickRunner(_tree(leaf), rate_hz=1000.0)
+                await runner.run(number_of_ticks=20, stop_on_terminal_state=value is not Status.RUNNING)
+                self.assertEqual(leaf.status, status)
+
+    async def test_exceptions_fail(self) -> None:
+        leaf = aio.AsyncCall("Call", _raises)
+        await aio.AsyncTickRunner(_tree(leaf), rate_hz=1000.0).run(number_of_ticks=20)
+        self.assertEqual((leaf.status, leaf.feedback_message), (Status.FAILURE, "ConnectionError: refused"))
+
+    async def test_sleep(self) -> None:
+        leaf = aio.Sleep(seconds=0.02)
+        statistics = await aio.AsyncTickRunner(_tree(leaf), rate_hz=200.0).run(number_of_ticks=100)
+        self.assertEqual(leaf.status, Status.SUCCESS)
+        self.assertGreater(statistics.ticks, 1)
+
+    async def test_interrupt_cancels_the_work(self) -> None:
+        leaf = aio.Sleep(seconds=60.0)
+        root = py_trees.composites.Selector(
+            "Root", memory=False, children=[py_trees.behaviours.Failure("Idle"), leaf]
+        )
+        tree = _tree(root)
+        tree.tick()
+        task = leaf.task
+        assert task is not None
+        root.stop(Status.INVALID)
+        await asyncio.sleep(0)
+        self.assertTrue(task.cancelled())
+        self.assertIsNone(leaf.task)
+
+    async def test_cancelling_the_runner_stops_the_tree(self) -> None:
+        leaf = aio.Sleep(seconds=60.0)
+        runner = aio.AsyncTickRunner(_tree(leaf), rate_hz=1000.0)
+        running = asyncio.create_task(runner.run())
+        while leaf.task is None:
+            await asyncio.sleep(0)
+        work = leaf.task
+        running.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await running
+        await asyncio.sleep(0)
+        self.assertTrue(work.cancelled())
+        self.assertEqual(leaf.status, Status.INVALID)
+
+    async def test_trees_share_the_loop(self) -> None:
+        ready = asyncio.Event()
+
+        async def signal() -> None:
+            ready.set()
+
+        waiter = aio.AsyncCall("Wait", ready.wait)
+        signaller = aio.AsyncCall("Signal", signal)
+        statistics = await asyncio.wait_for(
+            aio.run_trees([_tree(waiter), _tree(signaller)], rate_hz=1000.0), timeout=5.0
+        )
+        self.assertEqual((waiter.status, signaller.status), (Status.SUCCESS, Status.SUCCESS))
+        self.assertEqual(len(statistics), 2)
+
+    async def test_virtual_clock(self) -> None:
+        virtual = clock.VirtualClock()
+        tree = _tree(py_trees.behaviours.Running())
+        statistics = await aio.AsyncTickRunner(tree, rate_hz=1.0, clock=virtual).run(number_of_ticks=100)
+        self.assertEqual((statistics.ticks, virtual.now()), (100, 99.0))
+
+
+class TestWithoutLoop(unittest.TestCase):
+    def test_needs_a_running_loop(self) -> None:
+        leaf = aio.Sleep()
+        with self.assertRaises(RuntimeError):
+            leaf.tick_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+import py_trees
+
+from pytree_stuff import behaviours, benchmark
+
+Status = py_trees.common.Status
+
+
+def _statuses(behaviour: py_trees.behaviour.Behaviour, ticks: int = 7) -> list:
+    statuses = []
+    for _ in range(ticks):
+        behaviour.tick_once()
+        statuses.append(behaviour.status)
+    return statuses
+
+
+class TestBehaviours(unittest.TestCase):
+    def test_delayed(self) -> None:
+        R, S, F = Status.RUNNING, Status.SUCCESS, Status.FAILURE
+        # a finished behaviour restarts on its next tick
+        self.assertEqual(_statuses(behaviours.DelayedSuccess(ticks=3)), [R, R, S, R, R, S, R])
+        self.assertEqual(_statuses(behaviours.DelayedFailure(ticks=2)), [R, F, R, F, R, F, R])
+        self.assertEqual(_statuses(behaviours.AlwaysRunning()), [R] * 7)
+
+    def test_matches_the_demo_classes(self) -> None:
+        self.assertEqual(
+            _statuses(behaviours.DelayedSuccess("Task", ticks=3)),
+            _statuses(benchmark._DemoDelayedSuccess("Task", ticks=3)),
+        )
+
+    def test_stop_restarts(self) -> None:
+        behaviour = behaviours.DelayedSuccess(ticks=2)
+        behaviour.tick_once()
+        behaviour.stop(Status.INVALID)
+        behaviour.tick_once()
+        self.assertEqual(behaviour.status, Status.RUNNING)
+
+    def test_served_from_the_class(self) -> None:
+        behaviour = behaviours.DelayedSuccess("Task")
+        self.assertNotIn("iterator", vars(behaviour))
+        self.assertNotIn("qualified_name", vars(behaviour))
+        self.assertNotIn("count", vars(behaviour))
+        self.assertEqual(behaviour.qualified_name, "DelayedSuccess/Task")
+        self.assertIs(next(behaviour.iterator), behaviour)
+
+    def test_in_a_tree(self) -> None:
+        root = py_trees.composites.Sequence(
+            "Root", memory=True, children=[behaviours.DelayedSuccess("First", ticks=2), behaviours.AlwaysRunning()]
+        )
+        tree = py_trees.trees.BehaviourTree(root=root)
+        tree.setup(timeout=1.0)
+        for _ in range(3):
+            tree.tick()
+        self.assertEqual(
+            [node.status for node in [root] + root.children], [Status.RUNNING, Status.SUCCESS, Status.RUNNING]
+        )
+
+    def test_smaller_than_the_demo_classes(self) -> None:
+        compact = benchmark.footprint(lambda: behaviours.DelayedSuccess("Task", ticks=3), instances=1000)
+        demo = benchmark.footprint(lambda: benchmark._DemoDelayedSuccess("Task", ticks=3), instances=1000)
+        self.assertLess(compact["bytes_per_instance"], demo["bytes_per_instance"])
+
+
+if __name__ == "__main__":
+    unittest.main()
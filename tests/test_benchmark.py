@@ -0,0 +1,76 @@
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from pytree_stuff import behaviours, benchmark
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _build_tree() -> behaviours.Delayed:
+    return behaviours.DelayedSuccess("Task", ticks=3)
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_discovers_every_demo(self) -> None:
+        factories = benchmark.discover(ROOT)
+        self.assertIn("Behaviour/Behaviour_Foo.py", factories)
+        self.assertTrue(all(name.split("/")[0] in benchmark.DEMO_DIRECTORIES for name in factories))
+        for name, factory in factories.items():
+            with self.subTest(name=name):
+                self.assertIsNotNone(factory())
+
+    def test_histogram(self) -> None:
+        self.assertEqual(
+            benchmark.histogram([500, 1000, 1500, 7000, 9000]),
+            {"<1us": 2, "<2us": 1, "<8us": 1, "<16us": 1},
+        )
+
+    def test_measure(self) -> None:
+        result = benchmark.measure(_build_tree, ticks=50, warmup=5)
+        self.assertEqual(result["ticks"], 50)
+        self.assertEqual(sum(result["latency_histogram"].values()), 50)
+        self.assertGreater(result["ticks_per_second"], 0)
+        self.assertLessEqual(result["latency_p50_us"], result["latency_p99_us"])
+        json.dumps(result)
+
+    def test_compare(self) -> None:
+        baseline = {
+            "fast": {"ticks_per_second": 1000.0, "allocated_bytes_per_tick": 100.0},
+            "lean": {"ticks_per_second": 1000.0, "allocated_bytes_per_tick": 100.0},
+        }
+        results = {
+            "fast": {"ticks_per_second": 700.0, "allocated_bytes_per_tick": 100.0},
+            "lean": {"ticks_per_second": 900.0, "allocated_bytes_per_tick": 300.0},
+            "new": {"ticks_per_second": 1.0, "allocated_bytes_per_tick": 1e6},
+        }
+        regressions = benchmark.compare(results, baseline, tolerance=0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("fast:"))
+        self.assertIn("B/tick", regressions[1])
+        self.assertEqual(benchmark.compare(results, baseline, tolerance=1.5), [])
+
+    def test_save_and_compare_a_baseline(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "baseline.json"
+            arguments = ["--root", str(ROOT), "--ticks", "20", "--filter", "Behaviour_Foo"]
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(benchmark.main(arguments + ["--save-baseline", str(path)]), 0)
+            self.assertEqual(list(json.loads(path.read_text())), ["Behaviour/Behaviour_Foo.py"])
+            # a generous tolerance, the timing of 20 ticks is noise
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(benchmark.main(arguments + ["--compare", str(path), "--tolerance", "0.99"]), 0)
+            saved = json.loads(path.read_text())
+            saved["Behaviour/Behaviour_Foo.py"]["ticks_per_second"] = float("inf")
+            path.write_text(json.dumps(saved))
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.assertEqual(benchmark.main(arguments + ["--compare", str(path)]), 1)
+            self.assertIn("REGRESSION Behaviour/Behaviour_Foo.py", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,272 @@
+import threading
+import unittest
+
+import py_trees
+
+from pytree_stuff import blackboard
+
+Access = py_trees.common.Access
+Status = py_trees.common.Status
+
+
+class TestClient(unittest.TestCase):
+    def setUp(self) -> None:
+        self.store = blackboard.Store()
+        self.writer = blackboard.Client("Writer", store=self.store)
+        self.reader = blackboard.Client("Reader", store=self.store)
+
+    def test_interning(self) -> None:
+        slot = self.store.intern("speed")
+        self.assertEqual(self.store.intern("/speed"), slot)
+        self.assertEqual(self.store.slot("speed"), slot)
+        robot = blackboard.Client("Robot", namespace="/robot", store=self.store)
+        self.assertEqual(robot.register_key("speed", Access.READ), self.store.slot("/robot/speed"))
+        self.assertNotEqual(robot.slot("speed"), slot)
+        self.assertEqual(len(self.store), 2)
+        with self.assertRaises(KeyError):
+            self.store.slot("missing")
+
+    def test_read_and_write(self) -> None:
+        slot = self.writer.register_key("speed", Access.WRITE)
+        self.assertEqual(self.reader.register_key("speed", Access.READ), slot)
+        with self.assertRaises(KeyError):
+            self.reader.read(slot)
+        self.writer.write(slot, 3.0)
+        self.assertEqual(self.reader.read(slot), 3.0)
+        # write access implies read access
+        self.assertEqual(self.writer.read(slot), 3.0)
+        self.assertEqual(list(self.store.items()), [("/speed", 3.0)])
+
+    def test_access_checks(self) -> None:
+        slot = self.reader.register_key("speed", Access.READ)
+        with self.assertRaises(AttributeError):
+            self.reader.write(slot, 1.0)
+        other = self.store.intern("heading")
+        with self.assertRaises(AttributeError):
+            self.reader.read(other)
+        with self.assertRaises(AttributeError):
+            self.reader.read_many([slot, other])
+        with self.assertRaises(AttributeError):
+            self.reader.write_many([slot], [1.0])
+        with self.assertRaises(TypeError):
+            self.reader.register_key("speed", "write")  # type: ignore[arg-type]
+        trusted = blackboard.Client("Trusted", store=self.store, trusted=True)
+        trusted.write(other, 90.0)
+        self.assertEqual(trusted.read(other), 90.0)
+
+    def test_exclusive_write(self) -> None:
+        self.writer.register_key("speed", Access.EXCLUSIVE_WRITE)
+        self.writer.register_key("speed", Access.WRITE)
+        self.reader.register_key("speed", Access.READ)
+        with self.assertRaises(AttributeError):
+            self.reader.register_key("speed", Access.WRITE)
+
+    def test_bulk_access(self) -> None:
+        slots = [self.writer.register_key(key, Access.WRITE) for key in ("x", "y", "z")]
+        self.writer.write_many(slots[:2], [1.0, 2.0])
+        self.assertEqual(self.writer.read_many(slots, default="unset"), [1.0, 2.0, "unset"])
+
+    def test_clear(self) -> None:
+        slot = self.writer.register_key("speed", Access.WRITE)
+        self.writer.write(slot, 1.0)
+        self.store.clear()
+        self.assertEqual((len(self.store), list(self.store.items())), (0, []))
+        self.assertEqual(self.store.intern("heading"), 0)
+
+    def test_status_to_slot(self) -> None:
+        decorator = blackboard.StatusToSlot(
+            "Record", child=py_trees.behaviours.Failure("Fail"), variable_name="outcome", store=self.store
+        )
+        decorator.tick_once()
+        self.assertEqual(decorator.status, Status.FAILURE)
+        self.assertEqual(self.store.values[self.store.slot("outcome")], Status.FAILURE)
+
+
+class Array:
+    """Compares element-wise, like a numpy array."""
+
+    def __init__(self, *values: float) -> None:
+        self.values = values
+
+    def __eq__(self, other: object) -> "Array":  # type: ignore[override]
+        return self
+
+    def __bool__(self) -> bool:
+        raise ValueError("ambiguous")
+
+
+class TestVersions(unittest.TestCase):
+    def setUp(self) -> None:
+        self.store = blackboard.Store()
+        self.client = blackboard.Client("Writer", store=self.store, trusted=True)
+        self.slot = self.store.intern("speed")
+
+    def test_only_changes_bump_the_version(self) -> None:
+        for value, changed in (
+            (1, True),
+            (1, False),
+            (1.0, True),
+            (True, True),
+            (float("nan"), True),
+            (float("nan"), False),
+            ([1, 2], True),
+            ([1, 2], False),
+            (Array(1.0), True),
+            (Array(1.0), True),
+        ):
+            with self.subTest(value=value):
+                version = self.client.version(self.slot)
+                self.client.write(self.slot, value)
+                self.assertEqual(self.client.version(self.slot), version + changed)
+
+    def test_write_many_bumps_versions_too(self) -> None:
+        other = self.store.intern("heading")
+        self.client.write_many([self.slot, other], [1.0, 2.0])
+        self.client.write_many([self.slot, other], [1.0, 3.0])
+        self.assertEqual((self.client.version(self.slot), self.client.version(other)), (1, 2))
+
+
+class TestSubscriptions(unittest.TestCase):
+    def setUp(self) -> None:
+        self.store = blackboard.Store()
+        self.client = blackboard.Client("Writer", store=self.store, trusted=True)
+        self.speed, self.heading, self.mode = (self.store.intern(key) for key in ("speed", "heading", "mode"))
+
+    def test_drain(self) -> None:
+        subscription = self.store.subscribe(["heading", "speed"])
+        self.client.write(self.mode, "auto")
+        self.store.notify()
+        self.assertFalse(subscription.changed)
+        for value in (1.0, 2.0):
+            self.client.write(self.heading, value)
+            self.client.write(self.speed, value)
+            self.store.notify()
+        # reported once, in slot order
+        self.assertEqual(subscription.drain(), ["/speed", "/heading"])
+        self.assertEqual(subscription.drain(), [])
+
+    def test_callbacks(self) -> None:
+        changes = []
+        subscription = self.store.subscribe(["speed"], callback=changes.append)
+        self.client.write(self.speed, 1.0)
+        self.client.write(self.speed, 1.0)
+        self.store.notify()
+        self.store.notify()
+        self.assertEqual(changes, [["/speed"]])
+        subscription.close()
+        self.client.write(self.speed, 2.0)
+        self.store.notify()
+        self.assertEqual(changes, [["/speed"]])
+
+    def test_new_keys_are_interned(self) -> None:
+        subscription = self.store.subscribe(["battery"])
+        blackboard.Client("Battery", store=self.store, trusted=True).write(self.store.slot("battery"), 0.5)
+        self.store.notify()
+        self.assertEqual(subscription.drain(), ["/battery"])
+
+    def test_as_a_post_tick_handler(self) -> None:
+        root = blackboard.StatusToSlot(
+            "Record", child=py_trees.behaviours.Running("Run"), variable_name="outcome", store=self.store
+        )
+        tree = py_trees.trees.BehaviourTree(root=root)
+        tree.add_post_tick_handler(self.store.notify)
+        subscription = self.store.subscribe(["outcome"])
+        changed = []
+        for _ in range(3):
+            tree.tick()
+            changed.append(subscription.drain())
+        self.assertEqual(changed, [["/outcome"], [], []])
+
+
+class TestSnapshots(unittest.TestCase):
+    def setUp(self) -> None:
+        self.store = blackboard.Store()
+        self.client = blackboard.Client("Writer", store=self.store, trusted=True)
+        self.slots = [self.store.intern(f"key_{index}") for index in range(200)]
+        self.client.write(self.slots[0], "first")
+        self.snapshots = blackboard.Snapshots(self.store, history=2)
+        self.addCleanup(self.snapshots.close)
+
+    def test_immutable(self) -> None:
+        before = self.snapshots.latest
+        self.client.write(self.slots[0], "second")
+        self.client.write(self.slots[150], "new")
+        self.assertEqual(before["key_0"], "first")
+        self.store.notify()
+        after = self.snapshots.latest
+        self.assertEqual((after.version, after["key_0"], after["key_150"]), (before.version + 1, "second", "new"))
+        self.assertEqual(before["key_0"], "first")
+        self.assertNotIn("/key_150", before.to_dict())
+        with self.assertRaises(KeyError):
+            before["key_150"]
+        self.assertIsNone(before.get("key_150"))
+
+    def test_unchanged_chunks_are_shared(self) -> None:
+        # publish the write made before the snapshots were taken
+        self.store.notify()
+        before = self.snapshots.latest
+        self.client.write(self.slots[70], 1)
+        self.store.notify()
+        after = self.snapshots.latest
+        self.assertIs(after.chunks[0], before.chunks[0])
+        self.assertIsNot(after.chunks[1], before.chunks[1])
+        self.assertIs(after.chunks[2], before.chunks[2])
+        self.store.notify()
+        self.assertIs(self.snapshots.latest.chunks, after.chunks)
+
+    def test_new_slots(self) -> None:
+        extra = self.store.intern("extra")
+        self.client.write(extra, 1)
+        self.store.notify()
+        latest = self.snapshots.latest
+        self.assertEqual((len(latest), latest["extra"], latest.value(extra)), (201, 1, 1))
+        with self.assertRaises(IndexError):
+            latest.value(201)
+
+    def test_ticks_and_history(self) -> None:
+        tree = py_trees.trees.BehaviourTree(root=py_trees.behaviours.Running())
+        tree.add_post_tick_handler(self.store.notify)
+        for _ in range(3):
+            tree.tick()
+        self.assertEqual(self.snapshots.latest.tick, 3)
+        self.assertEqual([snapshot.tick for snapshot in self.snapshots.history], [1, 2])
+
+    def test_survive_clear(self) -> None:
+        before = self.snapshots.latest
+        self.store.clear()
+        self.store.intern("other")
+        self.assertEqual(before["key_0"], "first")
+        self.assertEqual(before.to_dict(), {"/key_0": "first"})
+
+    def test_close(self) -> None:
+        self.snapshots.close()
+        version = self.snapshots.latest.version
+        self.store.notify()
+        self.assertEqual(self.snapshots.latest.version, version)
+
+    def test_readers_never_see_half_a_tick(self) -> None:
+        left, right = self.slots[1], self.slots[199]
+        stop = threading.Event()
+        torn = []
+
+        def read() -> None:
+            while not stop.is_set():
+                view = self.snapshots.latest
+                if view.value(left) != view.value(right):
+                    torn.append(view.version)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            for tick in range(2000):
+                self.client.write(left, tick)
+                self.client.write(right, tick)
+                self.store.notify()
+        finally:
+            stop.set()
+            reader.join()
+        self.assertEqual(torn, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import time
+import unittest
+
+import py_trees
+
+from pytree_stuff import clock, ticking
+
+
+class TestVirtualClock(unittest.TestCase):
+    def test_moves_only_when_told(self) -> None:
+        virtual = clock.VirtualClock(start=5.0)
+        self.assertTrue(virtual.virtual)
+        self.assertFalse(clock.Clock.virtual)
+        virtual.sleep(2.0)
+        virtual.advance(0.5)
+        # negative amounts are ignored, time never goes back
+        virtual.sleep(-1.0)
+        virtual.advance(-1.0)
+        self.assertEqual(virtual.now(), 7.5)
+
+    def test_sleep_returns_at_once(self) -> None:
+        started = time.monotonic()
+        clock.VirtualClock().sleep(3600.0)
+        clock.Clock().sleep(-1.0)
+        self.assertLess(time.monotonic() - started, 1.0)
+
+
+class TestDefaultClock(unittest.TestCase):
+    def setUp(self) -> None:
+        self.virtual = clock.VirtualClock(start=100.0)
+        previous = clock.set_default_clock(self.virtual)
+        self.addCleanup(clock.set_default_clock, previous)
+
+    def test_set_default_clock(self) -> None:
+        self.assertIs(clock.default_clock(), self.virtual)
+        self.assertEqual(clock.now(), 100.0)
+        other = clock.VirtualClock()
+        self.assertIs(clock.set_default_clock(other), self.virtual)
+        self.assertEqual(clock.now(), 0.0)
+
+    def test_resolve(self) -> None:
+        source = clock.resolve(None)
+        self.assertEqual(source(), 100.0)
+        # None follows the default, even when it is replaced later
+        clock.set_default_clock(clock.VirtualClock(start=7.0))
+        self.assertEqual(source(), 7.0)
+        self.assertEqual(clock.resolve(self.virtual)(), 100.0)
+        self.assertEqual(clock.resolve(lambda: 42.0)(), 42.0)
+
+    def test_runners_use_the_default(self) -> None:
+        tree = py_trees.trees.BehaviourTree(root=py_trees.behaviours.Running())
+        started = time.monotonic()
+        statistics = ticking.TickRunner(tree, rate_hz=1.0).run(number_of_ticks=3600)
+        self.assertLess(time.monotonic() - started, 10.0)
+        self.assertEqual(statistics.ticks, 3600)
+        self.assertEqual(self.virtual.now(), 100.0 + 3599.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import typing
+import unittest
+from pathlib import Path
+
+import py_trees
+
+from pytree_stuff import behaviours, benchmark, compiler
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _build_tree() -> py_trees.behaviour.Behaviour:
+    """Every opcode, including behaviours that fall back to their own tick()."""
+    return py_trees.composites.Selector(
+        "Root",
+        memory=False,
+        children=[
+            py_trees.composites.Sequence(
+                "Guarded",
+                memory=True,
+                children=[
+                    py_trees.decorators.Inverter("Not Failed", child=behaviours.DelayedFailure("Check", ticks=2)),
+                    py_trees.decorators.OneShot(
+                        "Once",
+                        child=behaviours.DelayedSuccess("Calibrate", ticks=3),
+                        policy=py_trees.common.OneShotPolicy.ON_COMPLETION,
+                    ),
+                    behaviours.DelayedFailure("Act", ticks=2),
+                ],
+            ),
+            py_trees.composites.Parallel(
+                "Both",
+                policy=py_trees.common.ParallelPolicy.SuccessOnOne(),
+                children=[behaviours.DelayedSuccess("Left", ticks=4), behaviours.DelayedFailure("Right", ticks=6)],
+            ),
+            py_trees.composites.Parallel(
+                "Selected",
+                policy=py_trees.common.ParallelPolicy.SuccessOnSelected(children=[]),
+                children=[behaviours.AlwaysRunning()],
+            ),
+        ],
+    )
+
+
+def _composites(root: py_trees.behaviour.Behaviour) -> typing.List[py_trees.composites.Composite]:
+    return [node for node in root.iterate() if isinstance(node, py_trees.composites.Composite)]
+
+
+class TestCompiler(unittest.TestCase):
+    def test_opcodes(self) -> None:
+        program = compiler.compile(_build_tree())
+        self.assertEqual(
+            [compiler.OPCODE_NAMES[opcode] for opcode in program.opcodes],
+            ["SELECTOR", "SEQUENCE", "DECORATOR", "LEAF", "FALLBACK", "LEAF", "PARALLEL", "LEAF", "LEAF", "FALLBACK"],
+        )
+        # falling back hands the whole subtree to the behaviour's own tick()
+        self.assertEqual(program.children[4], ())
+        self.assertTrue(program.listing().splitlines()[0].endswith("Root -> [1, 6, 9]"))
+
+    def test_matches_object_trees(self) -> None:
+        self.assertEqual(compiler.compare_with_objects(_build_tree, ticks=50), 0)
+
+    def test_matches_the_demos(self) -> None:
+        for name, factory in benchmark.discover(ROOT).items():
+            with self.subTest(name=name):
+                self.assertEqual(compiler.compare_with_objects(factory, ticks=50), 0)
+
+    def test_current_child(self) -> None:
+        regular = _build_tree()
+        compiled = compiler.compile(_build_tree())
+        for _ in range(20):
+            regular.tick_once()
+            compiled.tick()
+            self.assertEqual(
+                [getattr(node.current_child, "name", None) for node in _composites(regular)],
+                [getattr(node.current_child, "name", None) for node in _composites(compiled.behaviours[0])],
+            )
+
+    def test_handlers_and_visitors(self) -> None:
+        def run(tree: py_trees.trees.BehaviourTree, tick: typing.Callable[..., None]) -> list:
+            snapshot = py_trees.visitors.SnapshotVisitor()
+            tree.add_visitor(snapshot)
+            calls = []
+            tree.add_pre_tick_handler(lambda tree: calls.append(("pre", tree.count)))
+            tree.add_post_tick_handler(lambda tree: calls.append(("post", tree.count)))
+            visited = []
+            for _ in range(6):
+                tick(post_tick_handler=lambda tree: calls.append(("argument", tree.count)))
+                visited.append(
+                    [(node.name, snapshot.visited[node.id]) for node in tree.root.iterate() if node.id in snapshot.visited]
+                )
+            return [calls, visited, tree.count]
+
+        regular = py_trees.trees.BehaviourTree(root=_build_tree())
+        compiled = compiler.CompiledTree(py_trees.trees.BehaviourTree(root=_build_tree()))
+        self.assertEqual(run(compiled.tree, compiled.tick), run(regular, regular.tick))
+        self.assertEqual(compiled.count, 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,389 @@
+import threading
+import typing
+import unittest
+
+import py_trees
+
+from pytree_stuff import blackboard, clock, composites, events
+
+Status = py_trees.common.Status
+R, S, F = Status.RUNNING, Status.SUCCESS, Status.FAILURE
+
+SCRIPTS = (
+    ([R, S], [R, R, S], [S]),
+    ([R, S], [R, F], [R, R, S]),
+    ([F], [S], [R]),
+    ([R, R, R, S], [S], [R, S]),
+)
+
+
+def _queues(script: typing.Sequence[typing.List[Status]]) -> typing.List[py_trees.behaviour.Behaviour]:
+    return [
+        py_trees.behaviours.StatusQueue(name=f"Child {index}", queue=list(queue), eventually=queue[-1])
+        for index, queue in enumerate(script)
+    ]
+
+
+def _policies(children: typing.List[py_trees.behaviour.Behaviour]) -> typing.Dict[str, py_trees.common.ParallelPolicy.Base]:
+    return {
+        "all": py_trees.common.ParallelPolicy.SuccessOnAll(synchronise=False),
+        "all synchronised": py_trees.common.ParallelPolicy.SuccessOnAll(synchronise=True),
+        "one": py_trees.common.ParallelPolicy.SuccessOnOne(),
+        "selected": py_trees.common.ParallelPolicy.SuccessOnSelected(children=children[1:], synchronise=True),
+    }
+
+
+def _statuses(root: py_trees.behaviour.Behaviour, ticks: int = 5) -> typing.List[typing.List[Status]]:
+    history = []
+    for _ in range(ticks):
+        root.tick_once()
+        history.append([node.status for node in root.iterate()])
+    return history
+
+
+class Scripted(py_trees.behaviour.Behaviour):
+    """Plays back a status per tick, then repeats the last, counting its ticks."""
+
+    def __init__(self, name: str, script: typing.Sequence[Status]) -> None:
+        super().__init__(name)
+        self.script = list(script)
+        self.updates = 0
+
+    def update(self) -> Status:
+        self.updates += 1
+        return self.script[min(self.updates, len(self.script)) - 1]
+
+
+class Blocking(py_trees.behaviour.Behaviour):
+    """Blocks its ticks on an event, counting them."""
+
+    def __init__(self, name: str, release: threading.Event, status: Status = Status.SUCCESS) -> None:
+        super().__init__(name)
+        self.release = release
+        self.outcome = status
+        self.updates = 0
+
+    def update(self) -> Status:
+        self.updates += 1
+        self.release.wait(timeout=5)
+        return self.outcome
+
+
+class Meeting(py_trees.behaviour.Behaviour):
+    """Only succeeds if all its siblings are ticking at the same time."""
+
+    def __init__(self, name: str, barrier: threading.Barrier) -> None:
+        super().__init__(name)
+        self.barrier = barrier
+
+    def update(self) -> Status:
+        try:
+            self.barrier.wait(timeout=5)
+        except threading.BrokenBarrierError:
+            return Status.FAILURE
+        return Status.SUCCESS
+
+
+class Raising(py_trees.behaviour.Behaviour):
+    def update(self) -> Status:
+        raise ValueError("broken sensor")
+
+
+class TestConcurrentParallel(unittest.TestCase):
+    def _concurrent(self, **kwargs: typing.Any) -> composites.ConcurrentParallel:
+        parallel = composites.ConcurrentParallel(**kwargs)
+        self.addCleanup(parallel.shutdown)
+        return parallel
+
+    def test_matches_parallel(self) -> None:
+        for script in SCRIPTS:
+            for policy in _policies(_queues(script)):
+                with self.subTest(script=script, policy=policy):
+                    children = _queues(script)
+                    expected = py_trees.composites.Parallel(
+                        name="Parallel", policy=_policies(children)[policy], children=children
+                    )
+                    children = _queues(script)
+                    concurrent = self._concurrent(
+                        name="Parallel", policy=_policies(children)[policy], children=children
+                    )
+                    self.assertEqual(_statuses(concurrent), _statuses(expected))
+
+    def test_children_tick_concurrently(self) -> None:
+        barrier = threading.Barrier(3)
+        parallel = self._concurrent(
+            name="Meeting",
+            policy=py_trees.common.ParallelPolicy.SuccessOnAll(),
+            children=[Meeting(f"Member {index}", barrier) for index in range(3)],
+        )
+        parallel.tick_once()
+        self.assertEqual(parallel.status, Status.SUCCESS)
+
+    def test_yields_children_in_order(self) -> None:
+        children = _queues(([S], [S], [S]))
+        parallel = self._concurrent(
+            name="Parallel", policy=py_trees.common.ParallelPolicy.SuccessOnAll(), children=children
+        )
+        self.assertEqual(list(parallel.tick()), children + [parallel])
+
+    def test_timeout(self) -> None:
+        release = threading.Event()
+        slow = Blocking("Slow", release)
+        parallel = self._concurrent(
+            name="Parallel",
+            policy=py_trees.common.ParallelPolicy.SuccessOnAll(),
+            children=[slow, py_trees.behaviours.Success("Fast")],
+            timeout=0.01,
+        )
+        parallel.tick_once()
+        self.assertEqual(parallel.status, Status.RUNNING)
+        self.assertEqual(parallel.feedback_message, "still ticking 'Slow'")
+        parallel.tick_once()
+        # not ticked again while its first tick is in flight
+        self.assertEqual(slow.updates, 1)
+        release.set()
+        parallel.pending[slow].result(timeout=5)
+        parallel.tick_once()
+        self.assertEqual(parallel.status, Status.SUCCESS)
+        self.assertEqual(slow.updates, 1)
+
+    def test_stop_waits_for_ticks_in_flight(self) -> None:
+        release = threading.Event()
+        slow = Blocking("Slow", release, status=Status.RUNNING)
+        parallel = self._concurrent(
+            name="Parallel", policy=py_trees.common.ParallelPolicy.SuccessOnAll(), children=[slow], timeout=0.01
+        )
+        parallel.tick_once()
+        threading.Timer(0.05, release.set).start()
+        parallel.stop(Status.INVALID)
+        self.assertEqual(parallel.pending, {})
+        self.assertEqual(slow.status, Status.INVALID)
+
+    def test_raises_what_a_child_raised(self) -> None:
+        parallel = self._concurrent(
+            name="Parallel",
+            policy=py_trees.common.ParallelPolicy.SuccessOnAll(),
+            children=[Raising("Raising"), py_trees.behaviours.Success("Fine")],
+        )
+        with self.assertRaises(ValueError):
+            parallel.tick_once()
+
+    def test_tree_shutdown_releases_threads(self) -> None:
+        parallel = composites.ConcurrentParallel(
+            name="Parallel", policy=py_trees.common.ParallelPolicy.SuccessOnAll(), children=_queues(([S], [S]))
+        )
+        tree = py_trees.trees.BehaviourTree(root=parallel)
+        tree.tick()
+        self.assertIsNotNone(parallel.executor)
+        tree.shutdown()
+        self.assertIsNone(parallel.executor)
+
+
+class TestShortCircuitParallel(unittest.TestCase):
+    def test_only_ticks_active_children(self) -> None:
+        quick, slow = Scripted("Quick", [S]), Scripted("Slow", [R, R, S])
+        parallel = composites.ShortCircuitParallel(
+            name="Parallel", policy=py_trees.common.ParallelPolicy.SuccessOnAll(), children=[quick, slow]
+        )
+        parallel.tick_once()
+        self.assertEqual(parallel.active, [slow])
+        parallel.tick_once()
+        parallel.tick_once()
+        self.assertEqual((quick.updates, slow.updates), (1, 3))
+        self.assertEqual(parallel.status, Status.SUCCESS)
+        self.assertEqual(parallel.active, [])
+
+    def test_failure_short_circuits(self) -> None:
+        before, failing, after = Scripted("Before", [R]), Scripted("Failing", [R, F]), Scripted("After", [R])
+        parallel = composites.ShortCircuitParallel(
+            name="Parallel", policy=py_trees.common.ParallelPolicy.SuccessOnAll(), children=[before, failing, after]
+        )
+        parallel.tick_once()
+        parallel.tick_once()
+        self.assertEqual(parallel.status, Status.FAILURE)
+        self.assertIs(parallel.current_child, failing)
+        self.assertEqual(after.updates, 1)
+        self.assertEqual((before.status, after.status), (Status.INVALID, Status.INVALID))
+
+    def test_success_on_one(self) -> None:
+        first, second, third = Scripted("First", [R]), Scripted("Second", [R, S]), Scripted("Third", [R, S])
+        parallel = composites.ShortCircuitParallel(
+            name="Parallel", policy=py_trees.common.ParallelPolicy.SuccessOnOne(), children=[first, second, third]
+        )
+        parallel.tick_once()
+        parallel.tick_once()
+        self.assertEqual(parallel.status, Status.SUCCESS)
+        self.assertIs(parallel.current_child, second)
+        self.assertEqual(third.updates, 1)
+
+    def test_success_on_selected(self) -> None:
+        children = [Scripted("Background", [R]), Scripted("First", [R, S]), Scripted("Second", [R, R, S])]
+        parallel = composites.ShortCircuitParallel(
+            name="Parallel",
+            policy=py_trees.common.ParallelPolicy.SuccessOnSelected(children=children[1:]),
+            children=children,
+        )
+        statuses = []
+        for _ in range(3):
+            parallel.tick_once()
+            statuses.append(parallel.status)
+        self.assertEqual(statuses, [R, R, S])
+        self.assertIs(parallel.current_child, children[2])
+        self.assertEqual([child.updates for child in children], [3, 2, 3])
+        self.assertEqual(children[0].status, Status.INVALID)
+
+    def test_restarts_with_every_child(self) -> None:
+        children = [Scripted("First", [S]), Scripted("Second", [S])]
+        parallel = composites.ShortCircuitParallel(
+            name="Parallel", policy=py_trees.common.ParallelPolicy.SuccessOnAll(), children=children
+        )
+        parallel.tick_once()
+        parallel.tick_once()
+        self.assertEqual([child.updates for child in children], [2, 2])
+
+    def test_matches_parallel_without_ties(self) -> None:
+        for script in ([[R, S], [R, R, S], [S]], [[R, R, R, S], [S], [R, S]], [[R, R], [R, F], [R]]):
+            with self.subTest(script=script):
+                expected = py_trees.composites.Parallel(
+                    name="Parallel",
+                    policy=py_trees.common.ParallelPolicy.SuccessOnAll(),
+                    children=[Scripted(f"Child {index}", queue) for index, queue in enumerate(script)],
+                )
+                short = composites.ShortCircuitParallel(
+                    name="Parallel",
+                    policy=py_trees.common.ParallelPolicy.SuccessOnAll(),
+                    children=[Scripted(f"Child {index}", queue) for index, queue in enumerate(script)],
+                )
+                for _ in range(4):
+                    expected.tick_once()
+                    short.tick_once()
+                    self.assertEqual(short.status, expected.status)
+
+
+class TestPreemptiveSelector(unittest.TestCase):
+    def setUp(self) -> None:
+        self.store = blackboard.Store()
+        self.writer = blackboard.Client("Sensors", store=self.store, trusted=True)
+        self.battery = self.store.intern("battery")
+        self.writer.write(self.battery, 0.8)
+        self.clock = clock.VirtualClock()
+        self.checks = 0
+
+    def low(self, level: float) -> bool:
+        self.checks += 1
+        return level < 0.2
+
+    def build(self, **kwargs: typing.Any) -> composites.PreemptiveSelector:
+        # declared, as a subtree is only skipped if all of it is
+        self.charge = events.declare(py_trees.behaviours.Running("Charge"))
+        self.patrol = Scripted("Patrol", [R])
+        monitor = py_trees.composites.Sequence(
+            "Monitor",
+            memory=False,
+            children=[events.CheckKey("Battery Low?", "battery", self.low, store=self.store), self.charge],
+        )
+        return composites.PreemptiveSelector(
+            "Root", children=[monitor, self.patrol], store=self.store, clock=self.clock, **kwargs
+        )
+
+    def test_skips_unchanged_priorities(self) -> None:
+        root = self.build()
+        for _ in range(4):
+            root.tick_once()
+        self.assertIs(root.current_child, self.patrol)
+        self.assertEqual((self.checks, root.skipped, root.rechecked), (1, 3, 0))
+        self.assertEqual(root.children[0].status, Status.FAILURE)
+        self.writer.write(self.battery, 0.1)
+        root.tick_once()
+        self.assertEqual((self.checks, root.rechecked), (2, 1))
+        self.assertIs(root.current_child, root.children[0])
+        self.assertEqual(self.patrol.status, Status.INVALID)
+
+    def test_matches_selector(self) -> None:
+        preemptive = self.build()
+        selector = py_trees.composites.Selector("Root", memory=False, children=[])
+        selector.add_children(
+            [
+                py_trees.composites.Sequence(
+                    "Monitor",
+                    memory=False,
+                    children=[
+                        events.CheckKey("Battery Low?", "battery", self.low, store=self.store),
+                        py_trees.behaviours.Running("Charge"),
+                    ],
+                ),
+                Scripted("Patrol", [R]),
+            ]
+        )
+        for level in (0.8, 0.8, 0.1, 0.1, 0.5, 0.5, 0.15, 0.9):
+            self.writer.write(self.battery, level)
+            preemptive.tick_once()
+            selector.tick_once()
+            self.assertEqual(
+                [node.status for node in preemptive.iterate()], [node.status for node in selector.iterate()]
+            )
+
+    def test_undeclared_children_are_always_rechecked(self) -> None:
+        guard = Scripted("Guard", [F])
+        root = composites.PreemptiveSelector(
+            "Root", children=[guard, Scripted("Patrol", [R])], store=self.store, clock=self.clock
+        )
+        for _ in range(3):
+            root.tick_once()
+        self.assertEqual((guard.updates, root.rechecked, root.skipped), (3, 2, 0))
+
+    def test_recheck_interval(self) -> None:
+        guard = Scripted("Guard", [F, F, S])
+        root = composites.PreemptiveSelector(
+            "Root", children=[guard, Scripted("Patrol", [R])], recheck=1.0, store=self.store, clock=self.clock
+        )
+        root.tick_once()
+        self.clock.advance(0.5)
+        root.tick_once()
+        self.assertEqual(guard.updates, 1)
+        self.clock.advance(0.5)
+        root.tick_once()
+        self.assertEqual(guard.updates, 2)
+        self.clock.advance(1.0)
+        root.tick_once()
+        self.assertIs(root.current_child, guard)
+        self.assertEqual(root.status, Status.SUCCESS)
+
+    def test_recheck_mapping(self) -> None:
+        often, rarely = Scripted("Often", [F]), Scripted("Rarely", [F])
+        root = composites.PreemptiveSelector(
+            "Root",
+            children=[often, rarely, Scripted("Patrol", [R])],
+            recheck={often: 1.0, rarely: 10.0},
+            store=self.store,
+            clock=self.clock,
+        )
+        for _ in range(5):
+            root.tick_once()
+            self.clock.advance(1.0)
+        self.assertEqual((often.updates, rarely.updates), (5, 1))
+
+    def test_declared_period(self) -> None:
+        late = events.declare(Scripted("Heartbeat Late?", [F]), every=2.0)
+        root = composites.PreemptiveSelector(
+            "Root", children=[late, Scripted("Patrol", [R])], store=self.store, clock=self.clock
+        )
+        for _ in range(5):
+            root.tick_once()
+            self.clock.advance(1.0)
+        self.assertEqual(late.updates, 3)
+
+    def test_replans_when_children_change(self) -> None:
+        root = self.build()
+        root.tick_once()
+        guard = Scripted("Guard", [F])
+        root.insert_child(guard, 0)
+        root.stop(Status.INVALID)
+        root.tick_once()
+        root.tick_once()
+        self.assertEqual(guard.updates, 2)
+        self.assertIs(root.current_child, self.patrol)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import io
+import threading
+import unittest
+
+import py_trees
+
+from pytree_stuff import behaviours, console
+
+
+class Stalled(io.StringIO):
+    """A stream whose writes block until released, like a slow terminal."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text: str) -> int:
+        self.release.wait(timeout=5)
+        return super().write(text)
+
+
+class TestStatusRenderer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root = py_trees.composites.Sequence(
+            "Root",
+            memory=True,
+            children=[behaviours.DelayedSuccess("First", ticks=2), behaviours.DelayedSuccess("Second", ticks=2)],
+        )
+        self.tree = py_trees.trees.BehaviourTree(root=self.root)
+        self.stream = io.StringIO()
+
+    def run_tree(self, renderer: console.StatusRenderer, ticks: int = 3) -> str:
+        self.tree.add_post_tick_handler(renderer)
+        for _ in range(ticks):
+            self.tree.tick()
+        renderer.close()
+        return self.stream.getvalue()
+
+    def test_changes(self) -> None:
+        renderer = console.StatusRenderer(self.root, mode=console.DisplayMode.CHANGES, stream=self.stream)
+        lines = self.run_tree(renderer).splitlines()
+        # tick 1 starts the root and first child, tick 2 hands over, tick 3 finishes
+        self.assertEqual(
+            [line.split(" [")[0] for line in lines],
+            ["[1] Root", "[1]     First", "[2]     First", "[2]     Second", "[3] Root", "[3]     Second"],
+        )
+
+    def test_changes_after_rebuild(self) -> None:
+        renderer = console.StatusRenderer(self.root, mode=console.DisplayMode.CHANGES, stream=self.stream)
+        self.root.add_child(behaviours.DelayedSuccess("Third", ticks=1))
+        renderer.rebuild()
+        self.assertIn("Third", self.run_tree(renderer, ticks=5))
+
+    def test_full(self) -> None:
+        renderer = console.StatusRenderer(self.root, stream=self.stream)
+        self.assertEqual(self.run_tree(renderer).count("--- Tick"), 3)
+
+    def test_full_throttled(self) -> None:
+        renderer = console.StatusRenderer(self.root, max_fps=0.001, stream=self.stream)
+        output = self.run_tree(renderer)
+        # the first frame, then nothing until the root finishes
+        self.assertEqual(output.count("--- Tick"), 2)
+        self.assertIn("--- Tick 3 ---", output)
+
+    def test_off(self) -> None:
+        renderer = console.StatusRenderer(self.root, mode=console.DisplayMode.OFF, stream=self.stream)
+        self.assertEqual(self.run_tree(renderer), "")
+        self.assertIsNone(renderer._writer)
+
+    def test_drops_frames_rather_than_block(self) -> None:
+        stream = Stalled()
+        renderer = console.StatusRenderer(self.root, stream=stream, queue_size=1)
+        self.tree.add_post_tick_handler(renderer)
+        for _ in range(4):
+            self.tree.tick()
+        # one frame stuck in the stream, at most one queued, the rest dropped
+        self.assertGreaterEqual(renderer.dropped_frames, 2)
+        stream.release.set()
+        renderer.close()
+        self.assertEqual(stream.getvalue().count("--- Tick"), 4 - renderer.dropped_frames)
+
+
+if __name__ == "__main__":
+    unittest.main()
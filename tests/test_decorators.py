@@ -0,0 +1,256 @@
+import json
+import tempfile
+import typing
+import unittest
+from pathlib import Path
+
+import py_trees
+
+from pytree_stuff import blackboard, clock, decorators
+
+Status = py_trees.common.Status
+R, S, F = Status.RUNNING, Status.SUCCESS, Status.FAILURE
+
+
+class Scripted(py_trees.behaviour.Behaviour):
+    """Plays back a status per tick, then repeats the last, counting its ticks."""
+
+    def __init__(self, name: str, script: typing.Sequence[Status]) -> None:
+        super().__init__(name)
+        self.script = list(script)
+        self.updates = 0
+
+    def update(self) -> Status:
+        self.updates += 1
+        return self.script[min(self.updates, len(self.script)) - 1]
+
+
+class TestBackoff(unittest.TestCase):
+    def test_exponential(self) -> None:
+        backoff = decorators.Backoff(initial=1.0, factor=2.0, maximum=5.0)
+        self.assertEqual([backoff.delay(attempt) for attempt in range(1, 6)], [1.0, 2.0, 4.0, 5.0, 5.0])
+        fixed = decorators.Backoff(initial=0.5, factor=1.0)
+        self.assertEqual({fixed.delay(attempt) for attempt in range(1, 6)}, {0.5})
+
+    def test_jitter(self) -> None:
+        delays = [decorators.Backoff(initial=1.0, factor=1.0, jitter=0.5, seed=3).delay(1) for _ in range(2)]
+        self.assertEqual(delays[0], delays[1])
+        backoff = decorators.Backoff(initial=1.0, factor=1.0, jitter=0.5, seed=3)
+        for _ in range(100):
+            self.assertTrue(0.5 <= backoff.delay(1) <= 1.0)
+
+    def test_invalid(self) -> None:
+        for kwargs in ({"initial": -1.0}, {"factor": 0.5}, {"maximum": -1.0}, {"jitter": 1.5}):
+            with self.subTest(**kwargs), self.assertRaises(ValueError):
+                decorators.Backoff(**kwargs)
+
+
+class TestBackoffDecorators(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = clock.VirtualClock()
+        self.backoff = decorators.Backoff(initial=1.0, factor=2.0)
+
+    def tick(self, behaviour: py_trees.behaviour.Behaviour, advance: float = 0.0) -> Status:
+        self.clock.advance(advance)
+        behaviour.tick_once()
+        return behaviour.status
+
+    def test_retry_waits_between_attempts(self) -> None:
+        child = Scripted("Connect", [F, F, S])
+        retry = decorators.BackoffRetry("Retry", child, num_failures=3, backoff=self.backoff, clock=self.clock)
+        self.assertEqual(self.tick(retry), R)
+        self.assertEqual(self.tick(retry, 0.5), R)
+        self.assertEqual(child.updates, 1)
+        self.assertTrue(retry.feedback_message.startswith("backing off"))
+        self.assertEqual(self.tick(retry, 0.5), R)
+        self.assertEqual(child.updates, 2)
+        # the second failure doubles the delay
+        self.assertEqual(self.tick(retry, 1.0), R)
+        self.assertEqual(child.updates, 2)
+        self.assertEqual(self.tick(retry, 1.0), S)
+        self.assertEqual(child.updates, 3)
+        statistics = retry.statistics()
+        self.assertEqual((statistics["attempts"], statistics["successes"], statistics["failures"]), (3, 1, 2))
+
+    def test_retry_gives_up(self) -> None:
+        child = Scripted("Connect", [F])
+        retry = decorators.BackoffRetry("Retry", child, num_failures=2, backoff=self.backoff, clock=self.clock)
+        self.assertEqual(self.tick(retry), R)
+        self.assertEqual(self.tick(retry, 1.0), F)
+        self.assertEqual(retry.feedback_message, "final failure [2 of 2]")
+        # a fresh run starts counting again
+        self.assertEqual(self.tick(retry, 10.0), R)
+        self.assertEqual((retry.attempts, retry.total_attempts), (1, 3))
+
+    def test_latencies_on_the_clock(self) -> None:
+        child = Scripted("Slow", [R, R, S])
+        retry = decorators.BackoffRetry("Retry", child, num_failures=1, clock=self.clock)
+        self.tick(retry)
+        self.tick(retry, 0.25)
+        self.assertEqual(self.tick(retry, 0.25), S)
+        self.assertEqual(retry.statistics()["latency_p50"], 0.5)
+
+    def test_repeat(self) -> None:
+        child = Scripted("Ping", [S])
+        repeat = decorators.BackoffRepeat("Repeat", child, num_success=2, backoff=self.backoff, clock=self.clock)
+        self.assertEqual(self.tick(repeat), R)
+        self.assertEqual(self.tick(repeat, 0.5), R)
+        self.assertEqual(self.tick(repeat, 0.5), S)
+        self.assertEqual(child.updates, 2)
+
+    def test_repeat_forever(self) -> None:
+        child = Scripted("Ping", [S, S, S, S, F])
+        repeat = decorators.BackoffRepeat("Repeat", child, num_success=-1, backoff=self.backoff, clock=self.clock)
+        statuses = [self.tick(repeat, 60.0) for _ in range(5)]
+        self.assertEqual(statuses, [R, R, R, R, F])
+        self.assertEqual(repeat.feedback_message, "failed, aborting [4 success forever]")
+
+    def test_stop_cancels_the_wait(self) -> None:
+        child = Scripted("Connect", [F, S])
+        retry = decorators.BackoffRetry("Retry", child, num_failures=2, backoff=self.backoff, clock=self.clock)
+        self.tick(retry)
+        retry.stop(Status.INVALID)
+        self.assertIsNone(retry.deadline)
+        self.assertEqual(self.tick(retry), S)
+
+
+class Calibrate(py_trees.behaviour.Behaviour):
+    """Writes an offset when it finishes, counting its ticks."""
+
+    def __init__(self, name: str, store: blackboard.Store, ticks: int = 2, outcome: Status = Status.SUCCESS) -> None:
+        super().__init__(name)
+        self.client = blackboard.Client(name, store=store)
+        self.offset = self.client.register_key("offset", py_trees.common.Access.WRITE)
+        self.ticks = ticks
+        self.outcome = outcome
+        self.updates = 0
+
+    def initialise(self) -> None:
+        self.count = 0
+
+    def update(self) -> Status:
+        self.updates += 1
+        self.count += 1
+        if self.count < self.ticks:
+            return Status.RUNNING
+        self.client.write(self.offset, 0.25)
+        return self.outcome
+
+
+class TestResultStore(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "results" / "calibration.json"
+
+    def test_in_memory(self) -> None:
+        results = decorators.ResultStore()
+        self.assertIsNone(results.get("camera", "1"))
+        results.put("camera", "1", Status.SUCCESS, {"offset": 0.25})
+        entry = results.get("camera", "1")
+        assert entry is not None
+        self.assertEqual((entry["status"], entry["outputs"]), ("SUCCESS", {"offset": 0.25}))
+        self.assertIsNone(results.get("camera", "2"))
+        self.assertEqual((len(results), results.hits, results.misses, results.stale), (1, 1, 1, 1))
+        self.assertFalse(self.path.exists())
+
+    def test_persists_across_instances(self) -> None:
+        decorators.ResultStore(self.path).put("camera", "1", Status.FAILURE, {})
+        self.assertEqual(decorators.ResultStore(self.path).get("camera", "1")["status"], "FAILURE")
+
+    def test_merges_with_other_writers(self) -> None:
+        first, second = decorators.ResultStore(self.path), decorators.ResultStore(self.path)
+        self.assertEqual(len(first), 0)
+        second.put("lidar", "1", Status.SUCCESS, {})
+        first.put("camera", "1", Status.SUCCESS, {})
+        self.assertEqual(sorted(json.loads(self.path.read_text())), ["camera", "lidar"])
+
+    def test_max_age(self) -> None:
+        results = decorators.ResultStore(self.path)
+        results.put("camera", "1", Status.SUCCESS, {})
+        self.assertIsNotNone(results.get("camera", "1", max_age=60.0))
+        assert results.entries is not None
+        results.entries["camera"]["saved"] -= 120.0
+        self.assertIsNone(results.get("camera", "1", max_age=60.0))
+        self.assertIsNotNone(results.get("camera", "1"))
+
+    def test_invalidate(self) -> None:
+        results = decorators.ResultStore(self.path)
+        for key in ("camera", "lidar", "imu"):
+            results.put(key, "1", Status.SUCCESS, {})
+        results.invalidate("camera")
+        results.invalidate("missing")
+        self.assertEqual(len(decorators.ResultStore(self.path)), 2)
+        results.invalidate()
+        self.assertEqual(len(decorators.ResultStore(self.path)), 0)
+
+    def test_unreadable_file_counts_as_empty(self) -> None:
+        self.path.parent.mkdir(parents=True)
+        for content in ("{not json", "[1, 2]"):
+            with self.subTest(content=content):
+                self.path.write_text(content)
+                results = decorators.ResultStore(self.path)
+                self.assertIsNone(results.get("camera", "1"))
+                results.put("camera", "1", Status.SUCCESS, {})
+                self.assertIsNotNone(decorators.ResultStore(self.path).get("camera", "1"))
+
+    def test_outputs_must_be_json(self) -> None:
+        with self.assertRaises(TypeError):
+            decorators.ResultStore(self.path).put("camera", "1", Status.SUCCESS, {"offset": object()})
+
+
+class TestPersistentOneShot(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "calibration.json"
+
+    def run_once(self, version: str = "1", name: str = "Calibrate", **kwargs: typing.Any) -> decorators.PersistentOneShot:
+        """Build a fresh tree, as a restarted process would, and tick it to completion."""
+        self.store = blackboard.Store()
+        self.child = Calibrate(name, self.store, **kwargs)
+        one_shot = decorators.PersistentOneShot(
+            name="Calibrate Once",
+            child=self.child,
+            key="camera",
+            version=version,
+            results=decorators.ResultStore(self.path),
+            outputs=["offset"],
+            store=self.store,
+        )
+        for _ in range(5):
+            one_shot.tick_once()
+            if one_shot.status != Status.RUNNING:
+                break
+        return one_shot
+
+    def test_restores_after_a_restart(self) -> None:
+        first = self.run_once()
+        self.assertEqual((first.status, first.restored, self.child.updates), (S, False, 2))
+        second = self.run_once()
+        self.assertEqual((second.status, second.restored, self.child.updates), (S, True, 0))
+        self.assertEqual(self.store.values[self.store.intern("offset")], 0.25)
+
+    def test_version_or_structure_change_reruns(self) -> None:
+        self.run_once()
+        self.assertFalse(self.run_once(version="2").restored)
+        self.assertEqual(self.child.updates, 2)
+        self.assertFalse(self.run_once(version="2", name="Calibrate Camera").restored)
+        self.assertEqual(self.child.updates, 2)
+
+    def test_failures_are_not_saved_on_successful_completion(self) -> None:
+        self.assertEqual(self.run_once(outcome=F).status, F)
+        self.assertEqual(len(decorators.ResultStore(self.path)), 0)
+
+    def test_invalidate(self) -> None:
+        self.run_once()
+        one_shot = self.run_once()
+        self.assertTrue(one_shot.restored)
+        one_shot.invalidate()
+        one_shot.tick_once()
+        self.assertEqual((one_shot.status, self.child.updates), (R, 1))
+        self.assertEqual(len(decorators.ResultStore(self.path)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+
+import py_trees
+
+from pytree_stuff import blackboard, clock, events, profiling
+
+Status = py_trees.common.Status
+
+
+class TestEventDrivenTree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.store = blackboard.Store()
+        self.writer = blackboard.Client("Sensors", store=self.store, trusted=True)
+        self.battery = self.store.intern("battery")
+        self.writer.write(self.battery, 0.8)
+        self.checks = 0
+
+    def low(self, level: float) -> bool:
+        self.checks += 1
+        return level < 0.2
+
+    def build(self) -> py_trees.behaviour.Behaviour:
+        self.check = events.CheckKey("Battery Low?", "battery", self.low, store=self.store)
+        monitor = py_trees.composites.Sequence(
+            "Monitor", memory=False, children=[self.check, py_trees.behaviours.Success("Warn")]
+        )
+        return py_trees.composites.Selector(
+            "Root", memory=False, children=[monitor, py_trees.behaviours.Running("Patrol")]
+        )
+
+    def test_skips_unchanged_subtrees(self) -> None:
+        tree = events.EventDrivenTree(py_trees.trees.BehaviourTree(self.build()), store=self.store)
+        for _ in range(5):
+            tree.tick()
+        self.assertEqual((tree.root.status, self.checks, tree.skipped), (Status.RUNNING, 1, 4))
+        self.writer.write(self.battery, 0.1)
+        tree.tick()
+        self.assertEqual((tree.root.status, self.checks), (Status.SUCCESS, 2))
+        tree.wake()
+        tree.tick()
+        self.assertEqual(self.checks, 3)
+
+    def test_matches_plain_ticking(self) -> None:
+        plain = py_trees.trees.BehaviourTree(self.build())
+        tree = events.EventDrivenTree(py_trees.trees.BehaviourTree(self.build()), store=self.store)
+        for level in (0.8, 0.8, 0.1, 0.1, 0.5, 0.5, 0.15):
+            self.writer.write(self.battery, level)
+            plain.tick()
+            tree.tick()
+            self.assertEqual(plain.root.status, tree.root.status)
+
+    def test_every_reevaluates(self) -> None:
+        virtual = clock.VirtualClock()
+        behaviour = py_trees.behaviours.Failure("Heartbeat Late?")
+        events.declare(behaviour, every=1.0)
+        root = py_trees.composites.Selector(
+            "Root", memory=False, children=[behaviour, py_trees.behaviours.Running("Patrol")]
+        )
+        tree = events.EventDrivenTree(py_trees.trees.BehaviourTree(root), store=self.store, clock=virtual)
+        tree.tick()
+        tree.tick()
+        self.assertEqual(tree.evaluated, 1)
+        virtual.advance(1.0)
+        tree.tick()
+        self.assertEqual(tree.evaluated, 2)
+
+    def test_impure_subtrees_always_tick(self) -> None:
+        root = py_trees.composites.Sequence(
+            "Root", memory=False, children=[py_trees.behaviours.Running("Patrol")]
+        )
+        self.assertIsNone(events.dependencies(root))
+        tree = events.EventDrivenTree(py_trees.trees.BehaviourTree(root), store=self.store)
+        self.assertEqual(tree.subtrees, {})
+
+    def test_close_restores_tick(self) -> None:
+        tree = events.EventDrivenTree(py_trees.trees.BehaviourTree(self.build()), store=self.store)
+        shimmed = list(tree.subtrees)
+        self.assertTrue(shimmed)
+        tree.close()
+        for node in shimmed:
+            self.assertNotIn("tick", node.__dict__)
+
+    def test_close_keeps_later_wrappers(self) -> None:
+        root = self.build()
+        tree = events.EventDrivenTree(py_trees.trees.BehaviourTree(root), store=self.store)
+        shimmed = list(tree.subtrees)
+        profiler = profiling.Profiler(root)
+        profiler.enable()
+        tree.close()
+        tree.tick()
+        # the profiler's shims wrap the event-driven ones, and survive
+        for node in shimmed:
+            self.assertEqual(profiler.profiles[node].ticks, 1)
+        profiler.disable()
+
+
+if __name__ == "__main__":
+    unittest.main()
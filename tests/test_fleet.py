@@ -0,0 +1,104 @@
+import multiprocessing
+import unittest
+
+import py_trees
+
+from pytree_stuff import behaviours, fleet
+
+Status = py_trees.common.Status
+
+
+# factories are module level so the spawn start method can pickle them
+def _succeed_in_three() -> py_trees.behaviour.Behaviour:
+    root = py_trees.composites.Sequence(name="Root", memory=True)
+    root.add_children([behaviours.DelayedSuccess("First", ticks=2), behaviours.DelayedSuccess("Second", ticks=2)])
+    return root
+
+
+def _fail_in_two() -> py_trees.behaviour.Behaviour:
+    return behaviours.DelayedFailure("Fail", ticks=2)
+
+
+def _run_forever() -> py_trees.behaviour.Behaviour:
+    return behaviours.AlwaysRunning()
+
+
+def _broken() -> py_trees.behaviour.Behaviour:
+    raise ValueError("no tree for you")
+
+
+class TestFleet(unittest.TestCase):
+    def test_needs_trees(self) -> None:
+        with self.assertRaises(ValueError):
+            fleet.Fleet([])
+
+    def test_shares(self) -> None:
+        runner = fleet.Fleet([_run_forever] * 5, processes=2)
+        self.assertEqual(runner._shares(), [[0, 2, 4], [1, 3]])
+        self.assertEqual(fleet.Fleet([_run_forever], processes=4).processes, 1)
+
+    def test_lockstep(self) -> None:
+        runner = fleet.Fleet([_succeed_in_three, _fail_in_two, _run_forever], processes=2)
+        yielded = list(runner.run(number_of_ticks=5))
+        self.assertEqual([tick for tick, _ in yielded], [1, 2, 3, 4, 5])
+        for tick, summaries in yielded:
+            self.assertEqual([summary.index for summary in summaries], [0, 1, 2])
+            # terminal trees stop ticking, the rest keep up with the fleet
+            self.assertEqual([summary.tick for summary in summaries], [min(tick, 3), min(tick, 2), tick])
+        first, last = yielded[0][1], yielded[-1][1]
+        self.assertEqual([summary.status for summary in first], [Status.RUNNING, Status.RUNNING, Status.RUNNING])
+        self.assertEqual([summary.status for summary in last], [Status.SUCCESS, Status.FAILURE, Status.RUNNING])
+        self.assertEqual(last[0].counts[Status.SUCCESS], 3)
+        self.assertEqual(last[2].counts, {Status.INVALID: 0, Status.RUNNING: 1, Status.SUCCESS: 0, Status.FAILURE: 0})
+
+    def test_stops_on_terminal_state(self) -> None:
+        runner = fleet.Fleet([_succeed_in_three, _fail_in_two], processes=2)
+        yielded = list(runner.run())
+        self.assertEqual(yielded[-1][0], 3)
+        self.assertEqual([summary.status for summary in yielded[-1][1]], [Status.SUCCESS, Status.FAILURE])
+
+    def test_keeps_ticking_terminal_trees(self) -> None:
+        runner = fleet.Fleet([_fail_in_two], processes=1)
+        yielded = list(runner.run(number_of_ticks=4, stop_on_terminal_state=False))
+        self.assertEqual([summaries[0].tick for _, summaries in yielded], [1, 2, 3, 4])
+
+    def test_closing_the_generator_stops_the_workers(self) -> None:
+        runner = fleet.Fleet([_run_forever] * 2, processes=2)
+        run = runner.run()
+        for tick, _ in run:
+            if tick == 3:
+                break
+        run.close()
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_free_running(self) -> None:
+        runner = fleet.Fleet([_succeed_in_three, _run_forever], processes=2, lockstep=False)
+        yielded = list(runner.run(number_of_ticks=50, poll_interval=0.01))
+        tick, summaries = yielded[-1]
+        self.assertEqual(tick, 3)
+        self.assertEqual([summary.tick for summary in summaries], [3, 50])
+        self.assertEqual([summary.status for summary in summaries], [Status.SUCCESS, Status.RUNNING])
+
+    def test_compiled(self) -> None:
+        runner = fleet.Fleet([_succeed_in_three, _fail_in_two], processes=1, compiled=True)
+        _, summaries = list(runner.run())[-1]
+        self.assertEqual([summary.status for summary in summaries], [Status.SUCCESS, Status.FAILURE])
+
+    def test_spawn(self) -> None:
+        runner = fleet.Fleet(
+            [_succeed_in_three, _fail_in_two], processes=2, context=multiprocessing.get_context("spawn")
+        )
+        _, summaries = list(runner.run())[-1]
+        self.assertEqual([summary.status for summary in summaries], [Status.SUCCESS, Status.FAILURE])
+
+    def test_failing_worker(self) -> None:
+        for lockstep in (True, False):
+            with self.subTest(lockstep=lockstep):
+                runner = fleet.Fleet([_run_forever, _broken], processes=2, lockstep=lockstep)
+                with self.assertRaises(RuntimeError):
+                    for _ in runner.run(number_of_ticks=100, poll_interval=0.01):
+                        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+
+import py_trees
+
+from pytree_stuff import blackboard, clock, events, guards
+
+Status = py_trees.common.Status
+
+
+class TestMemoized(unittest.TestCase):
+    def setUp(self) -> None:
+        self.store = blackboard.Store()
+        self.writer = blackboard.Client("Writer", store=self.store, trusted=True)
+        self.slot = self.store.intern("battery")
+        self.writer.write(self.slot, 1)
+        self.clock = clock.VirtualClock()
+        self.cache = guards.ConditionCache()
+        self.calls = 0
+
+    def condition(self, blackboard: blackboard.Client) -> bool:
+        self.calls += 1
+        return bool(blackboard.read(self.slot))
+
+    def memoized(self, **kwargs: object) -> guards.Memoized:
+        return guards.Memoized(
+            self.condition, ["battery"], store=self.store, cache=self.cache, clock=self.clock, **kwargs
+        )
+
+    def test_reuses_result_while_keys_hold(self) -> None:
+        memoized = self.memoized()
+        self.assertTrue(memoized())
+        self.assertTrue(memoized())
+        self.assertEqual(self.calls, 1)
+        self.writer.write(self.slot, 0)
+        self.assertFalse(memoized())
+        self.assertEqual(self.calls, 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_equal_values_of_another_type_are_a_change(self) -> None:
+        memoized = self.memoized()
+        memoized()
+        for value in (1.0, True):
+            self.writer.write(self.slot, value)
+            memoized()
+        self.assertEqual(self.calls, 3)
+        # back to the int, still cached
+        self.writer.write(self.slot, 1)
+        memoized()
+        self.assertEqual(self.calls, 3)
+
+    def test_unhashable_values_use_versions(self) -> None:
+        self.writer.write(self.slot, [1])
+        memoized = self.memoized()
+        memoized()
+        memoized()
+        self.assertEqual(self.calls, 1)
+        self.writer.write(self.slot, [])
+        self.assertFalse(memoized())
+        self.assertEqual(self.calls, 2)
+
+    def test_ttl(self) -> None:
+        memoized = self.memoized(ttl=1.0)
+        memoized()
+        self.clock.advance(0.5)
+        memoized()
+        self.assertEqual(self.calls, 1)
+        self.clock.advance(0.6)
+        memoized()
+        self.assertEqual((self.calls, self.cache.expirations), (2, 1))
+
+    def test_invalidate(self) -> None:
+        memoized = self.memoized()
+        memoized()
+        memoized.invalidate()
+        memoized()
+        self.assertEqual(self.calls, 2)
+
+    def test_lru_eviction(self) -> None:
+        cache = guards.ConditionCache(capacity=2)
+        for key in range(3):
+            cache.put(key, key, float("inf"))
+        self.assertEqual(cache.get(0, 0.0), (False, None))
+        self.assertEqual(cache.get(2, 0.0), (True, 2))
+        self.assertEqual((len(cache), cache.evictions), (2, 1))
+        with self.assertRaises(ValueError):
+            guards.ConditionCache(capacity=0)
+
+
+class TestMemoizedBehaviours(unittest.TestCase):
+    def setUp(self) -> None:
+        self.store = blackboard.Store()
+        self.writer = blackboard.Client("Writer", store=self.store, trusted=True)
+        self.slot = self.store.intern("battery")
+        self.writer.write(self.slot, 0.8)
+        self.calls = 0
+
+    def condition(self, blackboard: blackboard.Client) -> bool:
+        self.calls += 1
+        return blackboard.read(self.slot) > 0.2
+
+    def test_eternal_guard(self) -> None:
+        guard = guards.MemoizedEternalGuard(
+            "Battery OK?",
+            py_trees.behaviours.Running("Task"),
+            condition=self.condition,
+            keys=["battery"],
+            store=self.store,
+            cache=guards.ConditionCache(),
+        )
+        for _ in range(3):
+            guard.tick_once()
+        self.assertEqual((guard.status, self.calls), (Status.RUNNING, 1))
+        self.writer.write(self.slot, 0.1)
+        guard.tick_once()
+        self.assertEqual((guard.status, self.calls), (Status.FAILURE, 2))
+
+    def test_condition_declares_its_keys(self) -> None:
+        condition = guards.MemoizedCondition(
+            "Battery OK?", self.condition, keys=["battery"], ttl=5.0, store=self.store, cache=guards.ConditionCache()
+        )
+        condition.tick_once()
+        self.assertEqual(condition.status, Status.SUCCESS)
+        dependencies = events.dependencies(condition)
+        assert dependencies is not None
+        self.assertEqual(list(dependencies.keys), ["battery"])
+        self.assertEqual(dependencies.every, 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
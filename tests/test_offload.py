@@ -0,0 +1,93 @@
+import threading
+import unittest
+
+import py_trees
+
+from pytree_stuff import offload
+
+Status = py_trees.common.Status
+
+
+def _tick_until_done(behaviour: py_trees.behaviour.Behaviour, ticks: int = 1000) -> Status:
+    for _ in range(ticks):
+        behaviour.tick_once()
+        if behaviour.status != Status.RUNNING:
+            break
+        threading.Event().wait(0.001)
+    return behaviour.status
+
+
+class TestOffloadPool(unittest.TestCase):
+    def setUp(self) -> None:
+        self.pool = offload.OffloadPool(max_workers=1, max_pending=1)
+        self.addCleanup(self.pool.shutdown)
+
+    def test_bounded_queue(self) -> None:
+        release = threading.Event()
+        running = self.pool.try_submit(release.wait)
+        assert running is not None
+        # wait for the worker to take it off the queue
+        for _ in range(1000):
+            if self.pool.running:
+                break
+            threading.Event().wait(0.001)
+        queued = self.pool.try_submit(int, "1")
+        self.assertIsNotNone(queued)
+        self.assertIsNone(self.pool.try_submit(int, "2"))
+        self.assertEqual(self.pool.rejected, 1)
+        release.set()
+        self.assertEqual(queued.result(timeout=5), 1)
+        self.assertEqual((self.pool.submitted, self.pool.queued), (2, 0))
+
+    def test_submit_after_shutdown(self) -> None:
+        self.pool.shutdown()
+        for _ in range(3):
+            with self.assertRaises(RuntimeError):
+                self.pool.try_submit(int, "1")
+        self.assertEqual((self.pool.submitted, self.pool.queued, self.pool.rejected), (0, 0, 0))
+
+
+class TestOffload(unittest.TestCase):
+    def setUp(self) -> None:
+        self.pool = offload.OffloadPool(max_workers=2)
+        self.addCleanup(self.pool.shutdown)
+
+    def test_statuses(self) -> None:
+        self.assertEqual(_tick_until_done(offload.Offload("Sum", sum, [1, 2], pool=self.pool)), Status.SUCCESS)
+        self.assertEqual(_tick_until_done(offload.Offload("False", bool, 0, pool=self.pool)), Status.FAILURE)
+        self.assertEqual(_tick_until_done(offload.Offload("Raise", int, "x", pool=self.pool)), Status.FAILURE)
+        self.assertEqual(
+            _tick_until_done(offload.Offload("Status", lambda: Status.FAILURE, pool=self.pool)), Status.FAILURE
+        )
+        behaviour = offload.Offload("Result", sum, [1, 2], pool=self.pool)
+        _tick_until_done(behaviour)
+        self.assertEqual(behaviour.result, 3)
+
+    def test_full_queue_submits_once_per_tick(self) -> None:
+        pool = offload.OffloadPool(max_workers=1, max_pending=0)
+        self.addCleanup(pool.shutdown)
+        behaviour = offload.Offload("Waiting", int, "1", pool=pool)
+        for ticks in range(1, 4):
+            behaviour.tick_once()
+            self.assertEqual(behaviour.status, Status.RUNNING)
+            self.assertEqual(pool.rejected, ticks)
+        self.assertEqual(behaviour.feedback_message, "queue full, retrying")
+
+    def test_interrupt_cancels_queued_work(self) -> None:
+        pool = offload.OffloadPool(max_workers=1, max_pending=4)
+        self.addCleanup(pool.shutdown)
+        release = threading.Event()
+        blocker = pool.try_submit(release.wait)
+        behaviour = offload.Offload("Queued", int, "1", pool=pool)
+        behaviour.tick_once()
+        future = behaviour.future
+        behaviour.stop(Status.INVALID)
+        release.set()
+        assert blocker is not None
+        blocker.result(timeout=5)
+        self.assertTrue(future is not None and future.cancelled())
+        self.assertEqual(pool.cancelled, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
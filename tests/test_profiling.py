@@ -0,0 +1,114 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import py_trees
+
+from pytree_stuff import behaviours, compiler, profiling
+
+Status = py_trees.common.Status
+
+
+class Slow(py_trees.behaviour.Behaviour):
+    def update(self) -> Status:
+        time.sleep(0.005)
+        return Status.RUNNING
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.slow = Slow("Slow")
+        self.quick = behaviours.DelayedSuccess("Quick", ticks=2)
+        self.branch = py_trees.composites.Sequence("Branch", memory=True, children=[self.quick, self.slow])
+        self.root = py_trees.composites.Selector(
+            "Root", memory=False, children=[py_trees.behaviours.Failure("Idle"), self.branch]
+        )
+        self.tree = py_trees.trees.BehaviourTree(root=self.root)
+
+    def tick(self, ticks: int = 4) -> None:
+        for _ in range(ticks):
+            self.tree.tick()
+
+    def test_counts(self) -> None:
+        with profiling.Profiler(self.root) as profiler:
+            self.tick()
+        self.assertEqual(profiler.profiles[self.root].ticks, 4)
+        self.assertEqual(profiler.profiles[self.quick].ticks, 2)
+        self.assertEqual(profiler.profiles[self.slow].ticks, 3)
+        self.assertEqual(profiler.profiles[self.slow].calls, {"initialise": 1, "update": 3, "terminate": 0})
+
+    def test_hot_path(self) -> None:
+        with profiling.Profiler(self.root) as profiler:
+            self.tick()
+        self.assertEqual(profiler.hot_path(), [self.root, self.branch, self.slow])
+        self.assertGreaterEqual(profiler.self_ns(self.slow), 3 * 5_000_000)
+        self.assertLessEqual(profiler.self_ns(self.branch), profiler.cumulative_ns(self.branch))
+        report = profiler.report().splitlines()
+        self.assertTrue(report[0].startswith("hot path: Root (100%) -> Branch"))
+        self.assertTrue(report[2].endswith("Root/Branch/Slow"))
+        self.assertEqual(len(profiler.report(limit=2).splitlines()), 4)
+
+    def test_collapsed(self) -> None:
+        with profiling.Profiler(self.root) as profiler:
+            self.tick()
+        stacks = dict(line.rsplit(" ", 1) for line in profiler.collapsed().splitlines())
+        self.assertIn("Root;Branch;Slow", stacks)
+        self.assertEqual(
+            sum(int(value) for value in stacks.values()), profiler.cumulative_ns(self.root)
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "tree.folded"
+            profiler.write_collapsed(path)
+            self.assertEqual(path.read_text(), profiler.collapsed())
+
+    def test_disable_restores_the_methods(self) -> None:
+        profiler = profiling.Profiler(self.root)
+        profiler.enable()
+        self.assertIn("tick", vars(self.slow))
+        profiler.disable()
+        for node in self.root.iterate():
+            for attribute in profiling.HOOKS + ("tick",):
+                self.assertNotIn(attribute, vars(node))
+        self.tick()
+        self.assertEqual(profiler.profiles[self.slow].ticks, 0)
+
+    def test_keeps_other_shims(self) -> None:
+        calls = []
+        original = self.slow.update
+
+        def counted() -> Status:
+            calls.append(1)
+            return original()
+
+        self.slow.update = counted  # type: ignore[method-assign]
+        profiler = profiling.Profiler(self.root)
+        profiler.enable()
+        later = self.quick.tick
+        self.quick.tick = lambda: later()  # type: ignore[method-assign]
+        wrapper = self.quick.tick
+        profiler.disable()
+        # the earlier shim is put back, the later one left in place
+        self.assertIs(vars(self.slow)["update"], counted)
+        self.assertIs(vars(self.quick)["tick"], wrapper)
+
+    def test_reset(self) -> None:
+        with profiling.Profiler(self.root) as profiler:
+            self.tick()
+            profiler.reset()
+            self.tick(1)
+        self.assertEqual(profiler.profiles[self.root].ticks, 1)
+
+    def test_compiled_trees_time_the_hooks(self) -> None:
+        compiled = compiler.CompiledTree(self.tree)
+        with profiling.Profiler(self.root) as profiler:
+            for _ in range(4):
+                compiled.tick()
+        self.assertEqual(profiler.profiles[self.slow].ticks, 0)
+        self.assertEqual(profiler.profiles[self.slow].calls["update"], 3)
+        self.assertEqual(profiler.hot_path(), [self.root, self.branch, self.slow])
+        self.assertGreaterEqual(profiler.cumulative_ns(self.root), 3 * 5_000_000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import py_trees
+
+from pytree_stuff import behaviours, rendering
+
+GRAPHVIZ = shutil.which("dot") is not None
+
+
+def _build_tree(name: str = "Second", memory: bool = True) -> py_trees.behaviour.Behaviour:
+    return py_trees.composites.Sequence(
+        "Root", memory=memory, children=[behaviours.DelayedSuccess("First"), behaviours.AlwaysRunning(name)]
+    )
+
+
+class TestStructureHash(unittest.TestCase):
+    def test_ignores_runtime_state(self) -> None:
+        root = _build_tree()
+        before = rendering.structure_hash(root)
+        root.tick_once()
+        self.assertEqual(rendering.structure_hash(root), before)
+        self.assertEqual(rendering.structure_hash(_build_tree()), before)
+
+    def test_covers_what_the_graph_shows(self) -> None:
+        digest = rendering.structure_hash(_build_tree())
+        self.assertNotEqual(rendering.structure_hash(_build_tree(name="Renamed")), digest)
+        self.assertNotEqual(rendering.structure_hash(_build_tree(memory=False)), digest)
+        deeper = py_trees.composites.Sequence(
+            "Root",
+            memory=True,
+            children=[
+                behaviours.DelayedSuccess("First"),
+                py_trees.decorators.PassThrough("Second", child=behaviours.AlwaysRunning("Second")),
+            ],
+        )
+        self.assertNotEqual(rendering.structure_hash(deeper), digest)
+
+
+class TestRender(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name) / "render"
+
+    @unittest.skipUnless(GRAPHVIZ, "needs graphviz")
+    def test_skips_current_renderings(self) -> None:
+        future = rendering.render(_build_tree(), "tree", self.directory)
+        assert future is not None
+        files = future.result(timeout=60)
+        self.assertEqual(sorted(files), ["dot", "png", "svg"])
+        self.assertTrue(rendering.is_current(_build_tree(), "tree", self.directory))
+        self.assertIsNone(rendering.render(_build_tree(), "tree", self.directory))
+        self.assertIsNotNone(rendering.render(_build_tree(), "tree", self.directory, background=False, force=True))
+        self.assertIsNotNone(rendering.render(_build_tree(name="Renamed"), "tree", self.directory, background=False))
+
+    @unittest.skipIf(GRAPHVIZ, "needs graphviz to be missing")
+    def test_failed_renderings_are_not_current(self) -> None:
+        future = rendering.render(_build_tree(), "tree", self.directory)
+        assert future is not None
+        self.assertIsNotNone(future.exception(timeout=60))
+        self.assertFalse(rendering.is_current(_build_tree(), "tree", self.directory))
+        self.assertIsNotNone(rendering.render(_build_tree(), "tree", self.directory))
+
+
+if __name__ == "__main__":
+    unittest.main()
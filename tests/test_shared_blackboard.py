@@ -0,0 +1,133 @@
+import multiprocessing
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+import py_trees
+
+from pytree_stuff import shared_blackboard
+from pytree_stuff.shared_blackboard import SharedBlackboard
+
+# a script run in a fresh interpreter, so the resource tracker's complaints land on its stderr
+SPAWNED_CHILD = textwrap.dedent(
+    """
+    import multiprocessing
+
+    from pytree_stuff.shared_blackboard import SharedBlackboard
+
+
+    def child(name):
+        board = SharedBlackboard.attach(name)
+        board.write(board.slot("battery"), 0.5)
+        board.close()
+
+
+    if __name__ == "__main__":
+        for method in ("spawn", "forkserver", "fork"):
+            board = SharedBlackboard.create(capacity=4)
+            board.register("battery", float)
+            process = multiprocessing.get_context(method).Process(target=child, args=(board.name,))
+            process.start()
+            process.join()
+            assert process.exitcode == 0, method
+            assert board.read(board.slot("battery")) == 0.5, method
+            board.close()
+    """
+)
+
+
+def _write(name: str, value: float) -> None:
+    board = SharedBlackboard.attach(name)
+    board.write(board.slot("battery"), value)
+    board.close()
+
+
+class TestSharedBlackboard(unittest.TestCase):
+    def setUp(self) -> None:
+        self.board = SharedBlackboard.create(capacity=8)
+        self.addCleanup(self.board.close)
+
+    def test_read_write_kinds(self) -> None:
+        level = self.board.register("battery", float)
+        count = self.board.register("count", int)
+        status = self.board.register("status", py_trees.common.Status)
+        self.assertEqual(self.board.read(level), 0.0)
+        self.assertEqual(self.board.read(status), py_trees.common.Status.INVALID)
+        self.board.write_many([level, count, status], [0.25, 3, py_trees.common.Status.SUCCESS])
+        self.assertEqual(self.board.read_many([level, count, status]), [0.25, 3, py_trees.common.Status.SUCCESS])
+        self.assertEqual(self.board.version(level), 1)
+
+    def test_register(self) -> None:
+        slot = self.board.register("battery", float)
+        self.assertEqual(self.board.register("battery", "float"), slot)
+        with self.assertRaises(ValueError):
+            self.board.register("battery", int)
+        with self.assertRaises(ValueError):
+            self.board.register("x" * (shared_blackboard.KEY_BYTES + 1), int)
+        for index in range(7):
+            self.board.register(f"key {index}", int)
+        with self.assertRaises(ValueError):
+            self.board.register("one too many", int)
+
+    def test_attach_sees_keys_and_values(self) -> None:
+        slot = self.board.register("battery", float)
+        self.board.write(slot, 0.75)
+        attached = SharedBlackboard.attach(self.board.name)
+        self.addCleanup(attached.close)
+        self.assertEqual(attached.keys(), ["battery"])
+        self.assertEqual(attached.read(attached.slot("battery")), 0.75)
+        self.board.register("late", int)
+        self.assertEqual(attached.slot("late"), 1)
+
+    def test_read_gives_up_on_a_dead_writer(self) -> None:
+        slot = self.board.register("battery", float)
+        self.board.write(slot, 0.5)
+        # a writer that died between the two counter increments
+        self.board._words[self.board._base + slot * shared_blackboard._SLOT_WORDS] += 1
+        self.board.stall_timeout = 0.05
+        with self.assertRaises(TimeoutError):
+            self.board.read(slot)
+        self.board.repair(slot)
+        self.board.write(slot, 0.25)
+        self.assertEqual(self.board.read(slot), 0.25)
+        self.assertEqual(self.board.version(slot), 3)
+
+    def test_spawned_writer(self) -> None:
+        self.board.register("battery", float)
+        process = multiprocessing.get_context("spawn").Process(target=_write, args=(self.board.name, 0.5))
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(self.board.read(self.board.slot("battery")), 0.5)
+
+    def test_children_keep_the_owners_block(self) -> None:
+        # children sharing the owner's resource tracker must leave its registration alone
+        with tempfile.TemporaryDirectory() as directory:
+            script = Path(directory) / "children.py"
+            script.write_text(SPAWNED_CHILD)
+            result = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, timeout=120)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        for complaint in ("KeyError", "leaked shared_memory", "Traceback"):
+            self.assertNotIn(complaint, result.stderr)
+
+    def test_independent_process_keeps_the_owners_block(self) -> None:
+        self.board.register("battery", float)
+        script = (
+            "from pytree_stuff.shared_blackboard import SharedBlackboard\n"
+            f"board = SharedBlackboard.attach({self.board.name!r})\n"
+            "board.write(board.slot('battery'), 0.25)\n"
+            "board.close()\n"
+        )
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertNotIn("leaked shared_memory", result.stderr)
+        attached = SharedBlackboard.attach(self.board.name)
+        self.addCleanup(attached.close)
+        self.assertEqual(attached.read(attached.slot("battery")), 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
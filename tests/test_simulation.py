@@ -0,0 +1,99 @@
+import unittest
+from pathlib import Path
+
+import py_trees
+
+from pytree_stuff import behaviours, benchmark
+
+try:
+    import numpy as np
+
+    from pytree_stuff import simulation
+except ImportError:
+    simulation = None  # type: ignore[assignment]
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _composites() -> py_trees.behaviour.Behaviour:
+    return py_trees.composites.Selector(
+        "Root",
+        memory=False,
+        children=[
+            py_trees.composites.Sequence(
+                "Guarded",
+                memory=True,
+                children=[
+                    py_trees.decorators.Inverter("Not Failed", child=behaviours.DelayedFailure("Check", ticks=2)),
+                    behaviours.DelayedSuccess("Act", ticks=3),
+                ],
+            ),
+            py_trees.composites.Parallel(
+                "Both",
+                policy=py_trees.common.ParallelPolicy.SuccessOnAll(synchronise=True),
+                children=[behaviours.DelayedSuccess("Left", ticks=2), behaviours.DelayedSuccess("Right", ticks=4)],
+            ),
+        ],
+    )
+
+
+def _decorators() -> py_trees.behaviour.Behaviour:
+    return py_trees.composites.Parallel(
+        "Root",
+        policy=py_trees.common.ParallelPolicy.SuccessOnOne(),
+        children=[
+            py_trees.decorators.Repeat("Repeat", child=behaviours.DelayedSuccess("Ping", ticks=2), num_success=3),
+            py_trees.decorators.Retry("Retry", child=behaviours.DelayedFailure("Connect", ticks=2), num_failures=4),
+            py_trees.decorators.Condition(
+                "Wait", child=behaviours.DelayedSuccess("Event", ticks=5), status=py_trees.common.Status.SUCCESS
+            ),
+            py_trees.decorators.FailureIsRunning("Keep Going", child=py_trees.behaviours.Failure("Failure")),
+        ],
+    )
+
+
+@unittest.skipIf(simulation is None, "needs numpy")
+class TestMassSimulation(unittest.TestCase):
+    def test_matches_object_trees(self) -> None:
+        for factory in (_composites, _decorators):
+            with self.subTest(factory=factory.__name__):
+                self.assertEqual(simulation.compare_with_objects(factory, agents=16, ticks=40), 0)
+
+    def test_matches_the_demos(self) -> None:
+        simulated = 0
+        for name, factory in benchmark.discover(ROOT).items():
+            try:
+                simulation.MassSimulation(factory(), 1)
+            except TypeError:
+                continue
+            simulated += 1
+            with self.subTest(name=name):
+                self.assertEqual(simulation.compare_with_objects(factory, agents=8, ticks=20), 0)
+        self.assertGreater(simulated, 0)
+
+    def test_per_agent_durations(self) -> None:
+        engine = simulation.MassSimulation(behaviours.DelayedSuccess("Task", ticks=3), agents=3)
+        engine.set_ticks("Task", np.array([1, 2, 3]))
+        engine.tick()
+        self.assertEqual(engine.root_status.tolist(), [simulation.SUCCESS, simulation.RUNNING, simulation.RUNNING])
+        # only tick the last agent
+        engine.tick(np.array([False, False, True]))
+        engine.tick(np.array([False, False, True]))
+        self.assertEqual(engine.root_status.tolist(), [simulation.SUCCESS, simulation.RUNNING, simulation.SUCCESS])
+        self.assertEqual(engine.statuses(1), [py_trees.common.Status.RUNNING])
+
+    def test_lookup(self) -> None:
+        engine = simulation.MassSimulation(_composites(), agents=1)
+        self.assertEqual(engine.index("Act"), 4)
+        with self.assertRaises(KeyError):
+            engine.index("Missing")
+        with self.assertRaises(TypeError):
+            engine.set_ticks("Guarded", 2)
+
+    def test_unsupported_behaviours(self) -> None:
+        with self.assertRaises(TypeError):
+            simulation.MassSimulation(py_trees.behaviours.Periodic("Periodic", n=2), agents=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import typing
+import unittest
+
+import py_trees
+
+from pytree_stuff import clock, ticking, timers
+
+Status = py_trees.common.Status
+
+
+class Busy(py_trees.behaviour.Behaviour):
+    """RUNNING, taking ``costs[n]`` virtual seconds on its n'th tick."""
+
+    def __init__(self, virtual: clock.VirtualClock, costs: typing.Sequence[float]) -> None:
+        super().__init__("Busy")
+        self.virtual = virtual
+        self.costs = list(costs)
+        self.updates = 0
+
+    def update(self) -> Status:
+        if self.updates < len(self.costs):
+            self.virtual.advance(self.costs[self.updates])
+        self.updates += 1
+        return Status.RUNNING
+
+
+class TestTickStatistics(unittest.TestCase):
+    def test_percentile(self) -> None:
+        samples = [5.0, 1.0, 4.0, 2.0, 3.0]
+        self.assertEqual(ticking.TickStatistics.percentile(samples, 50), 3.0)
+        self.assertEqual(ticking.TickStatistics.percentile(samples, 99), 5.0)
+        self.assertEqual(ticking.TickStatistics.percentile(samples, 0), 1.0)
+        self.assertEqual(ticking.TickStatistics.percentile([], 50), 0.0)
+
+    def test_history_is_bounded(self) -> None:
+        statistics = ticking.TickStatistics(history=3)
+        for sample in range(10):
+            statistics.record(latency=float(sample), jitter=0.0, missed=sample > 7)
+        self.assertEqual((statistics.ticks, statistics.deadline_misses), (10, 2))
+        self.assertEqual(list(statistics.latencies), [7.0, 8.0, 9.0])
+        self.assertIn("ticks=10", statistics.summary())
+
+
+class TestTickRunner(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = clock.VirtualClock(start=100.0)
+        self.wheel = timers.TimerWheel(clock=self.clock)
+        self.started: typing.List[float] = []
+
+    def runner(self, costs: typing.Sequence[float] = (), **kwargs: typing.Any) -> ticking.TickRunner:
+        self.busy = Busy(self.clock, costs)
+        tree = py_trees.trees.BehaviourTree(root=self.busy)
+        tree.add_pre_tick_handler(lambda tree: self.started.append(round(self.clock.now() - 100.0, 6)))
+        kwargs.setdefault("timers", self.wheel)
+        return ticking.TickRunner(tree, rate_hz=4.0, clock=self.clock, **kwargs)
+
+    def test_ticks_on_the_rate_grid(self) -> None:
+        runner = self.runner(costs=[0.1, 0.05, 0.2])
+        statistics = runner.run(number_of_ticks=5)
+        self.assertEqual(self.started, [0.0, 0.25, 0.5, 0.75, 1.0])
+        self.assertEqual((statistics.ticks, statistics.deadline_misses, statistics.jitter_p99), (5, 0, 0.0))
+        self.assertEqual(runner.next_tick_time, 101.25)
+
+    def test_skip_realigns_after_an_overrun(self) -> None:
+        runner = self.runner(costs=[0.0, 0.6])
+        statistics = runner.run(number_of_ticks=4)
+        self.assertEqual(self.started, [0.0, 0.25, 1.0, 1.25])
+        self.assertEqual((statistics.deadline_misses, statistics.skipped_slots), (1, 2))
+
+    def test_catch_up_keeps_every_slot(self) -> None:
+        runner = self.runner(costs=[0.0, 0.6], policy=ticking.OverrunPolicy.CATCH_UP)
+        statistics = runner.run(number_of_ticks=5)
+        self.assertEqual(self.started, [0.0, 0.25, 0.85, 0.85, 1.0])
+        self.assertEqual((statistics.deadline_misses, statistics.skipped_slots), (1, 0))
+        self.assertAlmostEqual(statistics.jitter_p99, 0.35)
+
+    def test_budget(self) -> None:
+        statistics = self.runner(costs=[0.1, 0.2], budget=0.15).run(number_of_ticks=3)
+        self.assertEqual(statistics.deadline_misses, 1)
+
+    def test_stops_on_terminal_state(self) -> None:
+        root = py_trees.behaviours.StatusQueue("Task", [Status.RUNNING, Status.RUNNING], eventually=Status.SUCCESS)
+        runner = ticking.TickRunner(
+            py_trees.trees.BehaviourTree(root=root), rate_hz=4.0, clock=self.clock, timers=self.wheel
+        )
+        self.assertEqual(runner.run().ticks, 3)
+        self.assertEqual(runner.run(number_of_ticks=2, stop_on_terminal_state=False).ticks, 5)
+
+    def test_interrupt(self) -> None:
+        runner = self.runner()
+        statistics = runner.run(
+            post_tick_handler=lambda tree: runner.interrupt() if len(self.started) == 3 else None
+        )
+        self.assertEqual(statistics.ticks, 3)
+
+    def test_advances_the_timers_first(self) -> None:
+        wheel = timers.TimerWheel(ticks=True)
+        expired: typing.List[int] = []
+        runner = self.runner(timers=wheel)
+        wheel.schedule(2, lambda: expired.append(len(self.started)))
+        runner.run(number_of_ticks=3)
+        # expired before the tree's second tick started
+        self.assertEqual(expired, [1])
+
+    def test_plain_time_source(self) -> None:
+        slept: typing.List[float] = []
+        runner = ticking.TickRunner(
+            py_trees.trees.BehaviourTree(root=py_trees.behaviours.Running()),
+            rate_hz=2.0,
+            clock=lambda: 10.0 + len(slept) * 0.5,
+            sleep=slept.append,
+            timers=self.wheel,
+        )
+        runner.run(number_of_ticks=3)
+        self.assertEqual(slept, [0.5, 0.5])
+        self.assertFalse(runner.virtual)
+
+    def test_invalid_rate(self) -> None:
+        with self.assertRaises(ValueError):
+            ticking.TickRunner(py_trees.trees.BehaviourTree(root=py_trees.behaviours.Running()), rate_hz=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
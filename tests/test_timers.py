@@ -0,0 +1,180 @@
+import random
+import types
+import unittest
+from unittest import mock
+
+import py_trees
+
+from pytree_stuff import clock, timers
+
+Status = py_trees.common.Status
+R, S, F = Status.RUNNING, Status.SUCCESS, Status.FAILURE
+
+
+class Scripted(py_trees.behaviour.Behaviour):
+    """Plays back ``statuses``, repeating the last one."""
+
+    def __init__(self, name: str, statuses: list) -> None:
+        super().__init__(name)
+        self.statuses = statuses
+        self.updates = 0
+        self.stops = []
+
+    def update(self) -> Status:
+        status = self.statuses[min(self.updates, len(self.statuses) - 1)]
+        self.updates += 1
+        return status
+
+    def terminate(self, new_status: Status) -> None:
+        self.stops.append(new_status)
+
+
+class TestTickWheel(unittest.TestCase):
+    def setUp(self) -> None:
+        self.wheel = timers.TimerWheel(ticks=True)
+        self.fired = []
+
+    def schedule(self, delay: int) -> timers.Timer:
+        return self.wheel.schedule(delay, lambda: self.fired.append((delay, self.wheel.now)))
+
+    def test_expiry(self) -> None:
+        self.schedule(3)
+        self.schedule(1)
+        # at least one step, even for no delay
+        self.schedule(0)
+        self.assertEqual(len(self.wheel), 3)
+        self.assertEqual(self.wheel.advance(), 2)
+        self.assertEqual(self.wheel.advance(2), 1)
+        self.assertEqual(self.fired, [(1, 1), (0, 1), (3, 3)])
+        self.assertEqual((len(self.wheel), self.wheel.expired), (0, 3))
+
+    def test_cancel(self) -> None:
+        timer = self.schedule(2)
+        self.assertTrue(timer.active)
+        self.wheel.cancel(timer)
+        self.wheel.cancel(timer)
+        self.assertFalse(timer.active)
+        self.assertEqual((self.wheel.advance(5), len(self.wheel), self.fired), (0, 0, []))
+
+    def test_long_delays_cascade(self) -> None:
+        delays = [255, 256, 257, 300, 65535, 65536, 70000, 1 << 24, (1 << 32) + 5]
+        for delay in delays:
+            self.schedule(delay)
+        self.wheel.advance(1 << 33)
+        self.assertEqual(self.fired, [(delay, delay) for delay in delays])
+
+    def test_matches_a_sorted_list(self) -> None:
+        generator = random.Random(7)
+        delays = generator.sample(range(1, 100000), 500)
+        armed = {delay: self.schedule(delay) for delay in delays}
+        cancelled = set(generator.sample(sorted(armed), 50))
+        for delay in cancelled:
+            self.wheel.cancel(armed[delay])
+        while self.wheel.now < 100000:
+            self.wheel.advance(generator.randrange(1, 5000))
+        expected = sorted(set(delays) - cancelled)
+        self.assertEqual([delay for delay, _ in self.fired], expected)
+        self.assertTrue(all(now >= delay for delay, now in self.fired))
+
+    def test_callbacks_can_cancel_other_timers(self) -> None:
+        later = self.schedule(2)
+        self.wheel.schedule(2, lambda: self.wheel.cancel(later))
+        self.schedule(2)
+        self.wheel.advance(2)
+        # the first callback ran before it could be cancelled, the third did
+        self.assertEqual(len(self.fired), 2)
+        self.assertEqual(len(self.wheel), 0)
+
+    def test_pre_tick_handler(self) -> None:
+        self.schedule(2)
+        tree = py_trees.trees.BehaviourTree(root=py_trees.behaviours.Running())
+        tree.add_pre_tick_handler(self.wheel)
+        tree.tick()
+        self.assertEqual(self.fired, [])
+        tree.tick()
+        self.assertEqual(self.fired, [(2, 2)])
+
+
+class TestSecondsWheel(unittest.TestCase):
+    def setUp(self) -> None:
+        self.virtual = clock.VirtualClock(start=10.0)
+        self.wheel = timers.TimerWheel(resolution=0.5, clock=self.virtual)
+        self.fired = []
+
+    def test_follows_the_clock(self) -> None:
+        self.wheel.schedule(1.2, lambda: self.fired.append(self.virtual.now()))
+        self.virtual.advance(1.0)
+        self.assertEqual(self.wheel.advance(), 0)
+        self.virtual.advance(0.5)
+        self.assertEqual(self.wheel.advance(), 1)
+        self.assertEqual(self.fired, [11.5])
+
+    def test_catches_up_when_idle(self) -> None:
+        self.virtual.advance(1000.0)
+        self.wheel.schedule(1.0, lambda: self.fired.append(self.virtual.now()))
+        self.virtual.advance(1.0)
+        self.wheel.advance()
+        self.assertEqual(self.fired, [1011.0])
+
+    def test_invalid_resolution(self) -> None:
+        with self.assertRaises(ValueError):
+            timers.TimerWheel(resolution=0.0)
+
+
+class TestTimeout(unittest.TestCase):
+    def setUp(self) -> None:
+        self.wheel = timers.TimerWheel(ticks=True)
+
+    def run_tree(self, child: Scripted, duration: int, ticks: int) -> list:
+        root = timers.Timeout("Timeout", child=child, duration=duration, wheel=self.wheel)
+        tree = py_trees.trees.BehaviourTree(root=root)
+        tree.add_pre_tick_handler(self.wheel)
+        statuses = []
+        for _ in range(ticks):
+            tree.tick()
+            statuses.append(root.status)
+        self.root = root
+        return statuses
+
+    def test_times_out(self) -> None:
+        child = Scripted("Child", [R])
+        # RUNNING for three ticks, failing on the one the timer expires before
+        self.assertEqual(self.run_tree(child, duration=3, ticks=5), [R, R, R, F, R])
+        self.assertEqual(self.root.feedback_message, "")
+        self.assertEqual(child.stops, [Status.INVALID])
+        # the timer was re-armed for the second attempt
+        self.assertEqual(len(self.wheel), 1)
+
+    def test_finishing_cancels_the_timer(self) -> None:
+        child = Scripted("Child", [R, S])
+        self.assertEqual(self.run_tree(child, duration=3, ticks=2), [R, S])
+        self.assertIsNone(self.root.timer)
+        self.assertEqual((len(self.wheel), self.wheel.expired), (0, 0))
+
+    def test_stop_cancels_the_timer(self) -> None:
+        self.run_tree(Scripted("Child", [R]), duration=3, ticks=1)
+        self.root.stop(Status.INVALID)
+        self.assertEqual(len(self.wheel), 0)
+
+    def test_matches_py_trees(self) -> None:
+        virtual = clock.VirtualClock()
+        wheel = timers.TimerWheel(resolution=0.25, clock=virtual)
+        # py_trees' Timeout reads time.monotonic, give it the virtual clock
+        patch = mock.patch.object(py_trees.decorators, "time", types.SimpleNamespace(monotonic=virtual.now))
+        patch.start()
+        self.addCleanup(patch.stop)
+        for statuses in ([R], [R, R, S], [R, F], [S]):
+            with self.subTest(statuses=statuses):
+                # off the resolution grid, where both agree on the tick a deadline passes
+                ours = timers.Timeout("Ours", child=Scripted("Child", statuses), duration=0.9, wheel=wheel)
+                theirs = py_trees.decorators.Timeout("Theirs", child=Scripted("Child", statuses), duration=0.9)
+                for _ in range(6):
+                    wheel.advance()
+                    ours.tick_once()
+                    theirs.tick_once()
+                    self.assertEqual(ours.status, theirs.status)
+                    virtual.advance(0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
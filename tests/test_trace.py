@@ -0,0 +1,112 @@
+import contextlib
+import io
+import tempfile
+import typing
+import unittest
+from pathlib import Path
+
+import py_trees
+
+from pytree_stuff import behaviours, console, trace
+
+
+def _build_tree() -> py_trees.behaviour.Behaviour:
+    return py_trees.composites.Sequence(
+        "Root",
+        memory=True,
+        children=[
+            behaviours.DelayedSuccess("First", ticks=2),
+            py_trees.composites.Selector(
+                "Choose", memory=False, children=[behaviours.DelayedFailure("Try", ticks=2), behaviours.AlwaysRunning()]
+            ),
+        ],
+    )
+
+
+class TestTrace(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "demo.trace"
+
+    def record(self, ticks: int = 6, **kwargs: typing.Any) -> typing.Tuple[typing.List[typing.Any], typing.List[str]]:
+        """Record a run, returning every tick's pre-order statuses and printed tree."""
+        root = _build_tree()
+        tree = py_trees.trees.BehaviourTree(root=root)
+        statuses, frames = [], []
+        renderer = console.StatusRenderer(root, mode=console.DisplayMode.OFF)
+        changes = []
+        with trace.TraceRecorder(root, self.path, **kwargs) as recorder:
+            tree.add_post_tick_handler(recorder)
+            for _ in range(ticks):
+                tree.tick()
+                statuses.append([node.status for _, node in trace._depths(root)])
+                frames.append(py_trees.display.ascii_tree(root, show_status=True))
+                changes.append(renderer.changes(tree.count))
+        self.changes = [frame for frame in changes if frame]
+        return statuses, frames
+
+    def test_round_trip(self) -> None:
+        statuses, _ = self.record()
+        with trace.TraceReader(self.path) as reader:
+            self.assertEqual(len(reader), 6)
+            self.assertEqual(reader.nodes[0], (0, "Root", "Sequence"))
+            self.assertEqual(reader.nodes[3], (2, "Try", "DelayedFailure"))
+            self.assertEqual([record[2] for record in reader.iterate()], statuses)
+            self.assertEqual([record[0] for record in reader.iterate()], [1, 2, 3, 4, 5, 6])
+
+    def test_grows_in_chunks_and_trims(self) -> None:
+        statuses, _ = self.record(ticks=10, chunk_records=3)
+        with trace.TraceReader(self.path) as reader:
+            self.assertEqual([record[2] for record in reader.iterate()], statuses)
+            self.assertEqual(self.path.stat().st_size, reader.offset + 10 * reader.record_size)
+
+    def test_readers_see_published_records(self) -> None:
+        root = _build_tree()
+        tree = py_trees.trees.BehaviourTree(root=root)
+        recorder = trace.TraceRecorder(root, self.path)
+        self.addCleanup(recorder.close)
+        tree.add_post_tick_handler(recorder)
+        tree.tick()
+        tree.tick()
+        with trace.TraceReader(self.path) as reader:
+            self.assertEqual(len(reader), 2)
+
+    def test_ranges(self) -> None:
+        self.record(ticks=10)
+        with trace.TraceReader(self.path) as reader:
+            self.assertEqual(reader.find(4), 3)
+            self.assertEqual(reader.find(100), 10)
+            self.assertEqual([record[0] for record in reader.iterate(start=4, end=6)], [4, 5, 6])
+            self.assertEqual([record[0] for record in reader.iterate(end=2)], [1, 2])
+
+    def test_replay_as_the_demos_print(self) -> None:
+        _, frames = self.record()
+        with trace.TraceReader(self.path) as reader:
+            replayed = list(reader.replay(root=_build_tree()))
+            self.assertEqual(replayed, [f"--- Tick {tick} ---\n{frame}\n\n" for tick, frame in enumerate(frames, 1)])
+            self.assertEqual(len(list(reader.replay(start=2, end=3))), 2)
+            self.assertEqual(list(reader.replay(changes=True)), self.changes)
+
+    def test_replay_needs_the_recorded_structure(self) -> None:
+        self.record()
+        root = _build_tree()
+        root.children[1].name = "Renamed"
+        with trace.TraceReader(self.path) as reader, self.assertRaises(ValueError):
+            next(reader.replay(root=root))
+
+    def test_not_a_trace(self) -> None:
+        self.path.write_bytes(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            trace.TraceReader(self.path)
+
+    def test_main(self) -> None:
+        self.record()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(trace.main([str(self.path), "--start", "2", "--end", "4"]), 0)
+        self.assertEqual(output.getvalue().count("--- Tick"), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()